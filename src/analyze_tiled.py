@@ -0,0 +1,35 @@
+# src/analyze_tiled.py
+# Tiled analysis of very large field and drone images
+#
+# Run from the project root:
+#   python -m src.analyze_tiled "surveys/2024-06-01/ortho.tif" --output results/ortho
+#   python -m src.analyze_tiled ortho.tif -o results/ortho --crop corn --tile-size 448
+#
+# The image is read by window, so orthomosaics larger than memory work as long
+# as they are GeoTIFFs (with rasterio installed), uncompressed TIFFs or .npy
+# arrays. Writes tiles.jsonl (per-tile severity grid), heatmap.npy/.png
+# (low-resolution lesion density) and summary.json to the output directory.
+
+import argparse
+
+from src.common.analysis.tiled import BATCH_SIZE, HEATMAP_SCALE, TILE_SIZE, analyze_tiled
+from src.common.crops import CROPS
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze a very large image tile by tile")
+    parser.add_argument("image", help="Image path (.tif/.tiff, .npy, or any format OpenCV reads)")
+    parser.add_argument("--output", "-o", required=True, help="Output directory")
+    parser.add_argument("--tile-size", type=int, default=TILE_SIZE)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Tiles per model call")
+    parser.add_argument("--heatmap-scale", type=int, default=HEATMAP_SCALE,
+                        help="Source pixels per heatmap pixel (must divide the tile size)")
+    parser.add_argument("--crop", choices=CROPS, default=None,
+                        help="Skip crop identification and treat every tile as this crop")
+    parser.add_argument("--workers", type=int, default=None, help="Read/segmentation threads")
+    args = parser.parse_args()
+
+    summary = analyze_tiled(args.image, args.output, args.tile_size, args.batch_size, args.heatmap_scale,
+                            args.crop, args.workers)
+    print(f"Severity: {summary['severity_percent']:.2f}% of leaf area ({summary['severity_level']}), "
+          f"{summary['tiles']} tiles in {summary['seconds']:.0f}s")
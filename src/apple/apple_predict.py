@@ -1,24 +1,24 @@
 # Predict disease for APPLE
 # apple/apple_predict.py
 # ✅ You call this in main.py after the crop is identified.
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array, load_img
 import numpy as np
+from src.common.models.registry import get_model
+from src.common.paths import resolve_model_path
+from src.common.preprocessing.image_utils import preprocess_image_batch, preprocess_single_image
 
-MODEL_PATH = "apple/apple_model.h5"
+MODEL_PATH = resolve_model_path("apple")
 IMG_SIZE = (224, 224)
 
-# Load trained Apple model
-model = load_model(MODEL_PATH)
+# Model is loaded on first use through the shared registry
 
 def predict_apple(image_path, class_indices=None):
     """
     Predict disease for a single apple image.
+    image_path may also be an ImageContext decoded once for the whole pipeline.
     """
-    img = load_img(image_path, target_size=IMG_SIZE)
-    img_array = img_to_array(img) / 255.0  # normalize
-    img_array = np.expand_dims(img_array, axis=0)
+    img_array = preprocess_single_image(image_path)
 
+    model = get_model("apple")
     preds = model.predict(img_array)
     predicted_class = np.argmax(preds, axis=1)[0]
 
@@ -27,84 +27,13 @@ def predict_apple(image_path, class_indices=None):
         inv_map = {v: k for k, v in class_indices.items()}
         return inv_map[predicted_class]
     return predicted_class
-## apple/apple_predict.py
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array, load_img
-import numpy as np
-
-MODEL_PATH = "apple/apple_model.h5"
-IMG_SIZE = (224, 224)
-
-# Load trained Apple model
-model = load_model(MODEL_PATH)
-
-def predict_apple(image_path, class_indices=None):
-    """
-    Predict disease for a single apple image.
-    """
-    img = load_img(image_path, target_size=IMG_SIZE)
-    img_array = img_to_array(img) / 255.0  # normalize
-    img_array = np.expand_dims(img_array, axis=0)
-
-    preds = model.predict(img_array)
-    predicted_class = np.argmax(preds, axis=1)[0]
-
-    if class_indices:
-        # Map index to class name
-        inv_map = {v: k for k, v in class_indices.items()}
-        return inv_map[predicted_class]
-    return predicted_class
-# # apple/apple_predict.py
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array, load_img
-import numpy as np
 
-MODEL_PATH = "apple/apple_model.h5"
-IMG_SIZE = (224, 224)
 
-# Load trained Apple model
-model = load_model(MODEL_PATH)
-
-def predict_apple(image_path, class_indices=None):
+def predict_apple_batch(images):
     """
-    Predict disease for a single apple image.
+    Predict disease for many apple images (paths or RGB arrays) in one forward pass.
+    Returns: list of (class index, confidence) in input order
     """
-    img = load_img(image_path, target_size=IMG_SIZE)
-    img_array = img_to_array(img) / 255.0  # normalize
-    img_array = np.expand_dims(img_array, axis=0)
-
-    preds = model.predict(img_array)
-    predicted_class = np.argmax(preds, axis=1)[0]
-
-    if class_indices:
-        # Map index to class name
-        inv_map = {v: k for k, v in class_indices.items()}
-        return inv_map[predicted_class]
-    return predicted_class
-# apple/apple_predict.py
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array, load_img
-import numpy as np
-
-MODEL_PATH = "apple/apple_model.h5"
-IMG_SIZE = (224, 224)
-
-# Load trained Apple model
-model = load_model(MODEL_PATH)
-
-def predict_apple(image_path, class_indices=None):
-    """
-    Predict disease for a single apple image.
-    """
-    img = load_img(image_path, target_size=IMG_SIZE)
-    img_array = img_to_array(img) / 255.0  # normalize
-    img_array = np.expand_dims(img_array, axis=0)
-
-    preds = model.predict(img_array)
-    predicted_class = np.argmax(preds, axis=1)[0]
-
-    if class_indices:
-        # Map index to class name
-        inv_map = {v: k for k, v in class_indices.items()}
-        return inv_map[predicted_class]
-    return predicted_class
+    model = get_model("apple")
+    preds = model.predict(preprocess_image_batch(images), verbose=0)
+    return [(int(i), float(c)) for i, c in zip(np.argmax(preds, axis=1), np.max(preds, axis=1))]
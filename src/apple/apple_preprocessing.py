@@ -1,12 +1,13 @@
 # apple/apple_preprocessing.py
 import os
 from tensorflow.keras.preprocessing.image import ImageDataGenerator
-from src.common.preprocessing.image_utils import create_data_generator  # common generator
+from src.common.preprocessing.augmentation import get_policy
+from src.common.preprocessing.image_utils import DATA_LOADER, create_data_generator, flow_from_index  # common generator
 
 IMG_SIZE = (224, 224)
 BATCH_SIZE = 32
 
-def get_apple_generators(base_dir, img_size=IMG_SIZE, batch_size=BATCH_SIZE):
+def get_apple_generators(base_dir, img_size=IMG_SIZE, batch_size=BATCH_SIZE, loader=DATA_LOADER):
     """
     Returns training, validation, and test generators for Apple crop.
     """
@@ -14,25 +15,35 @@ def get_apple_generators(base_dir, img_size=IMG_SIZE, batch_size=BATCH_SIZE):
     val_dir = os.path.join(base_dir, "validation/apple")
     test_dir = os.path.join(base_dir, "test/apple")
 
+    if loader == "tfdata":
+        from src.common.preprocessing.tf_data import get_split_datasets
+        return get_split_datasets(train_dir, val_dir, test_dir, img_size, batch_size, get_policy("apple"))
+    if loader == "compiled":
+        from src.common.preprocessing.compiled_dataset import get_compiled_datasets
+        return get_compiled_datasets("apple", img_size, batch_size, get_policy("apple"))
+
     # Use generic data generator from common utils
-    train_datagen = create_data_generator(augment=True)
+    train_datagen = create_data_generator(augment=get_policy("apple"))
     val_test_datagen = create_data_generator(augment=False)
 
-    train_gen = train_datagen.flow_from_directory(
+    train_gen = flow_from_index(
+        train_datagen,
         train_dir,
         target_size=img_size,
         batch_size=batch_size,
         class_mode='categorical'
     )
 
-    val_gen = val_test_datagen.flow_from_directory(
+    val_gen = flow_from_index(
+        val_test_datagen,
         val_dir,
         target_size=img_size,
         batch_size=batch_size,
         class_mode='categorical'
     )
 
-    test_gen = val_test_datagen.flow_from_directory(
+    test_gen = flow_from_index(
+        val_test_datagen,
         test_dir,
         target_size=img_size,
         batch_size=batch_size,
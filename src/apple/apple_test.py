@@ -1,8 +1,8 @@
 # apple/apple_test.py
-from .apple_preprocessing import get_apple_generators
+from src.common.evaluation.harness import model_folders, model_labels, predict_labels
+from src.common.preprocessing.compiled_dataset import load_split
 from tensorflow.keras.models import load_model
 from sklearn.metrics import classification_report, confusion_matrix
-import numpy as np
 import os
 
 BASE_DIR = "dataset/image data"
@@ -10,23 +10,22 @@ BASE_DIR = "dataset/image data"
 # ✅ correct path (relative to project root)
 MODEL_PATH = os.path.join("apple", "apple_model.h5")
 
-# Load test generator
-_, _, test_gen = get_apple_generators(BASE_DIR)
+# Load test split (labels in the model's output order, names from its manifest)
+test_data = load_split("test", base_dir=BASE_DIR, folders=model_folders(["apple"]))
+rows, y_true, class_names = model_labels(test_data, "apple")
 
 # Load model
 model = load_model(MODEL_PATH)
 
 # Predict all test images
-preds = model.predict(test_gen)
-y_pred = np.argmax(preds, axis=1)
-y_true = test_gen.classes
+y_pred = predict_labels(model, test_data, rows)
 
 # Evaluate
 print("Classification Report:")
 print(classification_report(
     y_true,
     y_pred,
-    target_names=list(test_gen.class_indices.keys())
+    target_names=class_names
 ))
 
 print("Confusion Matrix:")
@@ -0,0 +1,287 @@
+# src/batch_analyze.py
+# Headless bulk analysis of image directories
+#
+# Run from the project root:
+#   python -m src.batch_analyze "field/2024-06-01" "uploads/**/*.jpg" --output results.jsonl
+#
+# Results are appended to the output file (.jsonl or .csv) after every batch.
+# Re-running the same command skips images already in the output, so an
+# interrupted run resumes where it stopped. Does not import tkinter or matplotlib.
+#
+# With --cache, results are also kept in a content-addressed cache, so images
+# seen before (in any run) are answered without being decoded.
+#
+# With --artifacts DIR, masks and overlays of the analyzed images are written
+# to DIR by background writer threads (images answered from the cache are not
+# rendered). Without it no overlay is ever rendered.
+
+import argparse
+import csv
+import glob
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.common.analysis.severity import infection_severity
+from src.common.cache.result_cache import DEFAULT_CACHE_PATH, RESULT_FIELDS, ResultCache, content_key
+from src.common.crops import get_disease_classes, get_segmentation_config, get_severities
+from src.common.models.backbone import get_engine
+from src.common.preprocessing.image_context import ImageContext
+from src.common.visualization.artifacts import (
+    FORMATS, PNG_COMPRESSION, QUALITY, QUEUE_MB, QUEUE_SIZE, WORKERS, ArtifactSink,
+)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+BATCH_SIZE = 64
+FIELDS = [
+    "path", "crop", "confidence", "disease_index", "disease", "disease_confidence",
+    "severity_percent", "severity_level", "error",
+]
+
+
+def collect_images(inputs):
+    """
+    Expands directories (recursively) and glob patterns into a sorted list of image paths.
+    """
+    paths = set()
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            for dirpath, _, filenames in os.walk(pattern):
+                paths.update(
+                    os.path.join(dirpath, name) for name in filenames
+                    if name.lower().endswith(IMAGE_EXTENSIONS)
+                )
+        else:
+            paths.update(p for p in glob.glob(pattern, recursive=True) if p.lower().endswith(IMAGE_EXTENSIONS))
+    return sorted(paths)
+
+
+class ResultWriter:
+    """
+    Appends result rows to a JSONL or CSV file; the file doubles as the resume checkpoint.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.format = "csv" if path.lower().endswith(".csv") else "jsonl"
+        self.done = self._read_done()
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        if self.format == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=FIELDS)
+            if is_new:
+                self._csv.writeheader()
+
+    def _read_done(self):
+        # Rows cut short by an interruption are truncated away (and not counted
+        # as done), so the next append starts on a clean line
+        if not os.path.exists(self.path):
+            return set()
+        done = set()
+        good_size = 0
+        with open(self.path, "r", newline="", encoding="utf-8") as f:
+            if self.format == "csv":
+                last = [""]
+
+                def lines():
+                    for line in iter(f.readline, ""):
+                        last[0] = line
+                        yield line
+
+                try:
+                    for n, row in enumerate(csv.reader(lines(), strict=True)):
+                        if not last[0].endswith("\n") or len(row) != len(FIELDS):
+                            break
+                        if n and row[0]:
+                            done.add(row[0])
+                        good_size = f.tell()
+                except csv.Error:
+                    pass  # an unterminated quoted field
+            else:
+                for line in iter(f.readline, ""):
+                    try:
+                        if not line.endswith("\n"):
+                            raise ValueError
+                        done.add(json.loads(line)["path"])
+                    except (ValueError, KeyError):
+                        break
+                    good_size = f.tell()
+        if good_size != os.path.getsize(self.path):
+            os.truncate(self.path, good_size)
+        return done
+
+    def write(self, rows):
+        for row in rows:
+            if self.format == "csv":
+                self._csv.writerow(row)
+            else:
+                self._file.write(json.dumps(row) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def _is_complete(cached):
+    return cached["crop"] == "unknown" or cached["severity_percent"] is not None
+
+
+def load_image(path, cache=None):
+    """
+    Reads an image on a worker thread. Returns (content key, item) where item is
+    the cached result dict on a cache hit, otherwise the decoded ImageContext
+    with its model input prepared, or the exception raised while reading.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        key = content_key(data)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None and _is_complete(cached):
+                return key, cached
+        image = ImageContext.from_bytes(data)
+        image.path = path
+        image.model_input  # resize off the main thread
+        return key, image
+    except Exception as e:
+        return None, e
+
+
+def analyze_segmentation(image, crop_name, keep_masks=False):
+    """
+    Mask (None unless keep_masks) and severity of one image, on a pool thread.
+
+    One task per image rather than one stacked call per crop: a bad image only
+    fails its own row, the fused kernel (which releases the GIL) runs on every
+    worker, and only one image per worker is in flight at full resolution.
+    Small same-size images lose the shared vectorized pass, which costs less
+    than the parallelism gained.
+    """
+    severities, masks = get_severities([image], crop_name, masks=keep_masks)
+    percent = severities[0]["severity_percent"]
+    return masks[0] if masks else None, percent, infection_severity(percent)
+
+
+def analyze_batch(paths, loaded, pool, cache=None, sink=None):
+    rows = [{"path": path} for path in paths]
+    images = [item for _, item in loaded]
+    valid = [i for i, image in enumerate(images) if isinstance(image, ImageContext)]
+    for i, item in enumerate(images):
+        if isinstance(item, dict):
+            rows[i].update({name: item[name] for name in RESULT_FIELDS if item[name] is not None})
+        elif not isinstance(item, ImageContext):
+            rows[i]["error"] = str(item)
+    if not valid:
+        return rows
+
+    batch = np.stack([images[i].model_input for i in valid])
+    predictions = get_engine().analyze_batch(batch)
+
+    segmentations = {}
+    for i, (crop_name, confidence, disease_index, disease_confidence) in zip(valid, predictions):
+        rows[i].update(crop=crop_name, confidence=confidence)
+        if disease_index is not None:
+            rows[i].update(
+                disease_index=disease_index,
+                disease=get_disease_classes(crop_name)[disease_index],
+                disease_confidence=disease_confidence,
+            )
+            # Masks are only materialized to be stored in the cache or written out
+            segmentations[i] = crop_name, pool.submit(analyze_segmentation, images[i], crop_name,
+                                                      cache is not None or sink is not None)
+        else:
+            images[i].release()
+
+    # Full-resolution pixels are released as soon as each image is done (the
+    # sink keeps its own reference, bounded by its queue), so only the
+    # prefetched chunk is held at full size while the next batch runs
+    masks = {}
+    for i, (crop_name, future) in segmentations.items():
+        try:
+            mask, percent, level = future.result()
+        except Exception as e:
+            rows[i]["error"] = f"segmentation failed: {e}"
+            images[i].release()
+            continue
+        rows[i].update(severity_percent=percent, severity_level=level)
+        if mask is not None:
+            masks[i] = mask
+        if sink is not None:
+            name = f"{os.path.splitext(os.path.basename(paths[i]))[0]}_{loaded[i][0][:8]}"
+            sink.put(name, images[i].bgr, mask, get_segmentation_config(crop_name).alpha, percent)
+        images[i].release()
+
+    if cache is not None:
+        for i in valid:
+            if "error" not in rows[i]:
+                fields = {name: rows[i][name] for name in RESULT_FIELDS if name in rows[i]}
+                cache.put(loaded[i][0], mask=masks.get(i), **fields)
+    return rows
+
+
+def run(inputs, output, batch_size=BATCH_SIZE, workers=None, cache_path=None, sink=None):
+    paths = collect_images(inputs)
+    writer = ResultWriter(output)
+    # Tagged with the version of the models this run computes with
+    cache = ResultCache(cache_path, model_version=get_engine().model_version) if cache_path else None
+    pending = [p for p in paths if p not in writer.done]
+    print(f"{len(paths)} images found, {len(paths) - len(pending)} already done, {len(pending)} to analyze")
+
+    chunks = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    start = time.perf_counter()
+    processed = 0
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Decode the next chunk while the current one is being analyzed
+            next_images = [pool.submit(load_image, p, cache) for p in chunks[0]] if chunks else []
+            for n, chunk in enumerate(chunks):
+                loaded = [f.result() for f in next_images]
+                if n + 1 < len(chunks):
+                    next_images = [pool.submit(load_image, p, cache) for p in chunks[n + 1]]
+
+                writer.write(analyze_batch(chunk, loaded, pool, cache, sink))
+                processed += len(chunk)
+                rate = processed / (time.perf_counter() - start)
+                print(f"{processed}/{len(pending)} images ({rate:.1f} img/s)", flush=True)
+    finally:
+        # Also on an interruption: flush the queued artifacts of the rows already written
+        writer.close()
+        if cache is not None:
+            cache.close()
+        if sink is not None:
+            stats = sink.close()
+            print(f"{stats['written']} artifacts written ({stats['bytes'] / 1e6:.1f} MB), "
+                  f"{stats['blocked_seconds']:.1f}s waiting on the writers")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze directories of leaf images without a GUI")
+    parser.add_argument("inputs", nargs="+", help="Directories or glob patterns")
+    parser.add_argument("--output", "-o", required=True, help="Results file (.jsonl or .csv)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="Decode/segmentation threads")
+    parser.add_argument("--cache", nargs="?", const=DEFAULT_CACHE_PATH, default=None,
+                        help=f"Reuse results of previously seen images (default path: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--artifacts", help="Write masks and overlays to this directory")
+    parser.add_argument("--artifact-format", choices=FORMATS, default="png", help="Overlay format")
+    parser.add_argument("--png-compression", type=int, default=PNG_COMPRESSION, help="0 (fastest) .. 9 (smallest)")
+    parser.add_argument("--quality", type=int, default=QUALITY, help="JPEG/WebP overlay quality")
+    parser.add_argument("--no-overlays", action="store_true", help="Write masks only")
+    parser.add_argument("--artifact-queue", type=int, default=QUEUE_SIZE,
+                        help="Images queued for writing before analysis waits")
+    parser.add_argument("--artifact-queue-mb", type=float, default=QUEUE_MB,
+                        help="Image and mask megabytes queued for writing before analysis waits")
+    parser.add_argument("--artifact-workers", type=int, default=WORKERS, help="Writer threads")
+    args = parser.parse_args()
+
+    sink = None
+    if args.artifacts:
+        sink = ArtifactSink(args.artifacts, args.artifact_format, args.png_compression, args.quality,
+                            overlays=not args.no_overlays, queue_size=args.artifact_queue,
+                            workers=args.artifact_workers, queue_mb=args.artifact_queue_mb)
+    run(args.inputs, args.output, args.batch_size, args.workers, args.cache, sink)
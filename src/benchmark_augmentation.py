@@ -0,0 +1,52 @@
+# src/benchmark_augmentation.py
+# Augmentation throughput: per-image ImageDataGenerator versus batched layers
+#
+# Run from the project root:
+#   python -m src.benchmark_augmentation [--model apple] [--batches 20] [--batch-size 32]
+#
+# Both paths apply the model's augmentation policy to the same in-memory
+# batch, so only the augmentation cost is measured (no decoding or disk I/O).
+
+import argparse
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from src.common.paths import MODEL_PATHS
+from src.common.preprocessing.augmentation import DEFAULT_POLICY, build_augmentation, get_policy
+from src.common.preprocessing.image_utils import IMG_HEIGHT, IMG_WIDTH, create_data_generator
+
+
+def images_per_second(fn, batch, batches):
+    """
+    Augments `batch` `batches` times after one untimed warm-up call.
+    """
+    fn(batch)
+    start = time.perf_counter()
+    for _ in range(batches):
+        fn(batch)
+    return len(batch) * batches / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare ImageDataGenerator and batched augmentation images/sec")
+    parser.add_argument("--model", default="crop", choices=list(MODEL_PATHS))
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    policy = get_policy(args.model) or DEFAULT_POLICY
+    batch = np.random.rand(args.batch_size, IMG_HEIGHT, IMG_WIDTH, 3).astype(np.float32)
+    print(f"Model: {args.model}, policy: {policy}\n{args.batches} batches of {args.batch_size}\n")
+
+    # What flow_from_directory does for every image of a training batch
+    datagen = create_data_generator(augment=policy)
+    generator = images_per_second(lambda x: [datagen.random_transform(img) for img in x], batch, args.batches)
+    print(f"ImageDataGenerator  {generator:8.1f} images/sec")
+
+    augmentation = build_augmentation(policy)
+    batched = images_per_second(tf.function(lambda x: augmentation(x, training=True)), batch, args.batches)
+    print(f"batched layers      {batched:8.1f} images/sec")
+
+    print(f"\nSpeedup: {batched / generator:.1f}x")
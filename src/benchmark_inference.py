@@ -0,0 +1,59 @@
+# src/benchmark_inference.py
+# Per-call latency of model.predict() versus the compiled tf.function path
+#
+# Run from the project root:
+#   python -m src.benchmark_inference --model crop --runs 100 [--image leaf.jpg] [--xla]
+
+import argparse
+import time
+
+import numpy as np
+from tensorflow.keras.models import load_model
+
+from src.common.models.compiled import CompiledModel
+from src.common.paths import MODEL_PATHS, resolve_model_path
+from src.common.preprocessing.image_utils import IMG_HEIGHT, IMG_WIDTH, preprocess_single_image
+
+
+def time_calls(fn, img_array, runs):
+    """
+    Returns per-call latencies in milliseconds (after one untimed warm-up call).
+    """
+    fn(img_array)
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(img_array)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+def summarize(name, latencies):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"{name:<22} p50={p50:7.2f}ms  p95={p95:7.2f}ms  p99={p99:7.2f}ms  mean={latencies.mean():7.2f}ms")
+    return p50
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare predict() and compiled inference latency")
+    parser.add_argument("--model", default="crop", choices=list(MODEL_PATHS))
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--image", help="Leaf image to use (default: random input)")
+    parser.add_argument("--xla", action="store_true", help="Also time the XLA-compiled path")
+    args = parser.parse_args()
+
+    if args.image:
+        img_array = preprocess_single_image(args.image).astype(np.float32)
+    else:
+        img_array = np.random.rand(1, IMG_HEIGHT, IMG_WIDTH, 3).astype(np.float32)
+
+    model = load_model(resolve_model_path(args.model))
+    print(f"Model: {args.model}, {args.runs} single-image calls\n")
+
+    baseline = summarize("model.predict", time_calls(lambda x: model.predict(x, verbose=0), img_array, args.runs))
+    compiled = summarize("compiled", time_calls(CompiledModel(model, jit_compile=False), img_array, args.runs))
+    print(f"\nSpeedup (p50): {baseline / compiled:.1f}x")
+
+    if args.xla:
+        xla = summarize("compiled + XLA", time_calls(CompiledModel(model, jit_compile=True), img_array, args.runs))
+        print(f"Speedup with XLA (p50): {baseline / xla:.1f}x")
@@ -0,0 +1,41 @@
+# src/benchmark_input.py
+# Input pipeline throughput: ImageDataGenerator versus tf.data and the compiled dataset
+#
+# Run from the project root:
+#   python -m src.benchmark_input --model apple --batches 50 [--split train] [--loaders keras tfdata compiled]
+#
+# Reports images/sec for each loader on the same directory, so it is easy to
+# check whether training is waiting on the input pipeline.
+
+import argparse
+
+from src.common.crops import get_generators
+from src.common.paths import DATASET_DIR, MODEL_PATHS
+from src.common.preprocessing.tf_data import measure_throughput
+
+SPLITS = {"train": 0, "validation": 1, "test": 2}
+LOADERS = ["keras", "tfdata", "compiled"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare input pipeline images/sec")
+    parser.add_argument("--model", default="crop", choices=list(MODEL_PATHS))
+    parser.add_argument("--split", default="train", choices=list(SPLITS))
+    parser.add_argument("--batches", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--loaders", nargs="+", default=["keras", "tfdata"], choices=LOADERS)
+    args = parser.parse_args()
+
+    get_model_generators = get_generators(args.model)
+    print(f"Model: {args.model}, {args.split} split, {args.batches} batches of {args.batch_size}\n")
+
+    results = {}
+    for loader in args.loaders:
+        data = get_model_generators(DATASET_DIR, batch_size=args.batch_size, loader=loader)[SPLITS[args.split]]
+        results[loader] = measure_throughput(data, args.batches)
+        print(f"{loader:<8} {results[loader]:8.1f} images/sec")
+
+    print()
+    baseline = args.loaders[0]
+    for loader in args.loaders[1:]:
+        print(f"Speedup of {loader} over {baseline}: {results[loader] / results[baseline]:.1f}x")
@@ -0,0 +1,45 @@
+# src/calibrate_segmentation.py
+# Severity error of each segmentation resolution against full resolution
+#
+# Run from the project root:
+#   python -m src.calibrate_segmentation [--levels 1/2 1/4 512] [--limit 200] [--json calibration.json]
+#
+# Pick a level from the report and deploy it with
+#   AGROVISION_SEG_RESOLUTION=1/4
+
+import argparse
+import json
+import sys
+
+from src.common.segmentation.calibration import LEVELS, calibrate
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate multi-resolution segmentation on a dataset split")
+    parser.add_argument("--levels", nargs="+", default=LEVELS,
+                        help="Pyramid factors (1/2, 0.25) and/or long sides in pixels (512)")
+    parser.add_argument("--split", default="test", choices=["train", "validation", "test"])
+    parser.add_argument("--limit", type=int, default=200, help="Images sampled per crop (0 = all)")
+    parser.add_argument("--json", help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    report = calibrate(args.levels, args.split, args.limit or None)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if report["full_ms_per_image"] is None:
+        print(f"No {args.split} images found")
+        sys.exit(1)
+
+    print(f"\nFull resolution: {report['full_ms_per_image']:.2f} ms/image")
+    print(f"{'level':<8} {'crop':<10} {'images':>6} {'MAE':>7} {'p95':>7} {'max':>7} {'bias':>7} "
+          f"{'agree':>6} {'ms/img':>7} {'speedup':>7}")
+    for level, result in report["levels"].items():
+        for crop, stats in [("all", result["overall"])] + sorted(result["crops"].items()):
+            if not stats["images"]:
+                continue
+            print(f"{level:<8} {crop:<10} {stats['images']:>6} {stats['mean_abs_error']:>7.3f} "
+                  f"{stats['p95_abs_error']:>7.3f} {stats['max_abs_error']:>7.3f} {stats['bias']:>+7.3f} "
+                  f"{stats['level_agreement']:>6.1%} {stats['ms_per_image']:>7.2f} {stats['speedup']:>6.1f}x")
@@ -1,26 +1,25 @@
 # Test CASSAVA model
-from .cassava_preprocessing import get_cassava_generators
+from src.common.evaluation.harness import model_folders, model_labels, predict_labels
+from src.common.preprocessing.compiled_dataset import load_split
 from tensorflow.keras.models import load_model
 from sklearn.metrics import classification_report, confusion_matrix
-import numpy as np
 import os
 
 BASE_DIR = "dataset/image data"
 MODEL_PATH = os.path.join("cassava", "cassava_model.h5")
 
-_, _, test_gen = get_cassava_generators(BASE_DIR)
+test_data = load_split("test", base_dir=BASE_DIR, folders=model_folders(["cassava"]))
+rows, y_true, class_names = model_labels(test_data, "cassava")
 
 model = load_model(MODEL_PATH)
 
-preds = model.predict(test_gen)
-y_pred = np.argmax(preds, axis=1)
-y_true = test_gen.classes
+y_pred = predict_labels(model, test_data, rows)
 
 print("Classification Report:")
 print(classification_report(
     y_true,
     y_pred,
-    target_names=list(test_gen.class_indices.keys())
+    target_names=class_names
 ))
 
 print("Confusion Matrix:")
@@ -1,12 +1,9 @@
-import cv2
-from .cassava_segmentation_utils import read_and_gray, threshold_mask, overlay_mask
+from src.common.segmentation.engine import SegmentationConfig, segment_image
+
+CONFIG = SegmentationConfig(threshold=128, color_space="gray", alpha=0.3, leaf_chroma=20)
 
 def segment_cassava_leaf(image_path):
     """
-    Returns a mask highlighting diseased regions on cassava leaf.
+    Returns a mask highlighting diseased regions on cassava leaf, and its overlay.
     """
-    img, gray = read_and_gray(image_path)
-    mask = threshold_mask(gray)
-    overlay = overlay_mask(img, mask)
-    return mask, overlay
-
+    return segment_image(image_path, CONFIG)
@@ -0,0 +1,36 @@
+# src/check_preprocessing.py
+# Checks that inference preprocessing matches training preprocessing
+#
+# Run from the project root:
+#   python -m src.check_preprocessing [--split test] [--limit 20]
+#
+# Every served path decodes with OpenCV (ImageContext) while the models were
+# trained through Keras load_img (PIL). This compares the 224x224 model inputs
+# of both on sampled dataset images and exits with status 1 if any differ.
+
+import argparse
+import sys
+
+from src.common.preprocessing.compiled_dataset import index_split, sample_rows
+from src.common.preprocessing.image_utils import preprocessing_difference
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare ImageContext and load_img model inputs")
+    parser.add_argument("--split", default="test", choices=["train", "validation", "test"])
+    parser.add_argument("--limit", type=int, default=20, help="Images sampled per crop folder")
+    args = parser.parse_args()
+
+    paths, _, _, _, folders = index_split(args.split)
+    mismatched = 0
+    checked = 0
+    for folder, info in folders.items():
+        for row in sample_rows(info["start"], info["end"], args.limit):
+            difference = preprocessing_difference(paths[row])
+            checked += 1
+            if difference > 0:
+                mismatched += 1
+                print(f"{paths[row]}: max difference {difference:.4f}")
+
+    print(f"{checked - mismatched}/{checked} images match")
+    sys.exit(1 if mismatched else 0)
@@ -1,19 +1,21 @@
 # src/common/analysis/severity.py
-import cv2
 import numpy as np
 
-def calculate_severity(mask):
+def calculate_severity(mask, leaf_area=None):
     """
     Calculates the % of leaf affected based on the mask.
     mask: binary image where diseased regions are white
+    leaf_area: leaf pixels in the image (default: every pixel, background included)
     Returns: float percentage
+
+    The segmentation engine's measure_severity() returns the same percentage
+    with the leaf area, in one pass over the image and without a mask.
     """
-    # Ensure binary mask
-    _, binary_mask = cv2.threshold(mask, 127, 255, cv2.THRESH_BINARY)
-    total_pixels = binary_mask.size
-    diseased_pixels = cv2.countNonZero(binary_mask)
-    severity_percent = (diseased_pixels / total_pixels) * 100
-    return severity_percent
+    diseased_pixels = np.count_nonzero(np.asarray(mask) > 127)
+    total_pixels = np.asarray(mask).size if leaf_area is None else leaf_area
+    if not total_pixels:
+        return 0.0
+    return diseased_pixels / total_pixels * 100
 
 def infection_severity(infection_percent):
     """
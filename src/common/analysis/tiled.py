@@ -0,0 +1,206 @@
+# src/common/analysis/tiled.py
+# Tiled, streaming analysis of images too large to decode whole (drone
+# orthomosaics).
+#
+# The image is read window by window (raster.open_raster) and cut into tiles.
+# Tiles go through the models and the severity kernel in batches, and each
+# batch's results are written out before the batch after next is read, so
+# peak memory depends on the tile and batch size, not on the image:
+#
+#   <output>/tiles.jsonl   one line per tile: position, crop, disease, leaf/lesion area, severity
+#   <output>/heatmap.npy   lesion density per heatmap cell (uint8, 255 = all lesion), memory-mapped
+#   <output>/heatmap.png   the same, color-mapped
+#   <output>/summary.json  image size, tiles per crop and disease, overall severity
+
+import json
+import math
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from src.common.analysis.severity import infection_severity
+from src.common.crops import get_disease_classes, get_severities
+from src.common.preprocessing.image_context import ImageContext
+from src.common.preprocessing.raster import open_raster
+
+TILE_SIZE = 512
+BATCH_SIZE = 32
+# Source pixels per heatmap pixel (must divide TILE_SIZE)
+HEATMAP_SCALE = 32
+
+
+def tile_grid(height, width, tile_size=TILE_SIZE):
+    """
+    Tiles covering the image in row-major order, as (row, col, top, left,
+    height, width); tiles on the right and bottom edges may be smaller.
+    """
+    return [
+        (row, col, top, left, min(tile_size, height - top), min(tile_size, width - left))
+        for row, top in enumerate(range(0, height, tile_size))
+        for col, left in enumerate(range(0, width, tile_size))
+    ]
+
+
+def load_tile(raster, tile):
+    """
+    Reads one tile on a worker thread, with its model input prepared.
+    """
+    _, _, top, left, height, width = tile
+    image = ImageContext(raster.read(top, left, height, width))
+    image.model_input  # resize off the main thread
+    return image
+
+
+def classify_tiles(engine, images, crop=None):
+    """
+    Crop and disease of each tile, in one backbone call for the batch.
+    With a known crop only its disease head runs (confidence is then None).
+
+    Returns:
+        list of (crop_name, confidence, disease_index, disease_confidence)
+    """
+    batch = np.stack([image.model_input for image in images])
+    if crop is None:
+        return engine.analyze_batch(batch)
+    features = engine.extract_features(batch)
+    return [(crop, None, index, confidence) for index, confidence in engine.predict_disease_batch(crop, features)]
+
+
+def _measure_tile(image, crop_name):
+    severities, masks = get_severities([image], crop_name, masks=True)
+    return severities[0], masks[0]
+
+
+class TiledAnalysis:
+    """
+    Output files of one tiled run. Results are added batch by batch.
+    """
+
+    def __init__(self, output_dir, height, width, tile_size, heatmap_scale):
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.heatmap_scale = heatmap_scale
+        self.tiles_file = open(os.path.join(output_dir, "tiles.jsonl"), "w")
+        self.heatmap = np.lib.format.open_memmap(
+            os.path.join(output_dir, "heatmap.npy"), mode="w+", dtype=np.uint8,
+            shape=(math.ceil(height / heatmap_scale), math.ceil(width / heatmap_scale))
+        )
+        self.summary = {
+            "height": height,
+            "width": width,
+            "tile_size": tile_size,
+            "heatmap_scale": heatmap_scale,
+            "tiles": 0,
+            "crops": Counter(),
+            "diseases": Counter(),
+            "leaf_area": 0,
+            "lesion_area": 0,
+        }
+
+    def add(self, tile, prediction, severity=None, mask=None):
+        row, col, top, left, height, width = tile
+        crop_name, confidence, disease_index, disease_confidence = prediction
+        result = {
+            "row": row, "col": col, "top": top, "left": left, "height": height, "width": width,
+            "crop": crop_name, "confidence": confidence,
+        }
+        self.summary["tiles"] += 1
+        self.summary["crops"][crop_name] += 1
+        if disease_index is not None:
+            disease = get_disease_classes(crop_name)[disease_index]
+            result.update(disease_index=disease_index, disease=disease, disease_confidence=disease_confidence)
+            self.summary["diseases"][f"{crop_name}/{disease}"] += 1
+        if severity is not None:
+            result.update(severity, severity_level=infection_severity(severity["severity_percent"]))
+            self.summary["leaf_area"] += severity["leaf_area"]
+            self.summary["lesion_area"] += severity["lesion_area"]
+        if mask is not None:
+            s = self.heatmap_scale
+            cells = cv2.resize(mask, (math.ceil(width / s), math.ceil(height / s)), interpolation=cv2.INTER_AREA)
+            self.heatmap[top // s:top // s + cells.shape[0], left // s:left // s + cells.shape[1]] = cells
+        self.tiles_file.write(json.dumps(result) + "\n")
+
+    def flush(self):
+        self.tiles_file.flush()
+
+    def close(self, seconds):
+        self.tiles_file.close()
+        self.heatmap.flush()
+        cv2.imwrite(os.path.join(self.output_dir, "heatmap.png"),
+                    cv2.applyColorMap(np.asarray(self.heatmap), cv2.COLORMAP_JET))
+
+        summary = self.summary
+        leaf_area = summary["leaf_area"]
+        percent = summary["lesion_area"] / leaf_area * 100 if leaf_area else 0.0
+        summary.update(
+            crops=dict(summary["crops"]),
+            diseases=dict(summary["diseases"]),
+            severity_percent=percent,
+            severity_level=infection_severity(percent),
+            seconds=round(seconds, 1),
+            tiles_per_sec=summary["tiles"] / seconds if seconds else None,
+        )
+        with open(os.path.join(self.output_dir, "summary.json"), "w") as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+
+def analyze_tiled(path, output_dir, tile_size=TILE_SIZE, batch_size=BATCH_SIZE, heatmap_scale=HEATMAP_SCALE,
+                  crop=None, workers=None, engine=None):
+    """
+    Analyzes a large image tile by tile (see the module comment for the outputs).
+
+    Reading, resizing and the severity kernel run on a thread pool across all
+    cores; the models run once per batch of tiles. While one batch is analyzed
+    the next is being read.
+
+    Args:
+        crop (str): Skip crop identification and treat every tile as this crop.
+        engine: SharedBackboneEngine (default: the process-wide one).
+
+    Returns:
+        dict: The run's summary.
+    """
+    if tile_size % heatmap_scale:
+        raise ValueError(f"heatmap_scale ({heatmap_scale}) must divide tile_size ({tile_size})")
+    if engine is None:
+        from src.common.models.backbone import get_engine
+
+        engine = get_engine()
+
+    raster = open_raster(path)
+    tiles = tile_grid(raster.height, raster.width, tile_size)
+    batches = [tiles[i:i + batch_size] for i in range(0, len(tiles), batch_size)]
+    results = TiledAnalysis(output_dir, raster.height, raster.width, tile_size, heatmap_scale)
+    print(f"{path}: {raster.width}x{raster.height}, {len(tiles)} tiles of {tile_size}px")
+
+    start = time.perf_counter()
+    processed = 0
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            next_images = [pool.submit(load_tile, raster, tile) for tile in batches[0]] if batches else []
+            for n, batch in enumerate(batches):
+                images = [f.result() for f in next_images]
+                if n + 1 < len(batches):
+                    next_images = [pool.submit(load_tile, raster, tile) for tile in batches[n + 1]]
+
+                predictions = classify_tiles(engine, images, crop)
+                measured = {
+                    i: pool.submit(_measure_tile, images[i], prediction[0])
+                    for i, prediction in enumerate(predictions) if prediction[0] != "unknown"
+                }
+                for i, (tile, prediction) in enumerate(zip(batch, predictions)):
+                    severity, mask = measured[i].result() if i in measured else (None, None)
+                    results.add(tile, prediction, severity, mask)
+                results.flush()
+
+                processed += len(batch)
+                rate = processed / (time.perf_counter() - start)
+                print(f"{processed}/{len(tiles)} tiles ({rate:.1f} tiles/s)", flush=True)
+    finally:
+        raster.close()
+    return results.close(time.perf_counter() - start)
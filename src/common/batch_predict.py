@@ -0,0 +1,43 @@
+# src/common/batch_predict.py
+# Batched crop identification and disease routing
+
+from src.common.crops import get_disease_classes
+from src.common.models.backbone import get_engine
+from src.common.preprocessing.image_utils import preprocess_image_batch
+
+BATCH_SIZE = 64
+
+
+def predict_batch(images, batch_size=BATCH_SIZE):
+    """
+    Identifies the crop and disease for many images.
+
+    Each chunk of `batch_size` images goes through the shared backbone and the
+    crop head once; images are then grouped by detected crop and each group
+    goes through its disease head once. Crops below CONFIDENCE_THRESHOLD are
+    reported as 'unknown' with no disease.
+
+    Args:
+        images (list): Image paths and/or RGB arrays.
+        batch_size (int): Images per forward pass.
+
+    Returns:
+        list of dict in input order with keys
+        crop, confidence, disease_index, disease, disease_confidence
+    """
+    engine = get_engine()
+    results = []
+    for start in range(0, len(images), batch_size):
+        batch = preprocess_image_batch(images[start:start + batch_size])
+        for crop_name, confidence, disease_index, disease_confidence in engine.analyze_batch(batch):
+            disease = None
+            if disease_index is not None:
+                disease = get_disease_classes(crop_name)[disease_index]
+            results.append({
+                "crop": crop_name,
+                "confidence": confidence,
+                "disease_index": disease_index,
+                "disease": disease,
+                "disease_confidence": disease_confidence,
+            })
+    return results
@@ -0,0 +1,200 @@
+# src/common/cache/result_cache.py
+# Persistent, content-addressed cache of analysis results
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from src.common.paths import MODEL_PATHS, PROJECT_ROOT, resolve_model_path
+
+DEFAULT_CACHE_PATH = os.path.join(PROJECT_ROOT, "cache", "results.sqlite")
+MAX_CACHE_MB = float(os.environ.get("AGROVISION_CACHE_MB", "1024"))
+# Seconds between calls of a ResultCache's version_source
+VERSION_CHECK_SECONDS = float(os.environ.get("AGROVISION_CACHE_VERSION_CHECK_S", "5"))
+
+# Result fields stored per image (besides the compressed mask)
+RESULT_FIELDS = [
+    "crop", "confidence", "disease_index", "disease", "disease_confidence",
+    "severity_percent", "severity_level",
+]
+
+
+def content_key(data):
+    """
+    Cache key of an image file's raw bytes; no decoding needed.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def current_model_version(model_paths=None):
+    """
+    Fingerprint of the saved model files (path, size, mtime) and the segmentation
+    parameters. Any retrained or replaced model or retuned segmentation changes
+    it, which invalidates every cached result.
+
+    Args:
+        model_paths (dict): Model name -> path (default: MODEL_PATHS resolved).
+    """
+    from src.common.crops import segmentation_fingerprint
+
+    if model_paths is None:
+        model_paths = {name: resolve_model_path(name) for name in MODEL_PATHS}
+    digest = hashlib.sha256(segmentation_fingerprint().encode())
+    for name in sorted(model_paths):
+        path = model_paths[name]
+        if os.path.exists(path):
+            stat = os.stat(path)
+            digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        else:
+            digest.update(f"{name}:missing;".encode())
+    return digest.hexdigest()[:16]
+
+
+def encode_mask(mask):
+    ok, encoded = cv2.imencode(".png", mask, [cv2.IMWRITE_PNG_COMPRESSION, 9])
+    return encoded.tobytes()
+
+
+def decode_mask(data):
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+
+
+class ResultCache:
+    """
+    SQLite-backed cache keyed by image content hash and model version.
+
+    Entries can be filled in stages (e.g. prediction first, severity later);
+    put() only overwrites the fields it is given. The least recently used
+    entries are evicted once the stored size exceeds `max_bytes`.
+
+    The version must describe the models that compute the results, not the files
+    on disk: pass the engine's model_version, or its refresh() as
+    `version_source`, which is polled at most every `version_check_seconds` on
+    get()/put(). When the version changes, the stale entries are purged.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=MAX_CACHE_MB * 1024 * 1024, model_version=None,
+                 version_source=None, version_check_seconds=VERSION_CHECK_SECONDS):
+        """
+        Args:
+            model_version (str): Version of the models in use (default: from version_source,
+                else current_model_version() of the files on disk).
+            version_source (callable): () -> version of the models in use, after
+                reloading them if they changed.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._version_source = version_source
+        self.model_version = model_version or (version_source() if version_source else current_model_version())
+        self.version_check_seconds = version_check_seconds
+        self._version_checked = time.monotonic()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, model_version TEXT NOT NULL,"
+            " crop TEXT, confidence REAL, disease_index INTEGER, disease TEXT,"
+            " disease_confidence REAL, severity_percent REAL, severity_level TEXT,"
+            " mask BLOB, size_bytes INTEGER NOT NULL DEFAULT 0, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+        self._purge_stale()
+        self._db.commit()
+
+    def _purge_stale(self):
+        # Results computed by other model versions are stale
+        self._db.execute("DELETE FROM results WHERE model_version != ?", (self.model_version,))
+
+    def _refresh_version(self):
+        # Called with the lock held
+        if self._version_source is None or time.monotonic() - self._version_checked < self.version_check_seconds:
+            return
+        self._version_checked = time.monotonic()
+        version = self._version_source()
+        if version != self.model_version:
+            self.model_version = version
+            self._purge_stale()
+            self._db.commit()
+
+    def get(self, key):
+        """
+        Returns the cached result dict (with 'mask_png' bytes or None and its
+        'model_version'), or None on a miss.
+        """
+        with self._lock:
+            self._refresh_version()
+            version = self.model_version
+            row = self._db.execute(
+                f"SELECT {', '.join(RESULT_FIELDS)}, mask FROM results WHERE key = ? AND model_version = ?",
+                (key, version),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        result = dict(zip(RESULT_FIELDS, row[:-1]))
+        result["mask_png"] = row[-1]
+        result["model_version"] = version
+        return result
+
+    def put(self, key, mask=None, model_version=None, **fields):
+        """
+        Stores or updates a result. Only the given fields are written.
+
+        Args:
+            key (str): content_key() of the image.
+            mask (np.ndarray): Optional binary mask, stored PNG-compressed.
+            model_version (str): Version of the models that computed the result; results
+                of a version that is no longer current are dropped.
+            **fields: Any of RESULT_FIELDS.
+        """
+        unknown = set(fields) - set(RESULT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown result fields: {sorted(unknown)}")
+
+        values = {name: fields.get(name) for name in RESULT_FIELDS}
+        values["mask"] = encode_mask(mask) if mask is not None else None
+        size = len(values["mask"] or b"") + 256  # rough row overhead
+
+        columns = RESULT_FIELDS + ["mask"]
+        updates = ", ".join(f"{c} = COALESCE(excluded.{c}, {c})" for c in columns)
+        with self._lock:
+            self._refresh_version()
+            if model_version is not None and model_version != self.model_version:
+                return
+            self._db.execute(
+                f"INSERT INTO results (key, model_version, {', '.join(columns)}, size_bytes, last_access) "
+                f"VALUES (?, ?, {', '.join('?' for _ in columns)}, ?, ?) "
+                f"ON CONFLICT(key) DO UPDATE SET {updates}, "
+                "model_version = excluded.model_version, "
+                "size_bytes = MAX(size_bytes, excluded.size_bytes), last_access = excluded.last_access",
+                (key, self.model_version, *[values[c] for c in columns], size, time.time()),
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until usage is back under 90% of the budget
+        target = total - self.max_bytes * 0.9
+        freed = 0
+        stale = []
+        for key, size in self._db.execute("SELECT key, size_bytes FROM results ORDER BY last_access"):
+            stale.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        self._db.executemany("DELETE FROM results WHERE key = ?", stale)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -5,6 +5,7 @@ from src.crop_identifier.crop_predict import predict_crop
 def identify_crop(image_path):
     """
     Identifies crop from leaf image with confidence-based rejection.
+    image_path may be a path or an ImageContext.
     Returns:
         crop_name (str): one of CLASSES or 'unknown'
         confidence (float)
@@ -0,0 +1,139 @@
+# src/common/crops.py
+# Per-crop lookups shared by the pipeline entry points
+
+CROPS = ["apple", "cassava", "corn", "grape", "rice", "tomato"]
+
+# Dataset folder of each crop under dataset/image data/<split>/
+CROP_FOLDERS = {
+    "apple": "apple",
+    "cassava": "cassava",
+    "corn": "corn (maize)",
+    "grape": "grape",
+    "rice": "rice",
+    "tomato": "tomato",
+}
+
+
+def default_class_names(name):
+    """
+    The hard-coded CLASSES list of "crop" (the crop identifier) or a crop.
+    """
+    if name == "crop":
+        module_path = "src.crop_identifier.crop_classes"
+    else:
+        module_path = f"src.{name}.{name}_classes"
+    classes_module = __import__(module_path, fromlist=["CLASSES"])
+    return classes_module.CLASSES
+
+
+def get_class_names(name):
+    """
+    Names of a model's outputs in output order: from the manifest saved with the
+    model, or the hard-coded CLASSES for models trained before manifests existed.
+    """
+    from src.common.models.manifest import load_manifest
+
+    manifest = load_manifest(name)
+    if manifest is not None:
+        return manifest["labels"]
+    return default_class_names(name)
+
+
+def get_disease_classes(crop_name):
+    """
+    Returns the disease class names for a crop without importing its predictor.
+    """
+    return get_class_names(crop_name)
+
+
+SEGMENTATION_MAP = {
+    crop: (f"src.{crop}.segmentation.{crop}_segmentation", f"segment_{crop}_leaf")
+    for crop in CROPS
+}
+
+
+def get_segmenter(crop_name):
+    """
+    Returns the segment_<crop>_leaf function for a crop.
+    """
+    module_path, func_name = SEGMENTATION_MAP[crop_name]
+    seg_module = __import__(module_path, fromlist=[func_name])
+    return getattr(seg_module, func_name)
+
+
+def get_segmentation_utils(crop_name):
+    """
+    Returns the <crop>_segmentation_utils module (read_and_gray, threshold_mask, overlay_mask).
+    """
+    module_path = f"src.{crop_name}.segmentation.{crop_name}_segmentation_utils"
+    return __import__(module_path, fromlist=["threshold_mask"])
+
+
+def get_segmentation_config(crop_name):
+    """
+    Returns the SegmentationConfig of a crop (CONFIG in its segmentation module).
+    """
+    module_path, _ = SEGMENTATION_MAP[crop_name]
+    return __import__(module_path, fromlist=["CONFIG"]).CONFIG
+
+
+def segment_masks(images, crop_name):
+    """
+    Diseased-region masks for a batch of ImageContexts (or BGR arrays) of one
+    crop, computed in one vectorized pass per image size, without overlays.
+    """
+    from src.common.segmentation.engine import segment_batch
+
+    masks, _ = segment_batch(images, get_segmentation_config(crop_name), overlays=False)
+    return masks
+
+
+def segment_mask(image, crop_name):
+    """
+    Diseased-region mask for an ImageContext, without rendering an overlay.
+    """
+    return segment_masks([image], crop_name)[0]
+
+
+def get_severities(images, crop_name, masks=False):
+    """
+    Leaf area, lesion area and severity percent of a batch of ImageContexts (or
+    BGR arrays) of one crop, from the fused severity kernel.
+
+    Returns:
+        severities (list of dicts), masks (list, or None unless masks=True)
+    """
+    from src.common.segmentation.engine import measure_severity
+
+    return measure_severity(list(images), get_segmentation_config(crop_name), masks=masks)
+
+
+def get_severity(image, crop_name):
+    """
+    {"leaf_area", "lesion_area", "severity_percent"} of one image, without a mask or overlay.
+    """
+    return get_severities([image], crop_name)[0][0]
+
+
+def segmentation_fingerprint():
+    """
+    Every crop's segmentation parameters, the segmentation resolution and the
+    kernel version, as a string. Changes whenever a stored mask or severity would come out differently.
+    """
+    from src.common.segmentation.engine import KERNEL_VERSION, RESOLUTION
+
+    configs = ";".join(f"{crop}:{get_segmentation_config(crop)!r}" for crop in CROPS)
+    return f"{configs};resolution:{RESOLUTION};kernel:{KERNEL_VERSION}"
+
+
+def get_generators(name):
+    """
+    Returns the get_<crop>_generators function for "crop" (the crop identifier)
+    or a crop name. Each takes (base_dir, img_size, batch_size, loader).
+    """
+    if name == "crop":
+        module_path, func_name = "src.crop_identifier.crop_preprocessing", "get_crop_generators"
+    else:
+        module_path, func_name = f"src.{name}.{name}_preprocessing", f"get_{name}_generators"
+    module = __import__(module_path, fromlist=[func_name])
+    return getattr(module, func_name)
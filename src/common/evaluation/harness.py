@@ -0,0 +1,172 @@
+# src/common/evaluation/harness.py
+# Evaluates any of the seven models on the test split in one process.
+#
+# The test images are decoded once (or memory-mapped from the compiled
+# dataset) and shared by every model, backend and batch size. Predictions are
+# folded into a confusion matrix batch by batch and never stored, and every
+# predict call is timed for throughput and latency.
+
+import time
+
+import numpy as np
+
+from src.common.crops import CROP_FOLDERS
+from src.common.models.manifest import align_labels, load_manifest
+from src.common.models.tflite_backend import load_backend_model
+from src.common.paths import resolve_model_path
+from src.common.preprocessing.compiled_dataset import FOLDERS, load_split, sample_rows
+from src.crop_identifier.crop_classes import CLASSES as CROP_CLASSES, FOLDER_TO_CLASS
+
+BATCH_SIZES = [1, 32]
+BACKENDS = ["keras"]
+
+
+class ConfusionMatrix:
+    """
+    Streaming confusion matrix (rows: true class, columns: predicted class).
+    """
+
+    def __init__(self, num_classes):
+        self.matrix = np.zeros((num_classes, num_classes), dtype=np.int64)
+
+    def update(self, y_true, y_pred):
+        n = len(self.matrix)
+        self.matrix += np.bincount(y_true * n + y_pred, minlength=n * n).reshape(n, n)
+
+    def accuracy(self):
+        total = self.matrix.sum()
+        return float(np.trace(self.matrix) / total) if total else 0.0
+
+    def per_class(self, class_names):
+        """
+        Precision, recall, F1 and support per class.
+        """
+        tp = np.diag(self.matrix).astype(np.float64)
+        predicted = self.matrix.sum(axis=0)
+        actual = self.matrix.sum(axis=1)
+        precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+        recall = np.divide(tp, actual, out=np.zeros_like(tp), where=actual > 0)
+        f1 = np.divide(2 * precision * recall, precision + recall,
+                       out=np.zeros_like(tp), where=(precision + recall) > 0)
+        return {
+            name: {"precision": precision[i], "recall": recall[i], "f1": f1[i], "support": int(actual[i])}
+            for i, name in enumerate(class_names)
+        }
+
+    def macro_f1(self, class_names):
+        scores = self.per_class(class_names)
+        return float(np.mean([s["f1"] for s in scores.values()])) if scores else 0.0
+
+
+def model_folders(names):
+    """
+    Dataset folders the given models are scored on (None: all, for the crop identifier).
+    """
+    if "crop" in names:
+        return None
+    return [CROP_FOLDERS[name] for name in names]
+
+
+def model_labels(data, name):
+    """
+    Test rows, true labels and class names of one model.
+
+    The crop identifier is scored on every folder; a disease model on its own
+    folder. When the model has a manifest, labels are mapped through its
+    class_indices, so they follow the model's own output order.
+    """
+    if name == "crop":
+        rows = np.concatenate([data.rows(folder) for folder in FOLDERS if folder in data.folders])
+        class_indices = {folder: CROP_CLASSES.index(FOLDER_TO_CLASS[folder]) for folder in FOLDERS}
+        labels, class_names = align_labels(name, class_indices, data.crop_labels[rows])
+        if load_manifest(name) is None:
+            class_names = list(CROP_CLASSES)
+    else:
+        folder = CROP_FOLDERS[name]
+        rows = data.rows(folder)
+        labels, class_names = align_labels(name, data.folders[folder]["class_indices"], data.disease_labels[rows])
+    return rows, labels, class_names
+
+
+def predict_labels(model, data, rows, batch_size=32):
+    """
+    Predicted class of each row, read and scaled one batch at a time.
+    """
+    preds = [
+        np.argmax(model.predict(data.read(rows[start:start + batch_size]).astype(np.float32) / 255.0, verbose=0), axis=1)
+        for start in range(0, len(rows), batch_size)
+    ]
+    return np.concatenate(preds) if preds else np.empty(0, dtype=np.int64)
+
+
+def evaluate_run(model, data, rows, labels, class_names, batch_size, limit=None):
+    """
+    Runs the model over the given rows with one batch size.
+
+    Returns:
+        dict: accuracy, macro F1, per-class scores, confusion matrix, images/sec and
+        per-image latency percentiles (call latency divided by batch size).
+    """
+    if limit:
+        # Spread over the whole list, so every folder and class is sampled
+        keep = np.array(sample_rows(0, len(rows), limit), dtype=np.int64)
+        rows, labels = rows[keep], np.asarray(labels)[keep]
+    confusion = ConfusionMatrix(len(class_names))
+
+    # One untimed call so graph tracing / interpreter allocation is not measured
+    model.predict(data.read(rows[:batch_size]).astype(np.float32) / 255.0, verbose=0)
+
+    latencies, seconds = [], 0.0
+    for start in range(0, len(rows), batch_size):
+        batch = data.read(rows[start:start + batch_size]).astype(np.float32) / 255.0
+        began = time.perf_counter()
+        preds = model.predict(batch, verbose=0)
+        elapsed = time.perf_counter() - began
+        seconds += elapsed
+        latencies.append(elapsed / len(batch))
+        confusion.update(labels[start:start + batch_size], np.argmax(preds, axis=1))
+
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {
+        "batch_size": batch_size,
+        "samples": int(len(rows)),
+        "accuracy": confusion.accuracy(),
+        "macro_f1": confusion.macro_f1(class_names),
+        "images_per_sec": len(rows) / seconds,
+        "per_image_latency_ms": {"p50": p50, "p95": p95, "p99": p99},
+        "per_class": confusion.per_class(class_names),
+        "confusion_matrix": confusion.matrix.tolist(),
+    }
+
+
+def evaluate(names, backends=BACKENDS, batch_sizes=BATCH_SIZES, limit=None, data=None):
+    """
+    Evaluates models on the shared test split.
+
+    Args:
+        names (list): "crop" and/or crop names.
+        backends (list): "keras" and/or "tflite-<quantization>".
+        batch_sizes (list): Batch sizes to time (accuracy is computed for each run).
+        limit (int): Evaluate at most this many test images per model.
+        data: Preloaded test split (default: compiled test split, else decoded once from disk).
+
+    Returns:
+        dict: {"models": {name: {"classes", "runs": [...]}}} ready for json.dump
+    """
+    if data is None:
+        data = load_split("test", folders=model_folders(names))
+    report = {"models": {}}
+    for name in names:
+        rows, labels, class_names = model_labels(data, name)
+        runs = []
+        for backend in backends:
+            model = load_backend_model(resolve_model_path(name), backend)
+            for batch_size in batch_sizes:
+                run = evaluate_run(model, data, rows, labels, class_names, batch_size, limit)
+                run["backend"] = backend
+                runs.append(run)
+                print(f"{name:<8} {backend:<15} batch {batch_size:<4} acc={run['accuracy']:.4f}  "
+                      f"{run['images_per_sec']:8.1f} img/s  p50={run['per_image_latency_ms']['p50']:.2f}ms  "
+                      f"p99={run['per_image_latency_ms']['p99']:.2f}ms")
+        report["models"][name] = {"classes": class_names, "runs": runs}
+    return report
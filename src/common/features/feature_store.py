@@ -0,0 +1,234 @@
+# src/common/features/feature_store.py
+# Frozen-backbone feature store. With train_base=False only the Dense head
+# learns, so the MobileNetV2 embeddings are computed once per image (and per
+# augmented view) and every head is trained directly from them.
+#
+# Layout: <store>/<split>/<dataset folder>/view_<n>/{features,labels}_<shard>.npy
+#         <store>/<split>/<dataset folder>/meta.json
+# view_0 is the plain image; view_1.. are fixed augmented views (train split only).
+
+import json
+import os
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.applications import MobileNetV2
+
+from src.common.crops import CROP_FOLDERS
+from src.common.models.backbone import split_model
+from src.common.models.manifest import data_fingerprint, write_manifest
+from src.common.models.model_base import IMG_SIZE, build_model
+from src.common.paths import DATASET_DIR, FEATURE_STORE_DIR, resolve_model_path
+from src.common.preprocessing.image_utils import create_data_generator, flow_from_index
+
+SPLITS = ["train", "validation", "test"]
+SHARD_SIZE = 4096
+BATCH_SIZE = 64
+BACKBONE_NAME = "mobilenet_v2_imagenet_avg"
+
+
+def build_backbone(img_size=IMG_SIZE):
+    """
+    The frozen base of build_model() followed by its global average pooling.
+    """
+    return MobileNetV2(weights="imagenet", include_top=False, input_shape=(*img_size, 3), pooling="avg")
+
+
+def _folder_dir(split, folder, store_dir):
+    return os.path.join(store_dir, split, folder)
+
+
+def _write_shards(out_dir, batches):
+    """
+    Writes (features, labels) batches as fixed-size float16/int32 shards.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    buffer_x, buffer_y, buffered, shard = [], [], 0, 0
+
+    def _flush():
+        np.save(os.path.join(out_dir, f"features_{shard:05d}.npy"), np.concatenate(buffer_x).astype(np.float16))
+        np.save(os.path.join(out_dir, f"labels_{shard:05d}.npy"), np.concatenate(buffer_y).astype(np.int32))
+
+    for features, labels in batches:
+        buffer_x.append(features)
+        buffer_y.append(labels)
+        buffered += len(features)
+        if buffered >= SHARD_SIZE:
+            _flush()
+            buffer_x, buffer_y, buffered, shard = [], [], 0, shard + 1
+    if buffered:
+        _flush()
+
+
+def extract_folder(backbone, split, folder, views=0, base_dir=DATASET_DIR,
+                   store_dir=FEATURE_STORE_DIR, batch_size=BATCH_SIZE):
+    """
+    Computes and stores embeddings for one dataset folder (e.g. "corn (maize)") of one split.
+
+    Args:
+        views (int): Extra augmented views per training image (ignored for other splits).
+    """
+    image_dir = os.path.join(base_dir, split, folder)
+    out_dir = _folder_dir(split, folder, store_dir)
+    num_views = 1 + (views if split == "train" else 0)
+
+    for view in range(num_views):
+        gen = flow_from_index(
+            create_data_generator(augment=view > 0),
+            image_dir,
+            target_size=IMG_SIZE,
+            batch_size=batch_size,
+            class_mode="sparse",
+            shuffle=False
+        )
+        batches = (
+            (backbone.predict_on_batch(images), labels)
+            for images, labels in (gen[i] for i in range(len(gen)))
+        )
+        _write_shards(os.path.join(out_dir, f"view_{view}"), batches)
+        print(f"{split}/{folder} view {view}: {gen.samples} images")
+
+    meta = {
+        "backbone": BACKBONE_NAME,
+        "class_indices": gen.class_indices,
+        "filenames": gen.filenames,
+        "views": num_views,
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def build_feature_store(folders=None, splits=SPLITS, views=0, base_dir=DATASET_DIR,
+                        store_dir=FEATURE_STORE_DIR, batch_size=BATCH_SIZE):
+    """
+    Builds the store for all crop folders, which every trainer (crop identifier
+    included) reads from.
+    """
+    backbone = build_backbone()
+    for split in splits:
+        for folder in folders or list(CROP_FOLDERS.values()):
+            extract_folder(backbone, split, folder, views, base_dir, store_dir, batch_size)
+
+
+def load_meta(folder, split, store_dir=FEATURE_STORE_DIR):
+    with open(os.path.join(_folder_dir(split, folder, store_dir), "meta.json")) as f:
+        return json.load(f)
+
+
+def load_features(folder, split, views=None, store_dir=FEATURE_STORE_DIR):
+    """
+    Opens a folder's shards as memory maps, without reading the features.
+
+    Args:
+        views (int): Number of stored views to use (default: all).
+
+    Returns:
+        features (list of float16 np.memmap shards), labels (np.ndarray int32), meta (dict)
+    """
+    folder_dir = _folder_dir(split, folder, store_dir)
+    meta = load_meta(folder, split, store_dir)
+
+    features, labels = [], []
+    for view in range(min(views or meta["views"], meta["views"])):
+        view_dir = os.path.join(folder_dir, f"view_{view}")
+        for name in sorted(os.listdir(view_dir)):
+            if name.startswith("features_"):
+                features.append(np.load(os.path.join(view_dir, name), mmap_mode="r"))
+                labels.append(np.load(os.path.join(view_dir, name.replace("features_", "labels_"))))
+    return features, np.concatenate(labels), meta
+
+
+def load_crop_features(split, views=None, store_dir=FEATURE_STORE_DIR):
+    """
+    Feature shards of every crop folder labelled by crop, in crop_classes.CLASSES order.
+    """
+    features, labels = [], []
+    for crop_index, crop_name in enumerate(sorted(CROP_FOLDERS)):
+        shards, folder_labels, _ = load_features(CROP_FOLDERS[crop_name], split, views, store_dir)
+        features.extend(shards)
+        labels.append(np.full(len(folder_labels), crop_index, dtype=np.int32))
+    return features, np.concatenate(labels)
+
+
+def feature_dataset(features, labels, batch_size=32, shuffle=True, seed=None):
+    """
+    tf.data loader over memory-mapped feature shards. Only the rows of the
+    current batch are read and cast to float32.
+
+    Args:
+        features (list): Shards as returned by load_features().
+        labels (np.ndarray): One label per row of the concatenated shards.
+    """
+    offsets = np.cumsum([0] + [len(shard) for shard in features])
+    rng = np.random.default_rng(seed)
+
+    def batches():
+        order = rng.permutation(len(labels)) if shuffle else np.arange(len(labels))
+        for start in range(0, len(order), batch_size):
+            rows = np.sort(order[start:start + batch_size])
+            shard_of_row = np.searchsorted(offsets, rows, side="right") - 1
+            x = np.concatenate([
+                features[shard][rows[shard_of_row == shard] - offsets[shard]]
+                for shard in np.unique(shard_of_row)
+            ])
+            yield x.astype(np.float32), labels[rows]
+
+    return tf.data.Dataset.from_generator(batches, output_signature=(
+        tf.TensorSpec((None, features[0].shape[1]), tf.float32),
+        tf.TensorSpec((None,), tf.int32),
+    )).prefetch(tf.data.AUTOTUNE)
+
+
+def train_head(name, epochs, views=None, batch_size=32, dropout_rate=0.3,
+               learning_rate=0.0001, store_dir=FEATURE_STORE_DIR):
+    """
+    Trains a model's Dense head on stored features and saves the full model
+    (ImageNet backbone + trained head) where its predictor expects it.
+
+    Args:
+        name (str): "crop" or a crop name.
+        epochs (int): Training epochs.
+        views (int): Stored training views to use (default: all).
+
+    Returns:
+        Keras History of the head training
+    """
+    from tensorflow.keras.optimizers import Adam
+
+    if name == "crop":
+        x_train, y_train = load_crop_features("train", views, store_dir)
+        x_val, y_val = load_crop_features("validation", 1, store_dir)
+        class_indices = {CROP_FOLDERS[crop]: i for i, crop in enumerate(sorted(CROP_FOLDERS))}
+        filenames, labels = [], []
+        for folder, crop_index in class_indices.items():
+            folder_files = load_meta(folder, "train", store_dir)["filenames"]
+            filenames.extend(os.path.join(folder, f) for f in folder_files)
+            labels.extend([crop_index] * len(folder_files))
+    else:
+        x_train, y_train, meta = load_features(CROP_FOLDERS[name], "train", views, store_dir)
+        x_val, y_val, _ = load_features(CROP_FOLDERS[name], "validation", 1, store_dir)
+        class_indices = meta["class_indices"]
+        # view_0 rows come first and follow meta["filenames"]
+        filenames, labels = meta["filenames"], y_train[:len(meta["filenames"])]
+        print("Class indices:", class_indices)
+    num_classes = len(class_indices)
+
+    model = build_model(num_classes=num_classes, dropout_rate=dropout_rate, learning_rate=learning_rate)
+    # The head shares its Dropout/Dense layers with `model`, so training it trains the model
+    _, head = split_model(model)
+    head.compile(
+        optimizer=Adam(learning_rate),
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"]
+    )
+    history = head.fit(
+        feature_dataset(x_train, y_train, batch_size),
+        validation_data=feature_dataset(x_val, y_val, batch_size, shuffle=False),
+        epochs=epochs,
+        verbose=1
+    )
+
+    model.save(resolve_model_path(name))
+    write_manifest(name, class_indices, data_fingerprint(filenames, labels))
+    print(f"{name} model trained from feature store and saved!")
+    return history
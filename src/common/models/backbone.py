@@ -0,0 +1,267 @@
+# src/common/models/backbone.py
+# Shared-backbone inference: every model built by build_model() shares the same
+# frozen ImageNet MobileNetV2 base, so it only needs to run once per image.
+
+import threading
+
+import numpy as np
+from tensorflow.keras.layers import GlobalAveragePooling2D, Input
+from tensorflow.keras.models import Model, load_model
+
+from src.common.cache.result_cache import current_model_version
+from src.common.crops import CROPS, get_class_names
+from src.common.models.compiled import compile_model
+from src.common.models.registry import ModelRegistry, model_size_bytes
+from src.common.models.tflite_backend import BACKEND, backend_quantization, load_tflite_part, tflite_path
+from src.common.paths import MODEL_PATHS, resolve_model_path
+from src.crop_identifier.crop_classes import CONFIDENCE_THRESHOLD
+
+
+def _find_pooling_layer(model):
+    for layer in model.layers:
+        if isinstance(layer, GlobalAveragePooling2D):
+            return layer
+    raise ValueError(f"Model '{model.name}' has no GlobalAveragePooling2D layer to split on.")
+
+
+def split_model(model):
+    """
+    Splits a build_model() network into its backbone and classification head.
+
+    Returns:
+        backbone: Model mapping images to the pooled feature vector
+        head: Model mapping the pooled feature vector to class probabilities
+    """
+    pooling = _find_pooling_layer(model)
+    backbone = Model(inputs=model.input, outputs=pooling.output)
+
+    # Re-apply the layers after pooling (Dropout, Dense) on a feature input.
+    # The layers are shared, not copied, so the head keeps the trained weights.
+    head_layers = model.layers[model.layers.index(pooling) + 1:]
+    features = Input(shape=pooling.output.shape[1:])
+    x = features
+    for layer in head_layers:
+        x = layer(x)
+    head = Model(inputs=features, outputs=x, name=f"{model.name}_head")
+
+    return backbone, head
+
+
+def same_weights(backbone_a, backbone_b):
+    weights_a = backbone_a.get_weights()
+    weights_b = backbone_b.get_weights()
+    if len(weights_a) != len(weights_b):
+        return False
+    return all(np.array_equal(a, b) for a, b in zip(weights_a, weights_b))
+
+
+class SplitModel:
+    """
+    Parts of one build_model() network as the engine keeps them: the compiled
+    head, plus the backbone for the crop identifier. Sized for the registry.
+    """
+
+    def __init__(self, head, backbone=None):
+        self.head = head
+        self.backbone = backbone
+        self.size_bytes = model_size_bytes(head) + (model_size_bytes(backbone) if backbone is not None else 0)
+
+
+class SharedBackboneEngine:
+    """
+    Runs MobileNetV2 once per image and reuses the pooled features for the
+    crop head and the disease head of the detected crop.
+
+    Only the crop identifier's backbone is kept; disease models are reduced to
+    their heads when first needed, so the process holds one copy of the
+    backbone weights instead of seven.
+
+    Models are held in a ModelRegistry, so AGROVISION_MAX_MODELS and
+    AGROVISION_MAX_MODEL_MEMORY_MB bound the disease heads (least recently
+    used are evicted and reloaded on demand) and registry.stats() covers them.
+    The crop identifier is pinned: every call needs it.
+
+    With a tflite-* backend the engine loads the parts written by
+    src.export_tflite instead: the crop identifier's backbone and one head per
+    model. The exporter checks the shared backbone, so verify_backbone only
+    applies to Keras models.
+
+    model_version fingerprints the model files as they were when the loaded
+    models were read (it is taken before loading); refresh() reloads them when
+    the files have changed since.
+    """
+
+    def __init__(self, model_paths=None, verify_backbone=True, backend=BACKEND):
+        """
+        Args:
+            model_paths (dict): Model name -> saved model path ("crop" plus one per crop).
+                Defaults to MODEL_PATHS resolved against PROJECT_ROOT.
+            verify_backbone (bool): Check each disease model's backbone weights against
+                the shared one when it is loaded, and refuse models trained with
+                train_base=True (whose heads would mispredict on the shared features).
+            backend (str): 'keras' or 'tflite-<quantization>' (default: AGROVISION_BACKEND).
+        """
+        if model_paths is None:
+            model_paths = {name: resolve_model_path(name) for name in MODEL_PATHS}
+        self.model_paths = model_paths
+        self.verify_backbone = verify_backbone
+        self.quantization = backend_quantization(backend)
+        self.registry = ModelRegistry(loader=self._load, path_resolver=lambda name: name)
+        self._reload_lock = threading.Lock()
+        self._load_crop()
+
+    def _loaded_paths(self):
+        # The files the models are actually read from, for model_version
+        if self.quantization is None:
+            return self.model_paths
+        paths = {f"{name}.head": tflite_path(path, self.quantization, "head")
+                 for name, path in self.model_paths.items()}
+        paths["crop.backbone"] = tflite_path(self.model_paths["crop"], self.quantization, "backbone")
+        return paths
+
+    def _load_crop(self):
+        self.model_version = current_model_version(self._loaded_paths())
+        crop = self.registry.get("crop", pin=True)
+        self.backbone = crop.backbone
+        self._backbone_fn = compile_model(self.backbone) if self.quantization is None else self.backbone
+        self.crop_head = crop.head
+
+    def refresh(self):
+        """
+        Reloads the models if their files changed since they were loaded.
+        Returns: model_version of the models now in use
+        """
+        with self._reload_lock:
+            if current_model_version(self._loaded_paths()) != self.model_version:
+                print("Model files changed; reloading models")
+                self.registry.clear()
+                self._load_crop()
+            return self.model_version
+
+    def _load(self, name):
+        if self.quantization is not None:
+            path = self.model_paths[name]
+            head = load_tflite_part(path, self.quantization, "head")
+            backbone = load_tflite_part(path, self.quantization, "backbone") if name == "crop" else None
+            return SplitModel(head, backbone)
+
+        backbone, head = split_model(load_model(self.model_paths[name]))
+        if name == "crop":
+            return SplitModel(compile_model(head), backbone)
+        if self.verify_backbone and not same_weights(self.backbone, backbone):
+            raise ValueError(
+                f"The {name} model was trained with a fine-tuned backbone "
+                "and cannot share the crop identifier's features."
+            )
+        return SplitModel(compile_model(head))
+
+    def _get_disease_head(self, crop_name):
+        return self.registry.get(crop_name).head
+
+    def preload(self, crops=CROPS):
+        """
+        Loads the disease heads for the given crops up front.
+        """
+        for crop_name in crops:
+            self._get_disease_head(crop_name)
+
+    def extract_features(self, img_array):
+        """
+        Runs the shared backbone on a preprocessed batch.
+        Returns: np.ndarray of shape (batch, features)
+        """
+        return self._backbone_fn.predict(img_array, verbose=0)
+
+    def predict_crop(self, features):
+        """
+        Crop head on cached features, with the same confidence rejection as predict_crop.
+        Returns:
+            (label, confidence) -> (str, float)
+        """
+        return self.predict_crop_batch(features[:1])[0]
+
+    def predict_crop_batch(self, features):
+        """
+        Crop head for a whole batch of cached features in one call.
+        Returns: list of (label, confidence)
+        """
+        preds = self.crop_head.predict(features, verbose=0)
+        crop_classes = get_class_names("crop")
+        results = []
+        for max_confidence, crop_index in zip(np.max(preds, axis=1), np.argmax(preds, axis=1)):
+            if max_confidence < CONFIDENCE_THRESHOLD:
+                results.append(("unknown", float(max_confidence)))
+            else:
+                results.append((crop_classes[crop_index], float(max_confidence)))
+        return results
+
+    def predict_disease(self, crop_name, features):
+        """
+        Disease head of crop_name on cached features.
+        Returns: predicted class index (int)
+        """
+        return self.predict_disease_batch(crop_name, features[:1])[0][0]
+
+    def predict_disease_batch(self, crop_name, features):
+        """
+        Disease head of crop_name for a batch of cached features.
+        Returns: list of (class index, confidence)
+        """
+        preds = self._get_disease_head(crop_name).predict(features, verbose=0)
+        return [(int(i), float(c)) for i, c in zip(np.argmax(preds, axis=1), np.max(preds, axis=1))]
+
+    def analyze(self, img_array):
+        """
+        Crop identification and disease prediction with a single backbone pass.
+
+        Args:
+            img_array (np.ndarray): Preprocessed image batch of size 1
+                (see preprocess_single_image).
+
+        Returns:
+            crop_name (str): one of CLASSES or 'unknown'
+            confidence (float)
+            disease_index (int or None): None when the crop is unknown
+        """
+        crop_name, confidence, disease_index, _ = self.analyze_batch(img_array[:1])[0]
+        return crop_name, confidence, disease_index
+
+    def analyze_batch(self, img_array):
+        """
+        Batched analysis: one backbone and crop-head call for the whole batch,
+        then one disease-head call per detected crop.
+
+        Args:
+            img_array (np.ndarray): Preprocessed image batch (see preprocess_image_batch).
+
+        Returns:
+            list of (crop_name, confidence, disease_index, disease_confidence) in
+            input order; disease fields are None when the crop is unknown.
+        """
+        features = self.extract_features(img_array)
+        crops = self.predict_crop_batch(features)
+
+        results = [(crop_name, confidence, None, None) for crop_name, confidence in crops]
+        groups = {}
+        for i, (crop_name, _) in enumerate(crops):
+            if crop_name != "unknown":
+                groups.setdefault(crop_name, []).append(i)
+
+        for crop_name, indices in groups.items():
+            diseases = self.predict_disease_batch(crop_name, features[indices])
+            for i, (disease_index, disease_confidence) in zip(indices, diseases):
+                results[i] = (crop_name, crops[i][1], disease_index, disease_confidence)
+        return results
+
+
+_engine = None
+
+
+def get_engine():
+    """
+    Returns the process-wide SharedBackboneEngine, creating it on first use.
+    """
+    global _engine
+    if _engine is None:
+        _engine = SharedBackboneEngine()
+    return _engine
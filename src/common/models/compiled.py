@@ -0,0 +1,57 @@
+# src/common/models/compiled.py
+# Low-overhead inference: a tf.function with a fixed input signature replaces
+# model.predict(), which builds a data adapter and callbacks on every call.
+
+import os
+
+import numpy as np
+import tensorflow as tf
+
+COMPILE_MODELS = os.environ.get("AGROVISION_COMPILE", "1") == "1"
+JIT_COMPILE = os.environ.get("AGROVISION_XLA", "0") == "1"
+
+
+class CompiledModel:
+    """
+    Wraps a Keras model in a traced tf.function.
+
+    predict() keeps the Keras call signature so it can stand in for the model
+    anywhere the pipeline calls model.predict(img_array).
+    """
+
+    def __init__(self, model, jit_compile=JIT_COMPILE, warmup=True):
+        """
+        Args:
+            model: Keras model to wrap.
+            jit_compile (bool): Compile the graph with XLA.
+            warmup (bool): Trace the function now instead of on the first request.
+        """
+        self.model = model
+        self.input_shape = tuple(model.input_shape)
+        self._infer = tf.function(
+            lambda x: model(x, training=False),
+            input_signature=[tf.TensorSpec(shape=self.input_shape, dtype=tf.float32)],
+            jit_compile=jit_compile,
+        )
+        if warmup:
+            self(np.zeros((1, *self.input_shape[1:]), dtype=np.float32))
+
+    @property
+    def weights(self):
+        return self.model.weights
+
+    def __call__(self, x):
+        return self._infer(tf.convert_to_tensor(x, dtype=tf.float32)).numpy()
+
+    def predict(self, x, verbose=0, **kwargs):
+        return self(x)
+
+
+def compile_model(model, jit_compile=JIT_COMPILE):
+    """
+    Returns the compiled inference wrapper for a model, or the model itself when
+    AGROVISION_COMPILE=0.
+    """
+    if not COMPILE_MODELS:
+        return model
+    return CompiledModel(model, jit_compile=jit_compile)
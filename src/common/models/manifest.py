@@ -0,0 +1,132 @@
+# src/common/models/manifest.py
+# Manifest written next to every trained model (<stem>.manifest.json).
+#
+# It records what the model's outputs mean and how its inputs were prepared,
+# so inference and evaluation never rescan the dataset to recover
+# class_indices, and the index -> name mapping always matches the weights:
+#
+#   class_indices     training folder -> output index (flow_from_directory order)
+#   labels            display name of each output index
+#   input_size        (height, width) the model was trained on
+#   normalization     pixel scale/offset applied before the model
+#   data_fingerprint  hash of the training file list and labels
+#   model_sha256      hash of the saved model file
+
+import hashlib
+import json
+import os
+import time
+from functools import lru_cache
+
+from src.common.paths import resolve_model_path
+
+NORMALIZATION = {"scale": 1 / 255, "offset": 0.0}
+
+
+def manifest_path(model_path):
+    return os.path.splitext(model_path)[0] + ".manifest.json"
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def data_fingerprint(filenames, labels):
+    """
+    Order-independent hash of (file, label) pairs a model was trained on.
+    """
+    digest = hashlib.sha256()
+    for filename, label in sorted(zip(filenames, (int(label) for label in labels))):
+        digest.update(f"{filename}\t{label}\n".encode())
+    return digest.hexdigest()
+
+
+def output_labels(name, class_indices):
+    """
+    Display names in output order. The crop identifier's folders map through
+    FOLDER_TO_CLASS; disease folders take the crop's CLASSES names, which follow
+    the sorted folder order.
+    """
+    from src.common.crops import default_class_names
+    from src.crop_identifier.crop_classes import FOLDER_TO_CLASS
+
+    folders = sorted(class_indices, key=class_indices.get)
+    if name == "crop":
+        return [FOLDER_TO_CLASS.get(folder, folder) for folder in folders]
+    names = default_class_names(name)
+    return list(names) if len(names) == len(folders) else folders
+
+
+def write_manifest(name, class_indices, fingerprint=None, input_size=(224, 224), model_path=None):
+    """
+    Writes the manifest of a saved model. Call right after model.save().
+    """
+    model_path = model_path or resolve_model_path(name)
+    manifest = {
+        "model": name,
+        "file": os.path.basename(model_path),
+        "class_indices": {folder: int(index) for folder, index in class_indices.items()},
+        "labels": output_labels(name, class_indices),
+        "input_size": list(input_size),
+        "normalization": NORMALIZATION,
+        "data_fingerprint": fingerprint,
+        "model_sha256": file_sha256(model_path),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    with open(manifest_path(model_path), "w") as f:
+        json.dump(manifest, f, indent=2)
+    _read_manifest.cache_clear()
+    return manifest
+
+
+@lru_cache(maxsize=None)
+def _read_manifest(path, mtime_ns):
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_manifest(name):
+    """
+    The manifest of a model, or None for models saved without one. Cached until
+    the file's mtime changes, so a retrained model's manifest is picked up.
+    """
+    path = manifest_path(resolve_model_path(name))
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _read_manifest(path, mtime_ns)
+
+
+def verify_manifest(name):
+    """
+    Raises ValueError when the saved model no longer matches its manifest.
+    """
+    manifest = load_manifest(name)
+    if manifest is None:
+        raise ValueError(f"Model '{name}' has no manifest")
+    actual = file_sha256(resolve_model_path(name))
+    if actual != manifest["model_sha256"]:
+        raise ValueError(f"Model '{name}' was changed after its manifest was written")
+    return manifest
+
+
+def align_labels(name, class_indices, labels):
+    """
+    Maps dataset labels (indices into class_indices) onto a model's output order.
+
+    Returns:
+        labels (np.ndarray), class names: from the manifest when the model has
+        one, otherwise unchanged labels and the class_indices folder names
+    """
+    import numpy as np
+
+    manifest = load_manifest(name)
+    if manifest is None:
+        return np.asarray(labels), sorted(class_indices, key=class_indices.get)
+    to_model = np.array([manifest["class_indices"][folder] for folder in sorted(class_indices, key=class_indices.get)])
+    return to_model[np.asarray(labels)], manifest["labels"]
@@ -0,0 +1,187 @@
+# src/common/models/multitask.py
+# Single-pass multi-task training: one MobileNetV2 base feeds the crop head and
+# all six disease heads. Each image trains the crop head and, through a masked
+# loss, only the disease head of its own crop, so the dataset is streamed once
+# per epoch for all seven models.
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.applications import MobileNetV2
+from tensorflow.keras.layers import Dense, Dropout, GlobalAveragePooling2D
+from tensorflow.keras.models import Model
+from tensorflow.keras.optimizers import Adam
+
+from src.common.crops import CROP_FOLDERS, CROPS
+from src.common.models.manifest import data_fingerprint, write_manifest
+from src.common.models.model_base import IMG_SIZE
+from src.common.paths import COMPILED_DATASET_DIR, resolve_model_path
+from src.common.preprocessing.augmentation import build_augmentation, get_policy
+from src.common.preprocessing.compiled_dataset import CompiledSplit
+from src.crop_identifier.crop_classes import CLASSES as CROP_CLASSES, FOLDER_TO_CLASS
+
+BATCH_SIZE = 32
+
+
+def build_multitask_model(head_classes, img_size=IMG_SIZE, dropout_rate=0.3, learning_rate=0.0001,
+                          train_base=False):
+    """
+    build_model() with one Dropout/Dense head per entry of head_classes on a shared base.
+
+    Args:
+        head_classes (dict): Head name ("crop" or a crop name) -> number of classes.
+
+    Returns:
+        model: compiled Keras Model with one softmax output per head, named after the head
+    """
+    base_model = MobileNetV2(weights="imagenet", include_top=False, input_shape=(*img_size, 3))
+    for layer in base_model.layers:
+        layer.trainable = train_base
+
+    features = GlobalAveragePooling2D()(base_model.output)
+    outputs = [
+        Dense(num_classes, activation="softmax", name=name)(Dropout(dropout_rate, name=f"{name}_dropout")(features))
+        for name, num_classes in head_classes.items()
+    ]
+
+    model = Model(inputs=base_model.input, outputs=outputs)
+    model.compile(
+        optimizer=Adam(learning_rate),
+        loss={name: "sparse_categorical_crossentropy" for name in head_classes},
+        # Weighted, so disease accuracy only counts images of that crop
+        weighted_metrics={name: ["accuracy"] for name in head_classes}
+    )
+    return model
+
+
+def export_models(model, head_names, train_data):
+    """
+    Saves each head as a standalone build_model()-shaped network (base, pooling,
+    dropout, dense) with its manifest, where its *_predict.py expects it.
+    """
+    for name in head_names:
+        single = Model(inputs=model.input, outputs=model.get_layer(name).output, name=f"{name}_model")
+        single.save(resolve_model_path(name))
+        if name == "crop":
+            class_indices = {folder: CROP_CLASSES.index(FOLDER_TO_CLASS[folder]) for folder in FOLDER_TO_CLASS}
+            rows = train_data.rows()
+            labels = train_data.crop_labels[rows]
+        else:
+            class_indices = train_data.folders[CROP_FOLDERS[name]]["class_indices"]
+            rows = train_data.rows(CROP_FOLDERS[name])
+            labels = train_data.disease_labels[rows]
+        fingerprint = data_fingerprint([train_data.filenames[r] for r in rows], labels)
+        write_manifest(name, class_indices, fingerprint, train_data.img_size)
+        print(f"{name} model saved to {resolve_model_path(name)}")
+
+
+def augmentation_policies(head_names):
+    """
+    Training augmentation of each crop's images in the shared stream: the crop's
+    get_policy(), or none for every crop when the crop identifier is trained
+    and switched off with AGROVISION_AUGMENT_OFF.
+    """
+    if "crop" in head_names and get_policy("crop") is None:
+        return {}
+    return {name: get_policy(name) for name in CROP_CLASSES}
+
+
+def make_multitask_dataset(data, head_names, batch_size=BATCH_SIZE, augment=None, shuffle=True, seed=None):
+    """
+    tf.data loader over a compiled split yielding (images, labels, sample weights),
+    with labels and weights keyed by head name. A disease head gets weight 0 for
+    images of other crops.
+
+    Args:
+        data (CompiledSplit): The split to stream.
+        augment (dict): Crop name -> augmentation policy of its images (None or
+            missing: not augmented), e.g. augmentation_policies(head_names).
+    """
+    crop_index = {name: CROP_CLASSES.index(name) for name in head_names if name != "crop"}
+    rng = np.random.default_rng(seed)
+
+    def batches():
+        order = rng.permutation(len(data)) if shuffle else np.arange(len(data))
+        for start in range(0, len(order), batch_size):
+            rows = np.sort(order[start:start + batch_size])
+            yield data.read(rows), data.crop_labels[rows], data.disease_labels[rows]
+
+    ds = tf.data.Dataset.from_generator(batches, output_signature=(
+        tf.TensorSpec((None, *data.img_size, 3), tf.uint8),
+        tf.TensorSpec((None,), tf.int32),
+        tf.TensorSpec((None,), tf.int32),
+    ))
+    ds = ds.map(lambda x, crop, disease: (tf.cast(x, tf.float32) / 255.0, crop, disease),
+                num_parallel_calls=tf.data.AUTOTUNE)
+
+    # One augmentation per distinct policy, applied to the images of its crops
+    groups = {}
+    for name, policy in (augment or {}).items():
+        if policy:
+            groups.setdefault(repr(sorted(policy.items())), (policy, []))[1].append(CROP_CLASSES.index(name))
+    stages = [(build_augmentation(policy, seed), tf.constant(indices, tf.int32)) for policy, indices in groups.values()]
+
+    def augment_batch(x, crop, disease):
+        out = x
+        for augmentation, indices in stages:
+            selected = tf.reduce_any(tf.equal(crop[:, None], indices[None, :]), axis=1)
+            out = tf.where(selected[:, None, None, None], augmentation(x, training=True), out)
+        return out, crop, disease
+
+    if stages:
+        ds = ds.map(augment_batch, num_parallel_calls=tf.data.AUTOTUNE)
+
+    def to_targets(x, crop, disease):
+        labels, weights = {}, {}
+        for name in head_names:
+            if name == "crop":
+                labels[name], weights[name] = crop, tf.ones_like(crop, tf.float32)
+            else:
+                mask = tf.equal(crop, crop_index[name])
+                labels[name] = tf.where(mask, disease, 0)
+                weights[name] = tf.cast(mask, tf.float32)
+        return x, labels, weights
+
+    return ds.map(to_targets).prefetch(tf.data.AUTOTUNE)
+
+
+def train_multitask(epochs, heads=None, batch_size=BATCH_SIZE, train_base=False, dropout_rate=0.3,
+                    learning_rate=0.0001, data_dir=COMPILED_DATASET_DIR):
+    """
+    Trains the crop identifier and disease models together from the compiled
+    dataset and saves each one where its predictor loads it.
+
+    Args:
+        epochs (int): Training epochs (shared by all heads).
+        heads (list): Heads to train, "crop" and/or crop names (default: all seven).
+        train_base (bool): Fine-tune the shared base. Only allowed when all seven
+            heads are trained: the exported models must keep sharing one backbone
+            for the SharedBackboneEngine.
+
+    Returns:
+        Keras History (per-head losses and accuracies)
+    """
+    heads = heads or ["crop"] + CROPS
+    if train_base and set(heads) != {"crop", *CROPS}:
+        raise ValueError("train_base=True fine-tunes the shared backbone, so every head (crop included) "
+                         "must be trained and exported together")
+    train_data = CompiledSplit("train", data_dir)
+    val_data = CompiledSplit("validation", data_dir)
+
+    head_classes = {}
+    for name in heads:
+        if name == "crop":
+            head_classes[name] = len(CROP_CLASSES)
+        else:
+            head_classes[name] = len(train_data.folders[CROP_FOLDERS[name]]["class_indices"])
+            print(f"{name} class indices:", train_data.folders[CROP_FOLDERS[name]]["class_indices"])
+
+    model = build_multitask_model(head_classes, train_data.img_size, dropout_rate, learning_rate, train_base)
+    history = model.fit(
+        make_multitask_dataset(train_data, heads, batch_size, augment=augmentation_policies(heads)),
+        validation_data=make_multitask_dataset(val_data, heads, batch_size, shuffle=False),
+        epochs=epochs,
+        verbose=1
+    )
+
+    export_models(model, heads, train_data)
+    return history
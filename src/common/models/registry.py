@@ -0,0 +1,204 @@
+# src/common/models/registry.py
+# Lazy, memory-bounded model registry. Models are loaded on first use and the
+# least recently used ones are evicted when the count or memory budget is exceeded.
+
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from src.common.paths import MODEL_PATHS, resolve_model_path
+
+# Budgets for the default registry (0 = unlimited)
+MAX_MODELS = int(os.environ.get("AGROVISION_MAX_MODELS", "0"))
+MAX_MEMORY_MB = float(os.environ.get("AGROVISION_MAX_MODEL_MEMORY_MB", "0"))
+
+
+def _load_model(path):
+    # Imported here so that importing the registry does not import TensorFlow
+    from src.common.models.tflite_backend import load_backend_model
+    return load_backend_model(path)
+
+
+def model_size_bytes(model):
+    """
+    Resident size of a model's weights in bytes.
+    """
+    if hasattr(model, "size_bytes"):
+        return model.size_bytes
+    total = 0
+    for weight in model.weights:
+        dtype = getattr(weight.dtype, "as_numpy_dtype", weight.dtype)
+        total += int(np.prod(weight.shape)) * np.dtype(dtype).itemsize
+    return total
+
+
+class ModelRegistry:
+    """
+    Loads models by name on first use and keeps at most `max_models` of them,
+    or at most `max_bytes` of weights, evicting the least recently used.
+    """
+
+    def __init__(self, max_models=MAX_MODELS, max_bytes=MAX_MEMORY_MB * 1024 * 1024,
+                 loader=_load_model, path_resolver=resolve_model_path):
+        """
+        Args:
+            max_models (int): Maximum number of resident models (0 = unlimited).
+            max_bytes (float): Maximum resident weight bytes (0 = unlimited).
+            loader (callable): path -> model.
+            path_resolver (callable): model name -> path.
+        """
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.loader = loader
+        self.path_resolver = path_resolver
+
+        self._models = OrderedDict()
+        self._pinned = set()
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def get(self, name, pin=False):
+        """
+        Returns the model called `name`, loading it if it is not resident.
+
+        Args:
+            pin (bool): Never evict this model (it still counts towards the budget).
+        """
+        with self._lock:
+            if pin:
+                self._pinned.add(name)
+            if name in self._models:
+                self._models.move_to_end(name)
+                self._stats[name]["hits"] += 1
+                return self._models[name]
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        # Load outside the registry lock so other models stay available,
+        # but only once per name when several threads ask at the same time
+        with load_lock:
+            with self._lock:
+                if name in self._models:
+                    self._models.move_to_end(name)
+                    self._stats[name]["hits"] += 1
+                    return self._models[name]
+
+            start = time.perf_counter()
+            model = self.loader(self.path_resolver(name))
+            load_seconds = time.perf_counter() - start
+
+            with self._lock:
+                stats = self._stats.setdefault(name, {"loads": 0, "hits": 0})
+                stats["loads"] += 1
+                stats["load_seconds"] = load_seconds
+                stats["resident_bytes"] = model_size_bytes(model)
+                self._models[name] = model
+                self._evict_over_budget(keep=name)
+            return model
+
+    def _resident_bytes(self):
+        return sum(self._stats[name]["resident_bytes"] for name in self._models)
+
+    def _evict_over_budget(self, keep):
+        evicted = False
+        while True:
+            over_count = self.max_models and len(self._models) > self.max_models
+            over_memory = self.max_bytes and self._resident_bytes() > self.max_bytes
+            if not (over_count or over_memory):
+                break
+            # Least recently used first; pinned models and the one just loaded stay
+            oldest = next((name for name in self._models if name != keep and name not in self._pinned), None)
+            if oldest is None:
+                break
+            del self._models[oldest]
+            evicted = True
+        if evicted:
+            gc.collect()
+
+    def evict(self, name):
+        """
+        Drops a model from memory; it is reloaded on next use.
+        """
+        with self._lock:
+            self._models.pop(name, None)
+            self._pinned.discard(name)
+        gc.collect()
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._pinned.clear()
+        gc.collect()
+
+    def resident(self):
+        """
+        Names of the models currently in memory, least recently used first.
+        """
+        with self._lock:
+            return list(self._models)
+
+    def warmup(self, names=None, background=True):
+        """
+        Loads models ahead of first use.
+
+        Args:
+            names (list): Model names to load (default: all known models).
+            background (bool): Load on a daemon thread and return it immediately.
+
+        Returns:
+            threading.Thread or None
+        """
+        names = list(MODEL_PATHS) if names is None else list(names)
+
+        def _load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"Warmup failed for {name}: {e}")
+
+        if not background:
+            _load_all()
+            return None
+        thread = threading.Thread(target=_load_all, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        """
+        Per-model load time and resident size.
+        Returns:
+            dict: name -> {"loads", "hits", "load_seconds", "resident_bytes", "resident", "pinned"}
+        """
+        with self._lock:
+            return {
+                name: dict(stats, resident=name in self._models, pinned=name in self._pinned)
+                for name, stats in self._stats.items()
+            }
+
+    def report(self):
+        """
+        Prints a one-line summary per model that has been loaded.
+        """
+        for name, stats in sorted(self.stats().items()):
+            print(
+                f"{name:<8} loads={stats['loads']} hits={stats['hits']} "
+                f"load={stats['load_seconds']:.2f}s "
+                f"size={stats['resident_bytes'] / (1024 * 1024):.1f}MB "
+                f"{'resident' if stats['resident'] else 'evicted'}"
+            )
+
+
+# Process-wide registry used by the predictor modules
+registry = ModelRegistry()
+
+
+def get_model(name):
+    """
+    Returns a model from the default registry, loading it on first use.
+    """
+    return registry.get(name)
@@ -0,0 +1,126 @@
+# src/common/models/tflite_backend.py
+# TFLite runtime backend for CPU-only deployments
+
+import os
+import threading
+
+import numpy as np
+
+# keras | tflite-dynamic | tflite-float16 | tflite-int8
+BACKEND = os.environ.get("AGROVISION_BACKEND", "keras")
+QUANTIZATIONS = ["dynamic", "float16", "int8"]
+
+
+def tflite_path(model_path, quantization, part=None):
+    """
+    Path of the exported TFLite file next to a saved .h5 model,
+    e.g. apple/apple_model.h5 -> apple/apple_model.int8.tflite, or with
+    part="head" -> apple/apple_model.head.int8.tflite (see SharedBackboneEngine).
+    """
+    stem = os.path.splitext(model_path)[0]
+    if part is not None:
+        stem = f"{stem}.{part}"
+    return f"{stem}.{quantization}.tflite"
+
+
+def backend_quantization(backend=BACKEND):
+    """
+    Quantization of a 'tflite-<quantization>' backend, None for 'keras'.
+    """
+    if backend == "keras":
+        return None
+    quantization = backend.split("-", 1)[-1]
+    if not backend.startswith("tflite-") or quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown backend '{backend}'. Use keras or tflite-{{{','.join(QUANTIZATIONS)}}}.")
+    return quantization
+
+
+def _make_interpreter(path, num_threads=None):
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        from tensorflow.lite import Interpreter
+    return Interpreter(model_path=path, num_threads=num_threads)
+
+
+class TFLiteModel:
+    """
+    TFLite interpreter with the predict() call used by the pipeline.
+
+    Inputs are quantized and outputs dequantized automatically for int8 models,
+    so callers always pass and receive float32 arrays.
+    """
+
+    def __init__(self, path, num_threads=None):
+        self.path = path
+        self.interpreter = _make_interpreter(path, num_threads)
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = None
+        self._lock = threading.Lock()
+
+    @property
+    def size_bytes(self):
+        # The flatbuffer is what stays resident
+        return os.path.getsize(self.path)
+
+    def _resize(self, batch_size):
+        if batch_size != self._batch_size:
+            shape = [batch_size, *self._input["shape"][1:]]
+            self.interpreter.resize_tensor_input(self._input["index"], shape)
+            self.interpreter.allocate_tensors()
+            self._input = self.interpreter.get_input_details()[0]
+            self._output = self.interpreter.get_output_details()[0]
+            self._batch_size = batch_size
+
+    def _quantize(self, x):
+        scale, zero_point = self._input["quantization"]
+        if self._input["dtype"] == np.float32 or not scale:
+            return x.astype(self._input["dtype"])
+        limits = np.iinfo(self._input["dtype"])
+        return np.clip(np.round(x / scale + zero_point), limits.min, limits.max).astype(self._input["dtype"])
+
+    def _dequantize(self, y):
+        scale, zero_point = self._output["quantization"]
+        if self._output["dtype"] == np.float32 or not scale:
+            return y.astype(np.float32)
+        return (y.astype(np.float32) - zero_point) * scale
+
+    def predict(self, x, verbose=0, **kwargs):
+        x = np.asarray(x, dtype=np.float32)
+        # One interpreter is not safe to invoke from several threads at once
+        with self._lock:
+            self._resize(len(x))
+            self.interpreter.set_tensor(self._input["index"], self._quantize(x))
+            self.interpreter.invoke()
+            return self._dequantize(self.interpreter.get_tensor(self._output["index"]))
+
+    def __call__(self, x):
+        return self.predict(x)
+
+
+def load_backend_model(path, backend=BACKEND):
+    """
+    Loads a saved model with the configured backend.
+
+    Args:
+        path (str): Path of the saved .h5 model.
+        backend (str): 'keras' or 'tflite-<quantization>'.
+    """
+    quantization = backend_quantization(backend)
+    if quantization is None:
+        from tensorflow.keras.models import load_model
+        from src.common.models.compiled import compile_model
+        return compile_model(load_model(path))
+    return load_tflite_part(path, quantization)
+
+
+def load_tflite_part(path, quantization, part=None):
+    """
+    Loads the TFLite export of a saved model, or of one part of it
+    ("backbone" or "head").
+    """
+    exported = tflite_path(path, quantization, part)
+    if not os.path.exists(exported):
+        raise FileNotFoundError(f"{exported} not found. Run: python -m src.export_tflite")
+    return TFLiteModel(exported)
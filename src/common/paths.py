@@ -2,3 +2,42 @@ import os
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 DATASET_DIR = os.path.join(PROJECT_ROOT, "dataset", "image data")
+
+# Backbone embeddings computed once per image (see src/common/features)
+FEATURE_STORE_DIR = os.path.join(PROJECT_ROOT, "features")
+
+# Pre-resized, packed copy of the dataset (see src/compile_dataset.py)
+COMPILED_DATASET_DIR = os.path.join(PROJECT_ROOT, "dataset", "compiled")
+
+# Persistent index of the image tree (see src/index_dataset.py)
+DATASET_INDEX_PATH = os.path.join(PROJECT_ROOT, "dataset", "index.sqlite")
+
+# Saved model files, keyed by model name ("crop" is the crop identifier)
+MODEL_PATHS = {
+    "crop": "src/crop_identifier/crop_model.h5",
+    "apple": "apple/apple_model.h5",
+    "cassava": "cassava/cassava_model.h5",
+    "corn": "corn/corn_model.h5",
+    "grape": "grape/grape_model.h5",
+    "rice": "rice/rice_model.h5",
+    "tomato": os.path.join("tomato", "tomato_model.h5"),
+}
+
+
+def resolve_model_path(name):
+    """
+    Absolute path of a saved model, independent of the working directory.
+    """
+    return os.path.join(PROJECT_ROOT, MODEL_PATHS[name])
+
+
+def parse_model_names(parser, names, known=MODEL_PATHS):
+    """
+    Validates model names given on the command line; none means all of `known`.
+
+    Checked here rather than with argparse choices, which rejects an empty list.
+    """
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        parser.error(f"unknown model(s): {', '.join(unknown)}")
+    return list(names) or list(known)
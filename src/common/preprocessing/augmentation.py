@@ -0,0 +1,92 @@
+# src/common/preprocessing/augmentation.py
+# Training augmentation policies and their batched, in-graph implementation.
+#
+# A policy uses ImageDataGenerator's argument names, so the same policy drives
+# both the legacy per-image generator and the Keras preprocessing layers that
+# transform whole batches inside the tf.data graph (or a model).
+
+import os
+
+import tensorflow as tf
+from tensorflow.keras import layers
+
+# The policy create_data_generator(augment=True) has always used
+DEFAULT_POLICY = {
+    "rotation_range": 20,
+    "width_shift_range": 0.1,
+    "height_shift_range": 0.1,
+    "horizontal_flip": True,
+    "vertical_flip": True,
+    "zoom_range": 0.1,
+}
+
+# Training augmentation per model ("crop" is the crop identifier); None disables it
+AUGMENTATION = {
+    "crop": DEFAULT_POLICY,
+    "apple": DEFAULT_POLICY,
+    "cassava": DEFAULT_POLICY,
+    "corn": DEFAULT_POLICY,
+    "grape": DEFAULT_POLICY,
+    "rice": DEFAULT_POLICY,
+    "tomato": DEFAULT_POLICY,
+}
+
+# Comma-separated models to train without augmentation, e.g. "corn,grape"
+AUGMENT_OFF = {name for name in os.environ.get("AGROVISION_AUGMENT_OFF", "").split(",") if name}
+
+# (horizontal_flip, vertical_flip) -> RandomFlip mode
+FLIP_MODES = {
+    (True, True): "horizontal_and_vertical",
+    (True, False): "horizontal",
+    (False, True): "vertical",
+    (False, False): None,
+}
+
+
+def get_policy(name):
+    """
+    Training augmentation policy of a model, or None when it is switched off.
+    """
+    if name in AUGMENT_OFF:
+        return None
+    return AUGMENTATION[name]
+
+
+def resolve_policy(augment):
+    """
+    Accepts a policy dict, True (DEFAULT_POLICY) or False/None (no augmentation).
+    """
+    if augment is True:
+        return DEFAULT_POLICY
+    return augment or None
+
+
+def build_augmentation(policy=DEFAULT_POLICY, seed=None):
+    """
+    Batched Keras preprocessing layers equivalent to ImageDataGenerator(**policy),
+    with nearest fill like the generator. Layers are only active with training=True.
+    """
+    policy = resolve_policy(policy)
+    steps = []
+    if policy.get("rotation_range"):
+        steps.append(layers.RandomRotation(policy["rotation_range"] / 360, fill_mode="nearest", seed=seed))
+    if policy.get("width_shift_range") or policy.get("height_shift_range"):
+        steps.append(layers.RandomTranslation(
+            policy.get("height_shift_range", 0), policy.get("width_shift_range", 0), fill_mode="nearest", seed=seed
+        ))
+    flip = FLIP_MODES[bool(policy.get("horizontal_flip")), bool(policy.get("vertical_flip"))]
+    if flip:
+        steps.append(layers.RandomFlip(flip, seed=seed))
+    if policy.get("zoom_range"):
+        zoom = policy["zoom_range"]
+        # ImageDataGenerator zooms height and width independently
+        steps.append(layers.RandomZoom((-zoom, zoom), (-zoom, zoom), fill_mode="nearest", seed=seed))
+    return tf.keras.Sequential(steps, name="augmentation")
+
+
+def augment_batches(ds, policy, seed=None):
+    """
+    Maps the augmentation over the image part of an (images, labels) batched dataset.
+    """
+    augmentation = build_augmentation(policy, seed)
+    return ds.map(lambda x, y: (augmentation(x, training=True), y), num_parallel_calls=tf.data.AUTOTUNE)
@@ -0,0 +1,254 @@
+# src/common/preprocessing/compiled_dataset.py
+# Packed, pre-resized copy of the image tree. Each split holds every crop
+# folder as uint8 memmap shards plus a label index, so an epoch is a
+# sequence of memory-mapped reads instead of JPEG decodes and resizes.
+#
+# Layout: <compiled>/<split>/images_<shard>.npy   uint8 (N, H, W, 3)
+#         <compiled>/<split>/crop_labels.npy      int32, index into crop_classes.CLASSES
+#         <compiled>/<split>/disease_labels.npy   int32, index into the folder's class_indices
+#         <compiled>/<split>/index.json           image size, shards, folder row ranges, filenames
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.preprocessing import image
+
+from src.common.paths import COMPILED_DATASET_DIR, DATASET_DIR
+from src.common.preprocessing.tf_data import attach_directory_info, finish_batches, list_image_files
+from src.crop_identifier.crop_classes import CLASSES, FOLDER_TO_CLASS
+
+IMG_SIZE = (224, 224)
+BATCH_SIZE = 32
+SHARD_SIZE = 2048
+SPLITS = ["train", "validation", "test"]
+
+# Dataset folders in crop label order
+FOLDERS = sorted(FOLDER_TO_CLASS, key=lambda folder: CLASSES.index(FOLDER_TO_CLASS[folder]))
+
+
+def _load_resized(path, img_size):
+    # Same decode and nearest-neighbour resize as flow_from_directory
+    return np.asarray(image.load_img(path, target_size=img_size), dtype=np.uint8)
+
+
+def index_split(split, base_dir=DATASET_DIR, folders=None):
+    """
+    Lists one split of the image tree in compiled order: folders one after
+    another in crop label order; within a folder files keep flow_from_directory
+    order, and disease labels follow its sorted class folders.
+
+    Args:
+        folders (list): Dataset folders to list (default: all crop folders).
+
+    Returns:
+        paths, filenames (relative to the split), crop_labels, disease_labels, folders
+        (folder -> {"start", "end", "class_indices"})
+    """
+    selected = FOLDERS if folders is None else [folder for folder in FOLDERS if folder in folders]
+    paths, filenames, crop_labels, disease_labels, folders = [], [], [], [], {}
+    for folder in selected:
+        folder_dir = os.path.join(base_dir, split, folder)
+        if not os.path.isdir(folder_dir):
+            continue
+        names, labels, class_indices = list_image_files(folder_dir)
+        folders[folder] = {"start": len(paths), "end": len(paths) + len(names), "class_indices": class_indices}
+        paths.extend(os.path.join(folder_dir, name) for name in names)
+        filenames.extend(os.path.join(folder, name) for name in names)
+        crop_labels.extend([CLASSES.index(FOLDER_TO_CLASS[folder])] * len(names))
+        disease_labels.extend(labels)
+    return paths, filenames, crop_labels, disease_labels, folders
+
+
+def sample_rows(start, end, limit=None):
+    """
+    Up to `limit` rows spread evenly over [start, end), so every class of a
+    folder is sampled.
+    """
+    if not limit or end - start <= limit:
+        return list(range(start, end))
+    return sorted(set(np.linspace(start, end - 1, limit).astype(int).tolist()))
+
+
+def compile_split(split, base_dir=DATASET_DIR, out_dir=COMPILED_DATASET_DIR, img_size=IMG_SIZE,
+                  shard_size=SHARD_SIZE, workers=None):
+    """
+    Decodes and resizes every image of one split into packed shards.
+
+    Returns:
+        dict: The split's index.
+    """
+    split_dir = os.path.join(out_dir, split)
+    os.makedirs(split_dir, exist_ok=True)
+
+    paths, filenames, crop_labels, disease_labels, folders = index_split(split, base_dir)
+
+    shards = []
+    with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+        for shard, start in enumerate(range(0, len(paths), shard_size)):
+            chunk = paths[start:start + shard_size]
+            name = f"images_{shard:05d}.npy"
+            images = np.lib.format.open_memmap(
+                os.path.join(split_dir, name), mode="w+", dtype=np.uint8, shape=(len(chunk), *img_size, 3)
+            )
+            for i, img in enumerate(pool.map(lambda p: _load_resized(p, img_size), chunk)):
+                images[i] = img
+            images.flush()
+            del images
+            shards.append({"file": name, "count": len(chunk)})
+            print(f"{split}: {start + len(chunk)}/{len(paths)} images")
+
+    np.save(os.path.join(split_dir, "crop_labels.npy"), np.array(crop_labels, dtype=np.int32))
+    np.save(os.path.join(split_dir, "disease_labels.npy"), np.array(disease_labels, dtype=np.int32))
+
+    index = {
+        "img_size": list(img_size),
+        "shards": shards,
+        "folders": folders,
+        "filenames": filenames,
+    }
+    # Written last: a split without index.json is incomplete
+    with open(os.path.join(split_dir, "index.json"), "w") as f:
+        json.dump(index, f)
+    return index
+
+
+class CompiledSplit:
+    """
+    Memory-mapped view of one compiled split.
+    """
+
+    def __init__(self, split, data_dir=COMPILED_DATASET_DIR):
+        split_dir = os.path.join(data_dir, split)
+        index_path = os.path.join(split_dir, "index.json")
+        if not os.path.exists(index_path):
+            raise FileNotFoundError(f"No compiled {split} split in {data_dir}; run `python -m src.compile_dataset`")
+        with open(index_path) as f:
+            index = json.load(f)
+
+        self.img_size = tuple(index["img_size"])
+        self.folders = index["folders"]
+        self.filenames = index["filenames"]
+        self.shards = [np.load(os.path.join(split_dir, s["file"]), mmap_mode="r") for s in index["shards"]]
+        self.offsets = np.cumsum([0] + [s["count"] for s in index["shards"]])
+        self.crop_labels = np.load(os.path.join(split_dir, "crop_labels.npy"))
+        self.disease_labels = np.load(os.path.join(split_dir, "disease_labels.npy"))
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def rows(self, folder=None):
+        """
+        Row numbers of one dataset folder (e.g. "corn (maize)"), or of all folders.
+        """
+        if folder is None:
+            return np.arange(len(self))
+        if folder not in self.folders:
+            raise KeyError(f"Folder '{folder}' is not in the compiled dataset")
+        return np.arange(self.folders[folder]["start"], self.folders[folder]["end"])
+
+    def read(self, rows):
+        """
+        Images for ascending row numbers, as a uint8 array (len(rows), H, W, 3).
+        """
+        out = np.empty((len(rows), *self.img_size, 3), dtype=np.uint8)
+        shard_ids = np.searchsorted(self.offsets, rows, side="right") - 1
+        for shard in np.unique(shard_ids):
+            in_shard = shard_ids == shard
+            out[in_shard] = self.shards[shard][rows[in_shard] - self.offsets[shard]]
+        return out
+
+
+class DecodedSplit(CompiledSplit):
+    """
+    A split decoded into memory straight from the image tree, for when there
+    is no compiled copy. Same interface as CompiledSplit; only `folders` (default:
+    all) are decoded.
+    """
+
+    def __init__(self, split, base_dir=DATASET_DIR, img_size=IMG_SIZE, workers=None, folders=None):
+        paths, self.filenames, crop_labels, disease_labels, self.folders = index_split(split, base_dir, folders)
+        self.img_size = tuple(img_size)
+        self.crop_labels = np.array(crop_labels, dtype=np.int32)
+        self.disease_labels = np.array(disease_labels, dtype=np.int32)
+        self.offsets = np.array([0, len(paths)])
+
+        self.images = np.empty((len(paths), *self.img_size, 3), dtype=np.uint8)
+        with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+            for i, img in enumerate(pool.map(lambda p: _load_resized(p, self.img_size), paths)):
+                self.images[i] = img
+
+    def read(self, rows):
+        return self.images[rows]
+
+
+def load_split(split, img_size=IMG_SIZE, data_dir=COMPILED_DATASET_DIR, base_dir=DATASET_DIR, folders=None):
+    """
+    The compiled split when there is one of the right size, otherwise the split
+    decoded into memory from the image tree.
+
+    Args:
+        folders (list): Dataset folders that will be read (default: all). Only
+            these are decoded when there is no compiled copy.
+    """
+    try:
+        data = CompiledSplit(split, data_dir)
+        if data.img_size == tuple(img_size):
+            return data
+    except FileNotFoundError:
+        pass
+    return DecodedSplit(split, base_dir, img_size, folders=folders)
+
+
+def make_compiled_dataset(split, folder=None, img_size=IMG_SIZE, batch_size=BATCH_SIZE, augment=False,
+                          shuffle=True, seed=None, data_dir=COMPILED_DATASET_DIR):
+    """
+    tf.data loader over a compiled split, with the same batches, labels and
+    attributes as tf_data.make_dataset.
+
+    Args:
+        folder (str): Dataset folder for a disease model; None gives the whole
+            split labelled by crop (the crop identifier).
+    """
+    data = CompiledSplit(split, data_dir)
+    if data.img_size != tuple(img_size):
+        raise ValueError(f"Compiled dataset is {data.img_size}, not {tuple(img_size)}; recompile with --img-size")
+
+    rows = data.rows(folder)
+    if folder is None:
+        labels = data.crop_labels[rows]
+        class_indices = {f: CLASSES.index(FOLDER_TO_CLASS[f]) for f in FOLDERS}
+    else:
+        labels = data.disease_labels[rows]
+        class_indices = data.folders[folder]["class_indices"]
+
+    rng = np.random.default_rng(seed)
+
+    def batches():
+        order = rng.permutation(len(rows)) if shuffle else np.arange(len(rows))
+        for start in range(0, len(order), batch_size):
+            # Ascending rows within a batch keep the memmap reads sequential
+            batch = np.sort(order[start:start + batch_size])
+            yield data.read(rows[batch]), labels[batch]
+
+    ds = tf.data.Dataset.from_generator(batches, output_signature=(
+        tf.TensorSpec((None, *img_size, 3), tf.uint8),
+        tf.TensorSpec((None,), tf.int32),
+    ))
+    ds = ds.map(lambda x, y: (tf.cast(x, tf.float32) / 255.0, y), num_parallel_calls=tf.data.AUTOTUNE)
+    ds = finish_batches(ds, len(class_indices), augment, seed)
+    return attach_directory_info(ds, class_indices, labels, [data.filenames[r] for r in rows])
+
+
+def get_compiled_datasets(folder=None, img_size=IMG_SIZE, batch_size=BATCH_SIZE, augment=True,
+                          data_dir=COMPILED_DATASET_DIR):
+    """
+    Compiled-dataset counterpart of the get_<crop>_generators functions.
+    Returns: train_ds, val_ds, test_ds
+    """
+    train_ds = make_compiled_dataset("train", folder, img_size, batch_size, augment=augment, data_dir=data_dir)
+    val_ds = make_compiled_dataset("validation", folder, img_size, batch_size, shuffle=False, data_dir=data_dir)
+    test_ds = make_compiled_dataset("test", folder, img_size, batch_size, shuffle=False, data_dir=data_dir)
+    return train_ds, val_ds, test_ds
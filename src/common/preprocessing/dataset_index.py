@@ -0,0 +1,276 @@
+# src/common/preprocessing/dataset_index.py
+# Persistent index of the image tree: one row per image with its split, crop
+# folder, class, size, mtime and content hash.
+#
+# Updates are incremental. A directory whose mtime is unchanged has the same
+# entries as last time, so only its known subdirectories are visited; only
+# directories with added, removed or renamed entries are listed again, and
+# only new or changed files are hashed. Listings and counts are then answered
+# from the index without touching the filesystem.
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from src.common.paths import DATASET_DIR, DATASET_INDEX_PATH
+
+WHITE_LIST_FORMATS = (".png", ".jpg", ".jpeg", ".bmp", ".ppm", ".tif", ".tiff")
+
+# "0" makes the loaders walk the directory tree even when an index exists
+USE_INDEX = os.environ.get("AGROVISION_DATASET_INDEX", "1") == "1"
+
+# Seconds to wait for another process's write (sqlite's default is 5)
+BUSY_TIMEOUT = 60.0
+
+
+def _join(rel, name):
+    return f"{rel}/{name}" if rel else name
+
+
+def _sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DatasetIndex:
+    """
+    SQLite index of every image under `root` (paths stored relative to it,
+    as <split>/<folder>/<class>/.../<file>).
+    """
+
+    def __init__(self, path=DATASET_INDEX_PATH, root=DATASET_DIR, timeout=BUSY_TIMEOUT):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.root = os.path.abspath(root)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS dirs ("
+            " path TEXT PRIMARY KEY, parent TEXT, mtime_ns INTEGER NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, dir TEXT NOT NULL, split TEXT, folder TEXT, class TEXT,"
+            " size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, sha256 TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS files_dir ON files (dir)")
+        self._db.commit()
+
+    def update(self, full=False, hash_files=True, workers=None):
+        """
+        Brings the index up to date with the directory tree.
+
+        Args:
+            full (bool): List every directory, ignoring unchanged mtimes (also
+                catches files rewritten in place).
+            hash_files (bool): Compute content hashes of new and changed files.
+
+        Returns:
+            dict: Directories listed/skipped and files added/changed/removed.
+        """
+        stats = {"dirs_listed": 0, "dirs_skipped": 0, "added": 0, "changed": 0, "removed": 0}
+        with self._lock:
+            try:
+                to_hash = self._update(full, stats)
+            except sqlite3.OperationalError:
+                self._db.rollback()
+                raise
+
+        if hash_files and to_hash:
+            self._hash(to_hash, workers)
+        return stats
+
+    def _update(self, full, stats):
+        known = dict(self._db.execute("SELECT path, mtime_ns FROM dirs"))
+        children = defaultdict(list)
+        for path, parent in self._db.execute("SELECT path, parent FROM dirs"):
+            children[parent].append(path)
+
+        seen, to_hash, stack = set(), [], [""]
+        while stack:
+            rel = stack.pop()
+            try:
+                mtime_ns = os.stat(os.path.join(self.root, rel)).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            seen.add(rel)
+            if not full and known.get(rel) == mtime_ns:
+                stats["dirs_skipped"] += 1
+                stack.extend(children[rel])
+                continue
+
+            stats["dirs_listed"] += 1
+            subdirs, files = [], {}
+            for entry in os.scandir(os.path.join(self.root, rel)):
+                if entry.is_dir():
+                    subdirs.append(_join(rel, entry.name))
+                elif entry.is_file() and entry.name.lower().endswith(WHITE_LIST_FORMATS):
+                    st = entry.stat()
+                    files[_join(rel, entry.name)] = (st.st_size, st.st_mtime_ns)
+            self._sync_dir(rel, files, to_hash, stats)
+            self._db.execute(
+                "INSERT OR REPLACE INTO dirs (path, parent, mtime_ns) VALUES (?, ?, ?)",
+                (rel, rel.rpartition("/")[0] if rel else None, mtime_ns)
+            )
+            stack.extend(subdirs)
+
+        gone = [path for path in known if path not in seen]
+        for path in gone:
+            stats["removed"] += self._db.execute("DELETE FROM files WHERE dir = ?", (path,)).rowcount
+            self._db.execute("DELETE FROM dirs WHERE path = ?", (path,))
+        self._db.commit()
+        return to_hash
+
+    def _sync_dir(self, rel, files, to_hash, stats):
+        existing = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in self._db.execute("SELECT path, size, mtime_ns FROM files WHERE dir = ?", (rel,))
+        }
+        for path in existing.keys() - files.keys():
+            self._db.execute("DELETE FROM files WHERE path = ?", (path,))
+            stats["removed"] += 1
+        for path, (size, mtime_ns) in files.items():
+            if existing.get(path) == (size, mtime_ns):
+                continue
+            stats["changed" if path in existing else "added"] += 1
+            parts = path.split("/")
+            self._db.execute(
+                "INSERT OR REPLACE INTO files (path, dir, split, folder, class, size, mtime_ns, sha256)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, NULL)",
+                (path, rel, parts[0] if len(parts) > 1 else None, parts[1] if len(parts) > 2 else None,
+                 parts[2] if len(parts) > 3 else None, size, mtime_ns)
+            )
+            to_hash.append(path)
+
+    def _hash(self, paths, workers=None):
+        with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+            hashes = list(pool.map(lambda p: _sha256(os.path.join(self.root, p)), paths))
+        with self._lock:
+            self._db.executemany("UPDATE files SET sha256 = ? WHERE path = ?", zip(hashes, paths))
+            self._db.commit()
+
+    def covers(self, directory):
+        """
+        True if directory lies inside the indexed tree.
+        """
+        directory = os.path.abspath(directory)
+        return os.path.commonpath([directory, self.root]) == self.root
+
+    def _rel(self, directory):
+        rel = os.path.relpath(os.path.abspath(directory), self.root).replace(os.sep, "/")
+        return "" if rel == "." else rel
+
+    def _subdirs(self, rel):
+        return sorted(
+            path.rpartition("/")[2]
+            for (path,) in self._db.execute("SELECT path FROM dirs WHERE parent = ?", (rel,))
+        )
+
+    def list_subdirs(self, directory):
+        """
+        Sorted names of the subdirectories of `directory`, from the dirs table.
+        """
+        with self._lock:
+            return self._subdirs(self._rel(directory))
+
+    def list_directory(self, directory, classes=None):
+        """
+        Drop-in for tf_data.list_image_files, answered from the index: class
+        folders are the subdirectories of `directory` (sorted, or the given
+        list in its order) and files keep sorted os.walk order.
+
+        Returns:
+            filenames (relative to directory), labels (np.ndarray), class_indices (dict)
+        """
+        import numpy as np
+
+        rel = self._rel(directory)
+        with self._lock:
+            if classes is None:
+                classes = self._subdirs(rel)
+            class_indices = dict(zip(classes, range(len(classes))))
+
+            filenames, labels = [], []
+            for class_name in classes:
+                prefix = _join(rel, class_name)
+                # Everything under prefix/ ("0" is the character after "/")
+                rows = self._db.execute(
+                    "SELECT dir, path FROM files WHERE path >= ? AND path < ? ORDER BY dir, path",
+                    (prefix + "/", prefix + "0")
+                )
+                for _, path in rows:
+                    filenames.append(os.path.join(*path[len(rel) + 1 if rel else 0:].split("/")))
+                    labels.append(class_indices[class_name])
+        return filenames, np.array(labels, dtype=np.int32), class_indices
+
+    def counts(self):
+        """
+        Image counts as {split: {folder: {class: n}}}, without touching the filesystem.
+        """
+        counts = defaultdict(lambda: defaultdict(dict))
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT split, folder, class, COUNT(*) FROM files GROUP BY split, folder, class"
+            ).fetchall()
+        for split, folder, class_name, n in rows:
+            counts[split][folder][class_name] = n
+        return {split: dict(folders) for split, folders in counts.items()}
+
+    def count(self, split=None, folder=None):
+        query, args = "SELECT COUNT(*) FROM files WHERE 1=1", []
+        if split is not None:
+            query, args = query + " AND split = ?", args + [split]
+        if folder is not None:
+            query, args = query + " AND folder = ?", args + [folder]
+        with self._lock:
+            return self._db.execute(query, args).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """
+    The shared index, refreshed incrementally on first use in this process.
+    None when no index has been built (python -m src.index_dataset) or it is disabled.
+
+    Only the listing is refreshed here; content hashes are left to
+    src.index_dataset. When another process keeps the database locked past
+    BUSY_TIMEOUT (e.g. a full update), the index is used as that process last
+    committed it.
+    """
+    global _index
+    if not USE_INDEX or not os.path.exists(DATASET_INDEX_PATH):
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = DatasetIndex()
+            try:
+                _index.update(hash_files=False)
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                print(f"Dataset index is locked by another process; using it without refreshing ({e})")
+    return _index
+
+
+def list_subdirs(directory):
+    """
+    Sorted subdirectory names of `directory`, from the index when it covers it.
+    """
+    index = get_index()
+    if index is not None and index.covers(directory):
+        return index.list_subdirs(directory)
+    return sorted(d for d in os.listdir(directory) if os.path.isdir(os.path.join(directory, d)))
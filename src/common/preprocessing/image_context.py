@@ -0,0 +1,93 @@
+# src/common/preprocessing/image_context.py
+# Decode-once image shared by every pipeline stage
+
+import cv2
+import numpy as np
+
+IMG_HEIGHT = 224
+IMG_WIDTH = 224
+
+# Keep pixels as stored, like the PIL loader the models were trained through:
+# OpenCV would otherwise apply the EXIF orientation and rotate phone photos
+READ_FLAGS = cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION
+
+
+class ImageContext:
+    """
+    Holds one decoded image and derives the views each stage needs on first use:
+    - bgr: full-resolution BGR array (segmentation, overlays)
+    - rgb: full-resolution RGB array (display)
+    - gray: full-resolution grayscale plane (thresholding)
+    - model_input: 224x224 RGB float32 in [0, 1] (crop and disease models)
+    """
+
+    def __init__(self, bgr, path=None):
+        self.bgr = bgr
+        self.path = path
+        self._rgb = None
+        self._gray = None
+        self._model_input = None
+
+    @classmethod
+    def from_path(cls, image_path):
+        img = cv2.imread(image_path, READ_FLAGS)
+        if img is None:
+            raise ValueError(f"Could not read image: {image_path}")
+        return cls(img, path=image_path)
+
+    @classmethod
+    def from_bytes(cls, data):
+        img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), READ_FLAGS)
+        if img is None:
+            raise ValueError("Data is not a decodable image.")
+        return cls(img)
+
+    @property
+    def shape(self):
+        return self.bgr.shape
+
+    @property
+    def rgb(self):
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+    @property
+    def gray(self):
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def model_input(self):
+        if self._model_input is None:
+            # load_img's default (PIL NEAREST, which the models were trained with)
+            # samples pixel centres; INTER_NEAREST_EXACT does too, INTER_NEAREST
+            # floors dst * scale and shifts the image. See src.check_preprocessing.
+            # Resized before the channel swap, so no full-size RGB copy is kept.
+            resized = cv2.resize(self.bgr, (IMG_WIDTH, IMG_HEIGHT), interpolation=cv2.INTER_NEAREST_EXACT)
+            self._model_input = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB).astype(np.float32) / 255.0
+        return self._model_input
+
+    def release(self):
+        """
+        Drops the full-resolution views once no stage needs them; model_input
+        (computed now if it was not yet) stays available.
+        """
+        self.model_input
+        self.bgr = self._rgb = self._gray = None
+
+    def batch(self):
+        """
+        Model input as a batch of one, like preprocess_single_image().
+        """
+        return self.model_input[np.newaxis]
+
+
+def as_context(image):
+    """
+    Returns `image` if it already is an ImageContext, otherwise decodes the path.
+    """
+    if isinstance(image, ImageContext):
+        return image
+    return ImageContext.from_path(image)
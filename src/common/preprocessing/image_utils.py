@@ -4,38 +4,65 @@ import os
 import numpy as np
 from tensorflow.keras.preprocessing import image
 from tensorflow.keras.preprocessing.image import ImageDataGenerator
+from src.common.preprocessing.augmentation import resolve_policy
+from src.common.preprocessing.dataset_index import get_index
+from src.common.preprocessing.image_context import ImageContext
 
 # Constants
 IMG_HEIGHT = 224
 IMG_WIDTH = 224
 BATCH_SIZE = 16
 
+# Training/test input pipeline: "keras" (ImageDataGenerator), "tfdata" (parallel tf.data)
+# or "compiled" (pre-resized memmap shards, see src/compile_dataset.py)
+DATA_LOADER = os.environ.get("AGROVISION_DATA_LOADER", "keras")
+
+
 def create_data_generator(rescale=1./255, augment=False):
     """
     Returns a Keras ImageDataGenerator.
     
     Args:
         rescale (float): Rescaling factor for pixel values.
-        augment (bool): Whether to apply data augmentation.
+        augment (bool or dict): Whether to apply data augmentation, or the
+            augmentation policy to apply (see augmentation.py).
     
     Returns:
         ImageDataGenerator object
     """
-    if augment:
-        return ImageDataGenerator(
-            rescale=rescale,
-            rotation_range=20,
-            width_shift_range=0.1,
-            height_shift_range=0.1,
-            horizontal_flip=True,
-            vertical_flip=True,
-            zoom_range=0.1
-        )
+    policy = resolve_policy(augment)
+    if policy:
+        return ImageDataGenerator(rescale=rescale, **policy)
     else:
         return ImageDataGenerator(rescale=rescale)
 
 
-def get_data_generator_for_crop(crop_name, base_path="dataset/image data", augment=False):
+def flow_from_index(datagen, directory, classes=None, **kwargs):
+    """
+    datagen.flow_from_directory(directory, ...) with the file listing answered
+    from the dataset index when it covers `directory`: same files, order and
+    class indices, without walking the tree.
+
+    Args:
+        datagen (ImageDataGenerator): Generator to flow from.
+        classes (list): Class folders, in output order (default: all, sorted).
+        **kwargs: flow_from_directory arguments (target_size, batch_size, class_mode, shuffle, ...).
+    """
+    index = get_index()
+    if index is None or not index.covers(directory):
+        return datagen.flow_from_directory(directory, classes=classes, **kwargs)
+
+    import pandas as pd
+
+    filenames, labels, class_indices = index.list_directory(directory, classes)
+    names = list(class_indices)
+    df = pd.DataFrame({"filename": filenames, "class": [names[label] for label in labels]})
+    # The index already lists existing files, so skip flow_from_dataframe's per-file check
+    return datagen.flow_from_dataframe(df, directory=directory, x_col="filename", y_col="class",
+                                       classes=names, validate_filenames=False, **kwargs)
+
+
+def get_data_generator_for_crop(crop_name, base_path="dataset/image data", augment=False, loader=DATA_LOADER):
     """
     Returns train, validation, and test generators for any crop dynamically.
     
@@ -43,6 +70,7 @@ def get_data_generator_for_crop(crop_name, base_path="dataset/image data", augme
         crop_name (str): Name of the crop folder.
         base_path (str): Root dataset folder.
         augment (bool): Whether to apply augmentation on training set.
+        loader (str): "keras" for ImageDataGenerator, "tfdata" or "compiled" for tf.data datasets.
     
     Returns:
         train_gen, val_gen, test_gen
@@ -51,21 +79,31 @@ def get_data_generator_for_crop(crop_name, base_path="dataset/image data", augme
     val_dir = os.path.join(base_path, "validation", crop_name)
     test_dir = os.path.join(base_path, "test", crop_name)
 
-    train_gen = create_data_generator(augment=augment).flow_from_directory(
+    if loader == "tfdata":
+        from src.common.preprocessing.tf_data import get_split_datasets
+        return get_split_datasets(train_dir, val_dir, test_dir, (IMG_HEIGHT, IMG_WIDTH), BATCH_SIZE, augment)
+    if loader == "compiled":
+        from src.common.preprocessing.compiled_dataset import get_compiled_datasets
+        return get_compiled_datasets(crop_name, (IMG_HEIGHT, IMG_WIDTH), BATCH_SIZE, augment)
+
+    train_gen = flow_from_index(
+        create_data_generator(augment=augment),
         train_dir,
         target_size=(IMG_HEIGHT, IMG_WIDTH),
         batch_size=BATCH_SIZE,
         class_mode="categorical"
     )
 
-    val_gen = create_data_generator(augment=False).flow_from_directory(
+    val_gen = flow_from_index(
+        create_data_generator(augment=False),
         val_dir,
         target_size=(IMG_HEIGHT, IMG_WIDTH),
         batch_size=BATCH_SIZE,
         class_mode="categorical"
     )
 
-    test_gen = create_data_generator(augment=False).flow_from_directory(
+    test_gen = flow_from_index(
+        create_data_generator(augment=False),
         test_dir,
         target_size=(IMG_HEIGHT, IMG_WIDTH),
         batch_size=BATCH_SIZE,
@@ -81,11 +119,56 @@ def preprocess_single_image(img_path):
     Preprocessing for a single image path for prediction.
     
     Args:
-        img_path (str): Path to image file.
+        img_path (str or ImageContext): Path to image file, or an already decoded image.
     
     Returns:
         np.ndarray: Preprocessed image ready for model prediction.
     """
+    if isinstance(img_path, ImageContext):
+        return img_path.batch()
     img = image.load_img(img_path, target_size=(IMG_HEIGHT, IMG_WIDTH))
     img_array = image.img_to_array(img) / 255.0
     return np.expand_dims(img_array, axis=0)
+
+
+def preprocessing_difference(img_path):
+    """
+    Largest absolute difference between the decode-once ImageContext model
+    input and preprocess_single_image() (the load_img path the models were
+    trained through) for one image file; 0.0 when they agree.
+    """
+    from_context = ImageContext.from_path(img_path).model_input
+    from_pil = preprocess_single_image(img_path)[0]
+    return float(np.abs(from_context - from_pil).max())
+
+
+def preprocess_image_batch(images, scale=None):
+    """
+    Preprocessing for many images at once.
+
+    Args:
+        images (list): Image paths (str or os.PathLike), ImageContexts and/or RGB arrays
+            (H, W, 3). Arrays of another size are resized.
+        scale (float): Factor applied to arrays. By default uint8 arrays and arrays with
+            values above 1 (0-255 floats) are rescaled by 1/255, others are taken as
+            already in [0, 1].
+
+    Returns:
+        np.ndarray: Batch of shape (len(images), IMG_HEIGHT, IMG_WIDTH, 3).
+    """
+    batch = np.empty((len(images), IMG_HEIGHT, IMG_WIDTH, 3), dtype=np.float32)
+    for i, img in enumerate(images):
+        if isinstance(img, (str, os.PathLike, ImageContext)):
+            batch[i] = preprocess_single_image(img if isinstance(img, ImageContext) else os.fspath(img))[0]
+            continue
+        img_array = np.asarray(img)
+        if scale is not None:
+            img_scale = scale
+        elif img_array.dtype == np.uint8 or (img_array.size and img_array.max() > 1.):
+            img_scale = 1. / 255
+        else:
+            img_scale = 1.
+        if img_array.shape[:2] != (IMG_HEIGHT, IMG_WIDTH):
+            img_array = image.smart_resize(img_array, (IMG_HEIGHT, IMG_WIDTH))
+        batch[i] = img_array * img_scale
+    return batch
@@ -0,0 +1,113 @@
+# src/common/preprocessing/raster.py
+# Windowed readers for images too large to decode whole (drone orthomosaics).
+#
+# Every reader exposes height, width and read(top, left, height, width), which
+# returns one window as a uint8 BGR array; only that window is ever in memory.
+#
+#   .npy          memory-mapped (H, W, 3) BGR array
+#   .tif / .tiff  rasterio windowed reads (tiled and compressed GeoTIFFs) if
+#                 installed, otherwise tifffile memory mapping (uncompressed TIFFs)
+#   other         decoded whole with OpenCV (JPEG/PNG cannot be read by window)
+
+import os
+import threading
+
+import cv2
+import numpy as np
+
+
+def to_bgr8(window, rgb=True):
+    """
+    uint8 BGR view of a window: gray is repeated, alpha dropped, 16-bit scaled.
+    """
+    if window.dtype == np.uint16:
+        window = (window >> 8).astype(np.uint8)
+    elif window.dtype != np.uint8:
+        raise ValueError(f"Unsupported pixel type {window.dtype}")
+    if window.ndim == 2:
+        return np.repeat(window[..., np.newaxis], 3, axis=-1)
+    window = window[..., :3]
+    return np.ascontiguousarray(window[..., ::-1] if rgb else window)
+
+
+class ArrayRaster:
+    """
+    An in-memory or memory-mapped (H, W, C) array.
+    """
+
+    def __init__(self, array, rgb=False):
+        self.array = array
+        self.rgb = rgb
+        self.height, self.width = array.shape[:2]
+
+    def read(self, top, left, height, width):
+        return to_bgr8(np.asarray(self.array[top:top + height, left:left + width]), self.rgb)
+
+    def close(self):
+        self.array = None
+
+
+class RasterioRaster:
+    """
+    Windowed reads through rasterio, with one dataset handle per thread.
+    """
+
+    def __init__(self, path):
+        import rasterio
+        from rasterio.windows import Window
+
+        self._rasterio = rasterio
+        self._window = Window
+        self.path = path
+        self._local = threading.local()
+        self._handles = []
+        self._lock = threading.Lock()
+        dataset = self._dataset()
+        self.height, self.width = dataset.height, dataset.width
+        # RGB(A) -> first three bands; anything else -> first band as gray
+        self.bands = [1, 2, 3] if dataset.count >= 3 else [1]
+
+    def _dataset(self):
+        if getattr(self._local, "dataset", None) is None:
+            self._local.dataset = self._rasterio.open(self.path)
+            with self._lock:
+                self._handles.append(self._local.dataset)
+        return self._local.dataset
+
+    def read(self, top, left, height, width):
+        window = self._window(left, top, width, height)
+        bands = self._dataset().read(self.bands, window=window)  # (bands, h, w), RGB order
+        return to_bgr8(np.moveaxis(bands, 0, -1) if len(self.bands) > 1 else bands[0])
+
+    def close(self):
+        with self._lock:
+            for dataset in self._handles:
+                dataset.close()
+            self._handles = []
+
+
+def open_raster(path):
+    """
+    The windowed reader for an image file (see the module comment).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npy":
+        return ArrayRaster(np.load(path, mmap_mode="r"))
+    if ext in (".tif", ".tiff"):
+        try:
+            return RasterioRaster(path)
+        except ImportError:
+            pass
+        try:
+            import tifffile
+        except ImportError:
+            raise ImportError("Reading TIFFs by window needs rasterio or tifffile (pip install rasterio)")
+        try:
+            return ArrayRaster(tifffile.memmap(path, mode="r"), rgb=True)
+        except ValueError:
+            raise ValueError(f"{path} is compressed or tiled; tifffile can only memory-map "
+                             "uncompressed TIFFs. Install rasterio to read it by window")
+    img = cv2.imread(path, cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError(f"Could not read image: {path}")
+    return ArrayRaster(img)
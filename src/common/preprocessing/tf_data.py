@@ -0,0 +1,186 @@
+# src/common/preprocessing/tf_data.py
+# tf.data input pipeline with the same split, class-ordering and augmentation
+# semantics as ImageDataGenerator.flow_from_directory, but with parallel
+# decoding, in-graph augmentation, prefetching and optional caching.
+
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from src.common.preprocessing.augmentation import augment_batches, resolve_policy
+from src.common.preprocessing.dataset_index import WHITE_LIST_FORMATS, get_index
+
+IMG_SIZE = (224, 224)
+BATCH_SIZE = 32
+
+# "" = no cache, "memory" = cache decoded images in RAM, anything else = cache
+# directory, holding one file per dataset (see cache_path)
+DATA_CACHE = os.environ.get("AGROVISION_DATA_CACHE", "")
+# Decoded images held for shuffling when reading back a file cache (~150 KB each at 224x224)
+FILE_CACHE_SHUFFLE_BUFFER = 2048
+# Order in which a shuffled dataset's file cache is written
+FILE_CACHE_ORDER_SEED = 0
+
+
+def list_image_files(directory, classes=None):
+    """
+    Lists images the way flow_from_directory does: classes are the sorted
+    subfolders (or the given list, in its order) and files are walked in
+    sorted order inside each class folder.
+
+    Answered from the dataset index when one has been built for this tree.
+
+    Returns:
+        filenames (list of str relative to directory), labels (np.ndarray), class_indices (dict)
+    """
+    index = get_index()
+    if index is not None and index.covers(directory):
+        return index.list_directory(directory, classes)
+
+    if classes is None:
+        classes = sorted(d for d in os.listdir(directory) if os.path.isdir(os.path.join(directory, d)))
+    class_indices = dict(zip(classes, range(len(classes))))
+
+    filenames, labels = [], []
+    for class_name in classes:
+        class_dir = os.path.join(directory, class_name)
+        for root, _, files in sorted(os.walk(class_dir)):
+            for name in sorted(files):
+                if name.lower().endswith(WHITE_LIST_FORMATS):
+                    filenames.append(os.path.relpath(os.path.join(root, name), directory))
+                    labels.append(class_indices[class_name])
+    return filenames, np.array(labels, dtype=np.int32), class_indices
+
+
+def _decode(img_size):
+    def decode(path, label):
+        img = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+        # flow_from_directory resizes with nearest-neighbour interpolation by
+        # default; nearest keeps uint8, so a cache holds 1 byte per channel
+        return tf.image.resize(img, img_size, method="nearest"), label
+    return decode
+
+
+def _to_float(img, label):
+    return tf.cast(img, tf.float32) / 255.0, label
+
+
+def cache_path(cache_dir, name, directory, classes, img_size, shuffle):
+    """
+    File cache of one dataset: <cache_dir>/<name>-<hash of directory, classes,
+    size and order>, so splits, crops and concurrent trainers never share one.
+    """
+    key = json.dumps([os.path.abspath(directory), classes, list(img_size), shuffle])
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, f"{name}-{hashlib.sha1(key.encode()).hexdigest()[:16]}")
+
+
+def make_dataset(directory, classes=None, img_size=IMG_SIZE, batch_size=BATCH_SIZE,
+                 augment=False, shuffle=True, cache=DATA_CACHE, seed=None, cache_name="data"):
+    """
+    Returns a batched tf.data.Dataset of (images, one-hot labels) for a directory
+    laid out like flow_from_directory expects.
+
+    The dataset also carries the flow_from_directory attributes used by the
+    trainers and test scripts: class_indices, classes, filenames and samples.
+
+    Args:
+        classes (list): Class folder names, in label order (default: sorted subfolders).
+        augment (bool or dict): Augmentation policy applied in-graph, per batch
+            (True for the default policy, see augmentation.py).
+        shuffle (bool): Reshuffle the files every epoch (with a file cache, within a
+            FILE_CACHE_SHUFFLE_BUFFER window over a once-shuffled file order).
+        cache (str): "" (none), "memory", or a directory to cache decoded images in.
+        cache_name (str): Prefix of the cache file, e.g. the split.
+    """
+    filenames, labels, class_indices = list_image_files(directory, classes)
+    paths = [os.path.join(directory, f) for f in filenames]
+    num_classes = len(class_indices)
+
+    if cache:
+        file_order = np.arange(len(paths))
+        if shuffle and cache != "memory":
+            # The file cache is read back through a bounded shuffle window, so write
+            # it in a fixed random order: in class order, windows would be single-class
+            file_order = np.random.default_rng(FILE_CACHE_ORDER_SEED).permutation(len(paths))
+        ds = tf.data.Dataset.from_tensor_slices(([paths[i] for i in file_order], labels[file_order]))
+        # Decode and cache, then shuffle the cached images: a shuffle before the
+        # cache would be recorded once and replayed every epoch
+        ds = ds.map(_decode(img_size), num_parallel_calls=tf.data.AUTOTUNE)
+        if cache == "memory":
+            ds = ds.cache()
+        else:
+            ds = ds.cache(cache_path(cache, cache_name, directory, classes, img_size, shuffle))
+        if shuffle:
+            buffer_size = len(paths) if cache == "memory" else min(len(paths), FILE_CACHE_SHUFFLE_BUFFER)
+            ds = ds.shuffle(max(buffer_size, 1), seed=seed, reshuffle_each_iteration=True)
+        ds = ds.map(_to_float, num_parallel_calls=tf.data.AUTOTUNE)
+    else:
+        ds = tf.data.Dataset.from_tensor_slices((paths, labels))
+        # Without a cache, shuffling the paths is cheaper than shuffling images
+        if shuffle:
+            ds = ds.shuffle(max(len(paths), 1), seed=seed, reshuffle_each_iteration=True)
+        ds = ds.map(_decode(img_size), num_parallel_calls=tf.data.AUTOTUNE, deterministic=not shuffle)
+        ds = ds.map(_to_float, num_parallel_calls=tf.data.AUTOTUNE)
+    ds = finish_batches(ds.batch(batch_size), num_classes, augment, seed)
+    return attach_directory_info(ds, class_indices, labels, filenames)
+
+
+def finish_batches(ds, num_classes, augment=False, seed=None):
+    """
+    Shared tail of every tf.data loader: optional in-graph augmentation of
+    (images, sparse labels) batches, one-hot labels, prefetch.
+    """
+    policy = resolve_policy(augment)
+    if policy:
+        ds = augment_batches(ds, policy, seed)
+    ds = ds.map(lambda x, y: (x, tf.one_hot(y, num_classes)))
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def attach_directory_info(ds, class_indices, labels, filenames):
+    """
+    Sets the flow_from_directory attributes the trainers and test scripts read.
+    """
+    ds.class_indices = class_indices
+    ds.classes = labels
+    ds.filenames = filenames
+    ds.samples = len(filenames)
+    return ds
+
+
+def get_split_datasets(train_dir, val_dir, test_dir, img_size=IMG_SIZE, batch_size=BATCH_SIZE,
+                       augment=True, classes=None):
+    """
+    tf.data counterpart of the get_<crop>_generators functions.
+    Returns: train_ds, val_ds, test_ds (test is not shuffled, so .classes lines up with predictions)
+    """
+    class_lists = classes or {}
+    train_ds = make_dataset(train_dir, class_lists.get("train"), img_size, batch_size, augment=augment,
+                            cache_name="train")
+    val_ds = make_dataset(val_dir, class_lists.get("validation"), img_size, batch_size, shuffle=False,
+                          cache_name="validation")
+    test_ds = make_dataset(test_dir, class_lists.get("test"), img_size, batch_size, shuffle=False,
+                           cache_name="test")
+    return train_ds, val_ds, test_ds
+
+
+def measure_throughput(data, num_batches=50):
+    """
+    Images/sec delivered by a dataset or Keras generator, after one warm-up batch.
+    """
+    iterator = iter(data)
+    next(iterator)
+    images = 0
+    start = time.perf_counter()
+    for _ in range(num_batches):
+        try:
+            batch, _ = next(iterator)
+        except StopIteration:
+            break
+        images += len(batch)
+    return images / (time.perf_counter() - start)
@@ -0,0 +1,106 @@
+# src/common/segmentation/calibration.py
+# Severity error of segmenting on pyramid levels instead of full resolution.
+#
+# Every sampled test image is measured at full resolution and at each level;
+# the report gives the absolute severity error (percentage points), how often
+# the Mild/Moderate/Severe level changes, and the time per image, overall and
+# per crop, so a resolution can be picked per deployment.
+
+import time
+
+import numpy as np
+
+from src.common.analysis.severity import infection_severity
+from src.common.crops import CROP_FOLDERS, get_segmentation_config
+from src.common.paths import DATASET_DIR
+from src.common.preprocessing.compiled_dataset import index_split, sample_rows
+from src.common.segmentation.engine import as_bgr, measure_severity
+
+LEVELS = ["1/2", "1/4", "1/8", "512", "256"]
+
+
+def _timed(image, config, resolution):
+    began = time.perf_counter()
+    severity, _ = measure_severity(image, config, resolution=resolution)
+    return severity["severity_percent"], time.perf_counter() - began
+
+
+def summarize(errors, agreements, seconds, full_seconds):
+    """
+    Error statistics of one level over a set of images.
+    """
+    errors = np.asarray(errors, dtype=np.float64)
+    if not len(errors):
+        return {"images": 0}
+    abs_errors = np.abs(errors)
+    return {
+        "images": int(len(errors)),
+        "mean_abs_error": float(abs_errors.mean()),
+        "p95_abs_error": float(np.percentile(abs_errors, 95)),
+        "max_abs_error": float(abs_errors.max()),
+        "bias": float(errors.mean()),
+        "level_agreement": float(np.mean(agreements)),
+        "ms_per_image": sum(seconds) / len(seconds) * 1000,
+        "speedup": sum(full_seconds) / sum(seconds) if sum(seconds) else None,
+    }
+
+
+def calibrate(levels=LEVELS, split="test", limit=None, base_dir=DATASET_DIR):
+    """
+    Compares severity at each level against full resolution.
+
+    Args:
+        levels (list): Segmentation resolutions (see engine.RESOLUTION).
+        limit (int): Images sampled per crop (default: all).
+
+    Returns:
+        dict: {"split", "full_ms_per_image", "levels": {level: {"overall", "crops": {crop: stats}}}}
+            ready for json.dump
+    """
+    paths, _, _, _, folders = index_split(split, base_dir)
+    crop_of_folder = {folder: crop for crop, folder in CROP_FOLDERS.items()}
+
+    # level -> crop -> lists of errors / level agreements / seconds
+    results = {level: {} for level in levels}
+    full_seconds = {}
+    for folder, info in folders.items():
+        crop = crop_of_folder.get(folder)
+        if crop is None:
+            continue
+        config = get_segmentation_config(crop)
+        full_seconds[crop] = []
+        for level in levels:
+            results[level][crop] = ([], [], [])
+
+        for row in sample_rows(info["start"], info["end"], limit):
+            image = as_bgr(paths[row])
+            full_percent, seconds = _timed(image, config, None)
+            full_seconds[crop].append(seconds)
+            for level in levels:
+                percent, seconds = _timed(image, config, level)
+                errors, agreements, times = results[level][crop]
+                errors.append(percent - full_percent)
+                agreements.append(infection_severity(percent) == infection_severity(full_percent))
+                times.append(seconds)
+        print(f"{crop}: {len(full_seconds[crop])} images")
+
+    all_full = [s for seconds in full_seconds.values() for s in seconds]
+    report = {
+        "split": split,
+        "full_ms_per_image": sum(all_full) / len(all_full) * 1000 if all_full else None,
+        "levels": {},
+    }
+    for level, crops in results.items():
+        report["levels"][level] = {
+            "overall": summarize(
+                [e for errors, _, _ in crops.values() for e in errors],
+                [a for _, agreements, _ in crops.values() for a in agreements],
+                [t for _, _, times in crops.values() for t in times],
+                all_full,
+            ),
+            "crops": {
+                crop: summarize(errors, agreements, times, full_seconds[crop])
+                for crop, (errors, agreements, times) in crops.items()
+            },
+        }
+    return report
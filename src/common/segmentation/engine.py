@@ -0,0 +1,369 @@
+# src/common/segmentation/engine.py
+# Threshold segmentation shared by every crop. Each crop's segment_<crop>_leaf
+# is a SegmentationConfig over this engine.
+#
+# Masks are computed for a whole stacked batch (N, H, W, 3) of BGR images at
+# once. Grayscale uses OpenCV's fixed-point BGR2GRAY weights, so the lesion
+# test matches cv2.cvtColor + cv2.threshold(THRESH_BINARY_INV).
+#
+# Severity is one fused pass per strip of rows: each pixel is classified as
+# background, leaf or lesion and only the counts are kept, so no full-size
+# gray plane, mask or overlay is allocated unless a caller asks for one.
+#
+# Segmentation can run on a smaller pyramid level of the image (RESOLUTION);
+# areas are still reported in source pixels, and masks are only upsampled
+# when a full-resolution overlay is rendered. python -m
+# src.calibrate_segmentation reports the severity error of each level.
+
+import os
+
+import cv2
+import numpy as np
+
+from src.common.preprocessing.image_context import ImageContext
+
+COLOR_SPACES = ("gray", "value", "green")
+
+# cv2 BGR2GRAY: gray = (B*1868 + G*9617 + R*4899 + 2**13) >> 14
+_GRAY_WEIGHTS = (1868, 9617, 4899)
+_GRAY_SHIFT = 14
+
+# Non-lesion pixels whose chroma (max - min of B, G, R) is below this are
+# background (paper, sky, grey soil, glare); 0 counts the whole image as leaf.
+# Lesion pixels always count as leaf: dark necrotic tissue such as black rot,
+# BGR (20, 20, 25), has almost no chroma, and masks stay the plain threshold mask.
+LEAF_CHROMA = 20
+# Segmentation resolution: "full", a pyramid factor ("1/2", "1/4", "0.25") or
+# the long side in pixels ("512"). Images are never upsampled.
+RESOLUTION = os.environ.get("AGROVISION_SEG_RESOLUTION", "full")
+
+# Bumped whenever the same config would classify pixels differently, so
+# cached severities computed by an older kernel are invalidated
+KERNEL_VERSION = 2
+
+# Pixels per strip of the fused kernel (across the batch): bounds its
+# temporaries to a few MB whatever the image size
+STRIP_PIXELS = 1 << 20
+
+
+class SegmentationConfig:
+    """
+    Per-crop segmentation parameters.
+
+    Args:
+        threshold (int): Pixels whose channel value is <= threshold are diseased.
+        color_space (str): Channel that is thresholded: "gray" (luma), "value"
+            (HSV V, the brightest of B, G, R) or "green".
+        alpha (float): Mask weight in the overlay.
+        leaf_chroma (int): Minimum chroma of a healthy leaf pixel; lower is
+            background, which is not part of the leaf area. Lesion pixels are
+            leaf whatever their chroma.
+    """
+
+    def __init__(self, threshold=128, color_space="gray", alpha=0.3, leaf_chroma=LEAF_CHROMA):
+        if color_space not in COLOR_SPACES:
+            raise ValueError(f"Unknown color space '{color_space}'. Expected one of {COLOR_SPACES}")
+        self.threshold = int(threshold)
+        self.color_space = color_space
+        self.alpha = float(alpha)
+        self.leaf_chroma = int(leaf_chroma)
+
+    def __repr__(self):
+        return (f"SegmentationConfig(threshold={self.threshold}, color_space={self.color_space!r}, "
+                f"alpha={self.alpha}, leaf_chroma={self.leaf_chroma})")
+
+
+def as_bgr(image):
+    """
+    BGR array of an ImageContext, an image path or an array.
+    """
+    if isinstance(image, ImageContext):
+        return image.bgr
+    if isinstance(image, str):
+        img = cv2.imread(image)
+        if img is None:
+            raise ValueError(f"Could not read image: {image}")
+        return img
+    return np.asarray(image, dtype=np.uint8)
+
+
+def parse_resolution(resolution):
+    """
+    None for full resolution, a scale factor in (0, 1) (float) or a long side
+    in pixels (int), from a RESOLUTION string or number.
+    """
+    if resolution is None or resolution in ("", "full"):
+        return None
+    if isinstance(resolution, str):
+        if "/" in resolution:
+            numerator, denominator = resolution.split("/")
+            resolution = float(numerator) / float(denominator)
+        else:
+            resolution = float(resolution) if "." in resolution else int(resolution)
+    if isinstance(resolution, float):
+        if not 0 < resolution <= 1:
+            raise ValueError(f"Scale factor must be in (0, 1], got {resolution}")
+        return None if resolution == 1 else resolution
+    if resolution < 1:
+        raise ValueError(f"Long side must be a positive number of pixels, got {resolution}")
+    return int(resolution)
+
+
+def level_size(height, width, resolution):
+    """
+    (height, width) of an image at a segmentation resolution.
+    """
+    resolution = parse_resolution(resolution)
+    if resolution is None:
+        return height, width
+    scale = resolution if isinstance(resolution, float) else resolution / max(height, width)
+    if scale >= 1:
+        return height, width
+    return max(1, round(height * scale)), max(1, round(width * scale))
+
+
+def to_level(image, resolution):
+    """
+    The image at a segmentation resolution (area-averaged), or itself at full resolution.
+    """
+    height, width = image.shape[:2]
+    size = level_size(height, width, resolution)
+    if size == (height, width):
+        return image
+    return cv2.resize(image, (size[1], size[0]), interpolation=cv2.INTER_AREA)
+
+
+def upsample_mask(mask, height, width):
+    """
+    A mask computed on a pyramid level, back at source resolution.
+    """
+    if mask.shape[:2] == (height, width):
+        return mask
+    return cv2.resize(mask, (width, height), interpolation=cv2.INTER_NEAREST)
+
+
+def _weighted_gray(images):
+    # uint32 B*1868 + G*9617 + R*4899. dtype= keeps every product in uint32 (a
+    # uint8 plane times a small scalar would otherwise be computed in uint16).
+    weighted = np.multiply(images[..., 0], _GRAY_WEIGHTS[0], dtype=np.uint32)
+    for c in (1, 2):
+        weighted += np.multiply(images[..., c], _GRAY_WEIGHTS[c], dtype=np.uint32)
+    return weighted
+
+
+def to_channel(images, color_space="gray"):
+    """
+    The thresholded channel of a BGR image or stacked batch, as uint8.
+    """
+    images = np.asarray(images, dtype=np.uint8)
+    if color_space == "gray":
+        return ((_weighted_gray(images) + (1 << (_GRAY_SHIFT - 1))) >> _GRAY_SHIFT).astype(np.uint8)
+    if color_space == "value":
+        return images.max(axis=-1)
+    return images[..., 1]
+
+
+def _classify(images, config):
+    # Leaf and lesion pixels of a strip (leaf is None when everything is leaf)
+    if config.color_space == "gray":
+        # Compare the weighted sum directly instead of rounding it to a gray plane:
+        # (s + 2**13) >> 14 <= t  <=>  s < ((t + 1) << 14) - 2**13
+        limit = ((config.threshold + 1) << _GRAY_SHIFT) - (1 << (_GRAY_SHIFT - 1))
+        lesion = _weighted_gray(images) < limit
+    else:
+        lesion = to_channel(images, config.color_space) <= config.threshold
+    if not config.leaf_chroma:
+        return None, lesion
+    chroma = images.max(axis=-1)
+    chroma -= images.min(axis=-1)
+    leaf = chroma >= config.leaf_chroma
+    leaf |= lesion
+    return leaf, lesion
+
+
+def _measure(images, config, masks, strip_pixels):
+    # Fused kernel over a single image (H, W, 3) or stacked batch (N, H, W, 3)
+    row_pixels = int(np.prod(images.shape[:-3])) * images.shape[-2]
+    strip_rows = max(1, strip_pixels // max(row_pixels, 1))
+    leaf_area = np.zeros(images.shape[:-3], dtype=np.int64)
+    lesion_area = np.zeros(images.shape[:-3], dtype=np.int64)
+    out = np.empty(images.shape[:-1], dtype=np.uint8) if masks else None
+    for top in range(0, images.shape[-3], strip_rows):
+        strip = images[..., top:top + strip_rows, :, :]
+        leaf, lesion = _classify(strip, config)
+        lesion_area += np.count_nonzero(lesion, axis=(-2, -1))
+        if leaf is None:
+            leaf_area += strip.shape[-3] * strip.shape[-2]
+        else:
+            leaf_area += np.count_nonzero(leaf, axis=(-2, -1))
+        if out is not None:
+            out[..., top:top + strip_rows, :] = lesion
+    if out is not None:
+        np.multiply(out, 255, out=out)
+    return leaf_area, lesion_area, out
+
+
+def _severity(leaf_area, lesion_area, area_scale=1.0):
+    # Percent from the counts; areas in source pixels when measured on a pyramid level
+    leaf_area, lesion_area = int(leaf_area), int(lesion_area)
+    return {
+        "leaf_area": round(leaf_area * area_scale),
+        "lesion_area": round(lesion_area * area_scale),
+        "severity_percent": lesion_area / leaf_area * 100 if leaf_area else 0.0,
+    }
+
+
+def compute_masks(images, config, strip_pixels=STRIP_PIXELS):
+    """
+    Lesion masks (255 lesion, 0 healthy leaf or background) of a stacked batch.
+
+    Args:
+        images (np.ndarray): uint8 BGR, (N, H, W, 3) or a single (H, W, 3).
+
+    Returns:
+        np.ndarray: uint8 masks, (N, H, W) or (H, W).
+    """
+    return _measure(np.asarray(images, dtype=np.uint8), config, True, strip_pixels)[2]
+
+
+def _batches(arrays):
+    # Same-size images smaller than a strip are stacked so they share one pass;
+    # larger ones already fill whole strips and go one at a time, uncopied
+    groups = {}
+    for i, array in enumerate(arrays):
+        groups.setdefault(array.shape, []).append(i)
+    for shape, indices in groups.items():
+        if len(indices) > 1 and shape[0] * shape[1] < STRIP_PIXELS:
+            yield indices, np.stack([arrays[i] for i in indices])
+        else:
+            for i in indices:
+                yield [i], arrays[i][np.newaxis]
+
+
+def measure_severity(images, config, masks=False, resolution=RESOLUTION, strip_pixels=STRIP_PIXELS):
+    """
+    Leaf area, lesion area and severity percent (lesion / leaf) in one fused
+    pass over each image.
+
+    Args:
+        images: A BGR image, a stacked uint8 batch (N, H, W, 3), or a list of
+            ImageContexts, paths or arrays.
+        masks (bool): Also return the lesion masks (at the segmentation resolution).
+        resolution: Pyramid level to segment on (see RESOLUTION); areas are
+            reported in source pixels either way.
+
+    Returns:
+        severities, masks (None when masks=False): a dict {"leaf_area",
+        "lesion_area", "severity_percent"} and mask for a single image, otherwise
+        lists in input order.
+    """
+    resolution = parse_resolution(resolution)
+    single = isinstance(images, np.ndarray) and images.ndim == 3
+    if resolution is None and isinstance(images, np.ndarray) and images.ndim in (3, 4):
+        leaf_area, lesion_area, out = _measure(np.asarray(images, dtype=np.uint8), config, masks, strip_pixels)
+        if single:
+            return _severity(leaf_area, lesion_area), out
+        return [_severity(*areas) for areas in zip(leaf_area, lesion_area)], out
+
+    arrays = [as_bgr(image) for image in ([images] if single else images)]
+    levels = [to_level(array, resolution) for array in arrays]
+    severities = [None] * len(arrays)
+    out = [None] * len(arrays) if masks else None
+    for indices, batch in _batches(levels):
+        leaf_area, lesion_area, batch_masks = _measure(batch, config, masks, strip_pixels)
+        for j, i in enumerate(indices):
+            area_scale = arrays[i].shape[0] * arrays[i].shape[1] / (batch.shape[1] * batch.shape[2])
+            severities[i] = _severity(leaf_area[j], lesion_area[j], area_scale)
+            if masks:
+                out[i] = batch_masks[j]
+    if single:
+        return severities[0], out[0] if masks else None
+    return severities, out
+
+
+def render_overlays(images, masks, alpha=0.3):
+    """
+    Blends binary masks into their images, like cv2.addWeighted(img, 1 - alpha,
+    mask, alpha, 0), through two 256-entry lookup tables instead of a
+    full-size BGR copy of the mask. Works on single images and stacked batches.
+    """
+    levels = np.arange(256, dtype=np.float64) * (1 - alpha)
+    background = np.clip(np.rint(levels), 0, 255).astype(np.uint8)
+    lesion = np.clip(np.rint(levels + 255 * alpha), 0, 255).astype(np.uint8)
+    images = np.asarray(images, dtype=np.uint8)
+    selected = np.asarray(masks) > 0
+    overlays = background[images]
+    overlays[selected] = lesion[images[selected]]
+    return overlays
+
+
+def segment_batch(images, config, overlays=True, resolution=RESOLUTION):
+    """
+    Segments a batch of images with one config.
+
+    Args:
+        images: Stacked uint8 BGR array (N, H, W, 3), or a list of ImageContexts,
+            paths or arrays. Small images of the same size in a list are
+            stacked into one vectorized pass.
+        overlays (bool): Also render the overlays.
+        resolution: Pyramid level to segment on (see RESOLUTION).
+
+    Returns:
+        masks, overlays (None when overlays=False): stacked arrays for a stacked
+        input at full resolution, otherwise lists in input order. Masks are at
+        the segmentation resolution unless overlays are rendered.
+    """
+    resolution = parse_resolution(resolution)
+    if resolution is None and isinstance(images, np.ndarray) and images.ndim == 4:
+        masks = compute_masks(images, config)
+        return masks, render_overlays(images, masks, config.alpha) if overlays else None
+
+    arrays = [as_bgr(image) for image in images]
+    levels = [to_level(array, resolution) for array in arrays]
+    masks = [None] * len(arrays)
+    rendered = [None] * len(arrays) if overlays else None
+    for indices, batch in _batches(levels):
+        batch_masks = compute_masks(batch, config)
+        for j, i in enumerate(indices):
+            masks[i] = batch_masks[j]
+            if overlays:
+                masks[i] = upsample_mask(masks[i], *arrays[i].shape[:2])
+                rendered[i] = render_overlays(arrays[i], masks[i], config.alpha)
+    return masks, rendered
+
+
+def segment_image(image, config, resolution=RESOLUTION):
+    """
+    Mask and overlay of one ImageContext, path or BGR array, both at full
+    resolution (the mask is upsampled when segmented on a pyramid level).
+    """
+    img = as_bgr(image)
+    mask = upsample_mask(compute_masks(to_level(img, resolution), config), *img.shape[:2])
+    return mask, render_overlays(img, mask, config.alpha)
+
+
+# Single-image helpers re-exported by the <crop>_segmentation_utils modules
+
+def read_and_gray(image_path):
+    """
+    Read image and convert to grayscale.
+    Accepts an ImageContext to reuse an image that was already decoded.
+    """
+    if isinstance(image_path, ImageContext):
+        return image_path.bgr, image_path.gray
+    img = as_bgr(image_path)
+    return img, to_channel(img, "gray")
+
+
+def threshold_mask(gray_img, thresh_val=128):
+    """
+    Apply simple inverse binary threshold to create mask.
+    """
+    return (np.asarray(gray_img) <= thresh_val).astype(np.uint8) * np.uint8(255)
+
+
+def overlay_mask(img, mask, alpha=0.3):
+    """
+    Overlay mask on original image.
+    """
+    return render_overlays(img, mask, alpha)
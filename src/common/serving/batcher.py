@@ -0,0 +1,163 @@
+# src/common/serving/batcher.py
+# Dynamic micro-batching: requests that arrive within a short window are
+# coalesced into one model call.
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128]
+
+
+class MicroBatcher:
+    """
+    Queues single items and runs them through `process_batch` in batches of at
+    most `max_batch_size`, waiting at most `max_latency_ms` after the first item
+    of a batch for more items to arrive.
+    """
+
+    def __init__(self, process_batch, max_batch_size=32, max_latency_ms=10, max_queue_size=1024):
+        """
+        Args:
+            process_batch (callable): list of items -> list of results (same order).
+            max_batch_size (int): Largest batch handed to process_batch.
+            max_latency_ms (float): Longest time the first item of a batch waits for company.
+            max_queue_size (int): submit() blocks once this many items are waiting.
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+
+        self._metrics_lock = threading.Lock()
+        self._batch_sizes = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self._latencies = deque(maxlen=10000)
+        self._batches = 0
+        self._items = 0
+
+        # submit() puts under this lock, so nothing is queued behind close()'s sentinel
+        self._submit_lock = threading.Lock()
+        self._closed = False
+        self._running = True
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, item):
+        """
+        Queues an item.
+        Returns: concurrent.futures.Future resolved with the item's result
+        Raises: RuntimeError once the batcher is closed
+        """
+        future = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def __call__(self, item, timeout=None):
+        return self.submit(item).result(timeout)
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is None:
+                self._running = False
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        try:
+            self._process()
+        finally:
+            # Never leave a future pending: fail whatever is still queued, also
+            # if the worker stopped on an unexpected error
+            self._fail_queued()
+            with self._submit_lock:
+                self._closed = True
+            self._fail_queued()
+
+    def _fail_queued(self):
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if entry is not None:
+                entry[1].set_exception(RuntimeError("MicroBatcher is closed"))
+
+    def _process(self):
+        while self._running:
+            batch = self._collect()
+            if not batch:
+                break
+            items = [item for item, _, _ in batch]
+            try:
+                results = list(self.process_batch(items))
+                if len(results) != len(batch):
+                    # zip() would leave the futures past the shorter side unresolved forever
+                    raise ValueError(f"process_batch returned {len(results)} results for {len(batch)} items")
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            done = time.perf_counter()
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+            self._record(batch, done)
+
+    def _record(self, batch, done):
+        bucket = next((b for b in BATCH_SIZE_BUCKETS if len(batch) <= b), BATCH_SIZE_BUCKETS[-1])
+        with self._metrics_lock:
+            self._batch_sizes[bucket] += 1
+            self._batches += 1
+            self._items += len(batch)
+            self._latencies.extend(done - queued_at for _, _, queued_at in batch)
+
+    def metrics(self):
+        """
+        Queue depth, batch-size histogram and end-to-end latency percentiles (ms).
+        """
+        with self._metrics_lock:
+            latencies = np.array(self._latencies) * 1000
+            histogram = {f"<={bucket}": count for bucket, count in self._batch_sizes.items()}
+            return {
+                "queue_depth": self._queue.qsize(),
+                "batches": self._batches,
+                "items": self._items,
+                "mean_batch_size": self._items / self._batches if self._batches else 0.0,
+                "batch_size_histogram": histogram,
+                "latency_ms": {
+                    f"p{p}": float(np.percentile(latencies, p)) if latencies.size else 0.0
+                    for p in (50, 95, 99)
+                },
+            }
+
+    def close(self):
+        """
+        Stops the worker after the items already queued have been processed;
+        later submit() calls raise RuntimeError.
+        """
+        with self._submit_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+        self._worker.join()
@@ -0,0 +1,52 @@
+# src/common/training/jobs.py
+# What it takes to train each model: its training module, epoch count and data
+
+import os
+
+from src.common.crops import CROP_FOLDERS
+from src.common.paths import DATASET_DIR
+from src.common.preprocessing.dataset_index import get_index
+
+# Training script of each model ("crop" is the crop identifier), run with `python -m`
+TRAIN_MODULES = {
+    "crop": "src.crop_identifier.crop_train",
+    "apple": "src.apple.apple_train",
+    "cassava": "src.cassava.cassava_train",
+    "corn": "src.corn.corn_train",
+    "grape": "src.grape.grape_train",
+    "rice": "src.rice.rice_train",
+    "tomato": "src.tomato.tomato_train",
+}
+
+# Epochs each training script runs
+EPOCHS = {
+    "crop": 20,
+    "apple": 10,
+    "cassava": 40,
+    "corn": 40,
+    "grape": 40,
+    "rice": 20,
+    "tomato": 10,
+}
+
+
+def count_training_images(name, base_dir=DATASET_DIR):
+    """
+    Number of files a model trains on (the crop identifier trains on every crop folder).
+    """
+    folders = CROP_FOLDERS.values() if name == "crop" else [CROP_FOLDERS[name]]
+    index = get_index()
+    if index is not None and index.covers(base_dir):
+        return sum(index.count("train", folder) for folder in folders)
+    count = 0
+    for folder in folders:
+        for _, _, files in os.walk(os.path.join(base_dir, "train", folder)):
+            count += len(files)
+    return count
+
+
+def estimated_cost(name, base_dir=DATASET_DIR):
+    """
+    Relative training cost (epochs x training images) used to schedule the longest jobs first.
+    """
+    return EPOCHS[name] * max(count_training_images(name, base_dir), 1)
@@ -0,0 +1,192 @@
+# src/common/training/loop.py
+# Shared training loop for the *_train.py scripts: validation-based early
+# stopping, a resumable checkpoint after every epoch, an optional wall-clock
+# budget and a summary of what was actually run.
+#
+# Checkpoints: checkpoints/<model>/last.h5   model + optimizer after the last epoch
+#              checkpoints/<model>/best.h5   lowest val_loss so far
+#              checkpoints/<model>/state.json epoch, best val_loss, patience counter, time spent
+
+import json
+import os
+import time
+
+from tensorflow.keras.callbacks import Callback
+from tensorflow.keras.models import load_model
+
+from src.common.models.manifest import data_fingerprint, write_manifest
+from src.common.paths import PROJECT_ROOT, resolve_model_path
+from src.common.training.jobs import EPOCHS
+
+CHECKPOINT_DIR = os.path.join(PROJECT_ROOT, "checkpoints")
+
+# Epochs without val_loss improvement before stopping (0 disables early stopping)
+PATIENCE = int(os.environ.get("AGROVISION_PATIENCE", "5"))
+# Wall-clock budget per model in minutes, across resumes (unset = no budget)
+TIME_BUDGET_MINUTES = float(os.environ.get("AGROVISION_TIME_BUDGET_MIN", "0")) or None
+
+
+def _write_json(path, data):
+    # Write then rename, so a crash never leaves a half-written state file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class TrainingState(Callback):
+    """
+    Checkpoints after every epoch and stops on patience or budget.
+    """
+
+    def __init__(self, checkpoint_dir, state, patience, budget_seconds):
+        super().__init__()
+        self.checkpoint_dir = checkpoint_dir
+        self.state = state
+        self.patience = patience
+        self.budget_seconds = budget_seconds
+        self.epoch_start = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.epoch_start = time.time()
+
+    def on_epoch_end(self, epoch, logs=None):
+        state = self.state
+        state["epoch"] = epoch + 1
+        state["epoch_seconds"].append(round(time.time() - self.epoch_start, 1))
+        state["seconds"] += state["epoch_seconds"][-1]
+
+        val_loss = (logs or {}).get("val_loss")
+        if val_loss is not None and (state["best_val_loss"] is None or val_loss < state["best_val_loss"]):
+            state["best_val_loss"] = float(val_loss)
+            state["best_epoch"] = epoch + 1
+            state["wait"] = 0
+            self.model.save(os.path.join(self.checkpoint_dir, "best.h5"))
+        else:
+            state["wait"] += 1
+
+        self.model.save(os.path.join(self.checkpoint_dir, "last.h5"))
+
+        if self.patience and state["wait"] >= self.patience:
+            state["stop_reason"] = "early_stopping"
+            self.model.stop_training = True
+        elif self.budget_seconds:
+            mean_epoch = state["seconds"] / len(state["epoch_seconds"])
+            if state["seconds"] + mean_epoch > self.budget_seconds:
+                state["stop_reason"] = "time_budget"
+                self.model.stop_training = True
+
+        _write_json(os.path.join(self.checkpoint_dir, "state.json"), state)
+
+
+def _new_state(epochs):
+    return {
+        "epochs": epochs,
+        "epoch": 0,
+        "best_epoch": None,
+        "best_val_loss": None,
+        "wait": 0,
+        "seconds": 0.0,
+        "epoch_seconds": [],
+        "stop_reason": None,
+        "complete": False,
+    }
+
+
+def train_model(name, model, train_gen, val_gen, epochs=None, patience=PATIENCE,
+                time_budget_minutes=TIME_BUDGET_MINUTES, checkpoint_dir=None, resume=True):
+    """
+    Fits a model with early stopping and per-epoch checkpoints, then saves the
+    best weights, with their manifest, where the model's predictor loads them.
+
+    If an unfinished run of the same model left a checkpoint, training resumes
+    from it (model, optimizer state, epoch, patience counter and best weights)
+    instead of starting over. A run stopped by the time budget stays unfinished:
+    the best weights so far are saved, and rerunning (with a larger budget)
+    continues it. Only early stopping or reaching max epochs completes a run.
+
+    Args:
+        name (str): "crop" or a crop name.
+        model: Freshly built, compiled Keras model (ignored when resuming).
+        epochs (int): Maximum epochs (default: the model's entry in jobs.EPOCHS).
+        patience (int): Epochs without val_loss improvement before stopping; 0 disables.
+        time_budget_minutes (float): Stop before an epoch would exceed this budget.
+        resume (bool): Continue from an unfinished checkpoint if there is one.
+
+    Returns:
+        dict: Summary (epochs run, best epoch, stop reason, seconds, estimated seconds saved).
+    """
+    epochs = epochs or EPOCHS[name]
+    checkpoint_dir = checkpoint_dir or os.path.join(CHECKPOINT_DIR, name)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    state_path = os.path.join(checkpoint_dir, "state.json")
+    last_path = os.path.join(checkpoint_dir, "last.h5")
+    best_path = os.path.join(checkpoint_dir, "best.h5")
+
+    budget_seconds = time_budget_minutes * 60 if time_budget_minutes else None
+
+    state = _new_state(epochs)
+    resumed = False
+    if resume and os.path.exists(state_path) and os.path.exists(last_path):
+        with open(state_path) as f:
+            previous = json.load(f)
+        if not previous["complete"]:
+            state = previous
+            state["epochs"] = epochs
+            state["stop_reason"] = None
+            model = load_model(last_path)
+            resumed = True
+            print(f"Resuming {name} from epoch {state['epoch']} ({last_path})")
+    if not resumed and os.path.exists(best_path):
+        # Left over from a finished run
+        os.remove(best_path)
+
+    if budget_seconds and state["epoch_seconds"]:
+        mean_epoch = state["seconds"] / len(state["epoch_seconds"])
+        if state["seconds"] + mean_epoch > budget_seconds:
+            # Spent on earlier runs; not even one more epoch fits
+            state["stop_reason"] = "time_budget"
+
+    if state["epoch"] < epochs and state["stop_reason"] is None:
+        callback = TrainingState(checkpoint_dir, state, patience, budget_seconds)
+        model.fit(
+            train_gen,
+            validation_data=val_gen,
+            epochs=epochs,
+            initial_epoch=state["epoch"],
+            callbacks=[callback],
+            verbose=1
+        )
+
+    if os.path.exists(best_path):
+        model = load_model(best_path)
+    model.save(resolve_model_path(name))
+    write_manifest(name, train_gen.class_indices, data_fingerprint(train_gen.filenames, train_gen.classes),
+                   input_size=model.input_shape[1:3])
+
+    if state["epoch"] >= epochs and state["stop_reason"] != "early_stopping":
+        state["stop_reason"] = "max_epochs"
+    state["complete"] = state["stop_reason"] in ("early_stopping", "max_epochs")
+    _write_json(state_path, state)
+
+    mean_epoch = state["seconds"] / max(len(state["epoch_seconds"]), 1)
+    summary = {
+        "model": name,
+        "epochs_run": state["epoch"],
+        "max_epochs": epochs,
+        "best_epoch": state["best_epoch"],
+        "best_val_loss": state["best_val_loss"],
+        "stop_reason": state["stop_reason"],
+        "complete": state["complete"],
+        "seconds": round(state["seconds"], 1),
+        "estimated_seconds_saved": round((epochs - state["epoch"]) * mean_epoch, 1),
+    }
+    _write_json(os.path.join(checkpoint_dir, "summary.json"), summary)
+    print(
+        f"{name}: {summary['epochs_run']}/{epochs} epochs ({summary['stop_reason']}), "
+        f"best epoch {summary['best_epoch']}, {summary['seconds']:.0f}s, "
+        f"~{summary['estimated_seconds_saved']:.0f}s saved"
+    )
+    if not state["complete"]:
+        print(f"{name}: stopped on the time budget; rerun to resume from epoch {state['epoch']}")
+    return summary
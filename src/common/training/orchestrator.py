@@ -0,0 +1,160 @@
+# src/common/training/orchestrator.py
+# Runs several training scripts at once without oversubscribing the CPU.
+#
+# The available cores are split into fixed slots. Each job runs in its own
+# process pinned to one slot (CPU affinity) with TensorFlow's intra-op and
+# inter-op thread pools sized to it, so concurrent jobs do not fight over
+# cores. Jobs are started longest first; a finished job's slot goes to the
+# next pending one.
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+from src.common.paths import PROJECT_ROOT
+from src.common.training.jobs import TRAIN_MODULES, estimated_cost
+
+LOG_DIR = os.path.join(PROJECT_ROOT, "logs", "training")
+POLL_SECONDS = 1.0
+
+
+def available_cpus():
+    """
+    CPU ids this process may run on.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def partition_cpus(cpus, slots):
+    """
+    Splits cpus into `slots` disjoint, nearly equal groups of adjacent ids.
+    """
+    slots = max(1, min(slots, len(cpus)))
+    size, extra = divmod(len(cpus), slots)
+    groups, start = [], 0
+    for i in range(slots):
+        end = start + size + (1 if i < extra else 0)
+        groups.append(cpus[start:end])
+        start = end
+    return groups
+
+
+def thread_env(cpus, inter_op_threads=2):
+    """
+    Environment that sizes TensorFlow's (and OpenMP/BLAS) thread pools to a CPU group.
+    """
+    env = dict(os.environ)
+    threads = str(len(cpus))
+    env.update({
+        "TF_NUM_INTRAOP_THREADS": threads,
+        "TF_NUM_INTEROP_THREADS": str(min(inter_op_threads, len(cpus))),
+        "OMP_NUM_THREADS": threads,
+        "OPENBLAS_NUM_THREADS": threads,
+        "MKL_NUM_THREADS": threads,
+        "PYTHONUNBUFFERED": "1",
+    })
+    return env
+
+
+class TrainingJob:
+    """
+    One training script running as a subprocess on a CPU group.
+    """
+
+    def __init__(self, name, cpus, log_dir):
+        self.name = name
+        self.cpus = cpus
+        self.log_path = os.path.join(log_dir, f"{name}.log")
+        self.process = None
+        self.started = None
+        self.finished = None
+
+    def start(self):
+        self.log = open(self.log_path, "w")
+        cpus = set(self.cpus)
+        # Pin the child before it starts any threads
+        pin = (lambda: os.sched_setaffinity(0, cpus)) if hasattr(os, "sched_setaffinity") else None
+        self.started = time.time()
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", TRAIN_MODULES[self.name]],
+            cwd=PROJECT_ROOT,
+            env=thread_env(self.cpus),
+            stdout=self.log,
+            stderr=subprocess.STDOUT,
+            preexec_fn=pin,
+        )
+
+    def poll(self):
+        """
+        Returns True once the process has exited.
+        """
+        if self.process.poll() is None:
+            return False
+        if self.finished is None:
+            self.finished = time.time()
+            self.log.close()
+        return True
+
+    def summary(self):
+        return {
+            "name": self.name,
+            "cpus": self.cpus,
+            "returncode": self.process.returncode,
+            "seconds": round(self.finished - self.started, 1),
+            "log": self.log_path,
+        }
+
+
+def run_jobs(names, concurrency=None, cpus=None, log_dir=None):
+    """
+    Trains the named models concurrently, longest estimated job first.
+
+    Args:
+        names (list): Model names ("crop" and/or crop names).
+        concurrency (int): Jobs running at once (default: all of them, capped by the core count).
+        cpus (list): CPU ids to use (default: every CPU this process may run on).
+        log_dir (str): Where per-job logs and summary.json go (default: logs/training/<timestamp>).
+
+    Returns:
+        dict: Wall-clock seconds, per-job summaries and the sum of job times.
+    """
+    cpus = cpus or available_cpus()
+    slots = partition_cpus(cpus, concurrency or len(names))
+    log_dir = log_dir or os.path.join(LOG_DIR, time.strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(log_dir, exist_ok=True)
+
+    pending = sorted(names, key=estimated_cost, reverse=True)
+    free_slots = list(range(len(slots)))
+    running, done = {}, []
+    start = time.time()
+
+    print(f"Training {len(names)} models on {len(cpus)} CPUs in {len(slots)} slots; logs in {log_dir}")
+    while pending or running:
+        while pending and free_slots:
+            slot = free_slots.pop(0)
+            job = TrainingJob(pending.pop(0), slots[slot], log_dir)
+            job.start()
+            running[slot] = job
+            print(f"  started {job.name} on CPUs {job.cpus[0]}-{job.cpus[-1]}")
+
+        time.sleep(POLL_SECONDS)
+        for slot, job in list(running.items()):
+            if job.poll():
+                del running[slot]
+                free_slots.append(slot)
+                done.append(job.summary())
+                status = "ok" if job.process.returncode == 0 else f"failed ({job.process.returncode})"
+                print(f"  {job.name} {status} after {done[-1]['seconds']:.0f}s")
+
+    report = {
+        "wall_seconds": round(time.time() - start, 1),
+        "sequential_seconds": round(sum(job["seconds"] for job in done), 1),
+        "jobs": done,
+    }
+    with open(os.path.join(log_dir, "summary.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
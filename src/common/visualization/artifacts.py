@@ -0,0 +1,162 @@
+# src/common/visualization/artifacts.py
+# Background writer for masks and overlays.
+#
+# Callers hand an ArtifactSink the image and mask and move on: overlay
+# rendering, image encoding and disk writes happen on the sink's writer
+# threads. The queue is bounded by items and by the bytes of the queued images
+# and masks, so when the writers fall behind put() blocks (backpressure)
+# instead of letting full-resolution images pile up in memory.
+#
+#   <directory>/<name>.mask.png         lesion mask (always lossless)
+#   <directory>/<name>.overlay.<format> mask blended into the image, with the severity
+
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+from src.common.segmentation.engine import render_overlays, upsample_mask
+from src.common.visualization.visualize import draw_severity
+
+FORMATS = ["png", "jpg", "webp"]
+QUEUE_SIZE = 64
+# Image and mask bytes queued before put() blocks (one 12 MP BGR image is ~36 MB)
+QUEUE_MB = 256
+WORKERS = 2
+# PNG: 0 (fastest, largest) .. 9 (slowest, smallest); JPEG/WebP: quality 0..100
+PNG_COMPRESSION = 3
+QUALITY = 90
+
+_STOP = object()
+
+
+def encode_params(fmt, png_compression=PNG_COMPRESSION, quality=QUALITY):
+    """
+    cv2.imencode parameters of a format.
+    """
+    if fmt == "png":
+        return [cv2.IMWRITE_PNG_COMPRESSION, int(png_compression)]
+    if fmt == "jpg":
+        return [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+    if fmt == "webp":
+        return [cv2.IMWRITE_WEBP_QUALITY, int(quality)]
+    raise ValueError(f"Unknown artifact format '{fmt}'. Expected one of {FORMATS}")
+
+
+class ArtifactSink:
+    """
+    Queues masks and overlays to a pool of writer threads.
+
+    Args:
+        directory (str): Output directory.
+        fmt (str): Overlay format, one of FORMATS.
+        png_compression (int): PNG compression level (masks, and PNG overlays).
+        quality (int): JPEG/WebP overlay quality.
+        masks (bool): Write masks.
+        overlays (bool): Render and write overlays.
+        queue_size (int): Items queued before put() blocks.
+        queue_mb (float): Image and mask megabytes queued before put() blocks; a
+            single larger item is still accepted when the queue is empty.
+        workers (int): Writer threads.
+    """
+
+    def __init__(self, directory, fmt="png", png_compression=PNG_COMPRESSION, quality=QUALITY, masks=True,
+                 overlays=True, queue_size=QUEUE_SIZE, workers=WORKERS, queue_mb=QUEUE_MB):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fmt = fmt
+        self.overlay_params = encode_params(fmt, png_compression, quality)
+        self.mask_params = encode_params("png", png_compression)
+        self.masks = masks
+        self.overlays = overlays
+        self.stats = {"written": 0, "failed": 0, "bytes": 0, "blocked_seconds": 0.0}
+        self.first_error = None
+        self._lock = threading.Lock()
+        self._max_queued_bytes = queue_mb * 1024 * 1024
+        self._queued_bytes = 0
+        self._space = threading.Condition()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def put(self, name, image, mask, alpha=0.3, severity_percent=None):
+        """
+        Queues the artifacts of one image; blocks while the queue is full (in items or bytes).
+
+        Args:
+            name (str): File name stem.
+            image (np.ndarray): BGR image (not copied: do not modify it afterwards).
+            mask (np.ndarray): Lesion mask, at any segmentation resolution.
+            severity_percent (float): Written onto the overlay when given.
+        """
+        began = time.perf_counter()
+        size = image.nbytes + mask.nbytes
+        with self._space:
+            self._space.wait_for(lambda: not self._queued_bytes
+                                 or self._queued_bytes + size <= self._max_queued_bytes)
+            self._queued_bytes += size
+        self._queue.put((name, image, mask, alpha, severity_percent, size))
+        with self._lock:
+            self.stats["blocked_seconds"] += time.perf_counter() - began
+
+    def _write(self, path, img, params):
+        ok, encoded = cv2.imencode(os.path.splitext(path)[1], img, params)
+        if not ok:
+            raise ValueError(f"Could not encode {path}")
+        with open(path, "wb") as f:
+            f.write(encoded.tobytes())
+        return len(encoded)
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            name, image, mask, alpha, severity_percent, size = item
+            try:
+                written = 0
+                if self.masks:
+                    written += self._write(os.path.join(self.directory, f"{name}.mask.png"), mask, self.mask_params)
+                if self.overlays:
+                    overlay = render_overlays(image, upsample_mask(mask, *image.shape[:2]), alpha)
+                    if severity_percent is not None:
+                        overlay = draw_severity(overlay, severity_percent, copy=False)
+                    written += self._write(os.path.join(self.directory, f"{name}.overlay.{self.fmt}"),
+                                           overlay, self.overlay_params)
+                with self._lock:
+                    self.stats["written"] += 1
+                    self.stats["bytes"] += written
+            except Exception as e:
+                with self._lock:
+                    self.stats["failed"] += 1
+                    self.first_error = self.first_error or f"{name}: {e}"
+            finally:
+                with self._space:
+                    self._queued_bytes -= size
+                    self._space.notify_all()
+                self._queue.task_done()
+
+    def close(self):
+        """
+        Waits for every queued artifact to be written and stops the writers.
+
+        Returns:
+            dict: Artifacts written and failed, bytes written, seconds put() was blocked.
+        """
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        if self.first_error:
+            print(f"{self.stats['failed']} artifacts could not be written (first error: {self.first_error})")
+        return dict(self.stats)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
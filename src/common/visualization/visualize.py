@@ -1,11 +1,11 @@
 # src/common/visualization/visualize.py
 import cv2
 
-def show_overlay_with_severity(overlay, severity_percent):
+def draw_severity(overlay, severity_percent, copy=True):
     """
-    Shows overlay with severity text
+    Returns the overlay with the severity written on it
     """
-    display_img = overlay.copy()
+    display_img = overlay.copy() if copy else overlay
     
     # Add severity text
     severity_text = f"Severity: {severity_percent:.2f}%"
@@ -13,6 +13,14 @@ def show_overlay_with_severity(overlay, severity_percent):
         display_img, severity_text, (10, 30), 
         cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2, cv2.LINE_AA
     )
+    return display_img
+
+def show_overlay_with_severity(overlay, severity_percent):
+    """
+    Shows overlay with severity text (blocks until a key is pressed;
+    batch callers write overlays through an ArtifactSink instead)
+    """
+    display_img = draw_severity(overlay, severity_percent)
     
     cv2.imshow("Leaf Analysis", display_img)
     cv2.waitKey(0)
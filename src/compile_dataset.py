@@ -0,0 +1,32 @@
+# src/compile_dataset.py
+# Compile dataset/image data into packed, pre-resized memmap shards
+#
+# Run from the project root:
+#   python -m src.compile_dataset [--splits train validation test] [--img-size 224] [--workers 8]
+#
+# Trainers and test scripts read the result with AGROVISION_DATA_LOADER=compiled
+# (or loader="compiled"). Re-run after adding or removing images.
+
+import argparse
+import time
+
+from src.common.paths import COMPILED_DATASET_DIR, DATASET_DIR
+from src.common.preprocessing.compiled_dataset import SHARD_SIZE, SPLITS, compile_split
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the compiled (pre-resized, packed) dataset")
+    parser.add_argument("--splits", nargs="+", default=SPLITS, choices=SPLITS)
+    parser.add_argument("--img-size", type=int, default=224, help="Square image size to store")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE, help="Images per shard file")
+    parser.add_argument("--workers", type=int, help="Decode threads (default: CPU count)")
+    parser.add_argument("--source", default=DATASET_DIR)
+    parser.add_argument("--out", default=COMPILED_DATASET_DIR)
+    args = parser.parse_args()
+
+    for split in args.splits:
+        start = time.perf_counter()
+        index = compile_split(split, args.source, args.out, (args.img_size, args.img_size),
+                              args.shard_size, args.workers)
+        print(f"{split}: {len(index['filenames'])} images in {len(index['folders'])} folders, "
+              f"{time.perf_counter() - start:.1f}s\n")
@@ -2,24 +2,24 @@
 # corn/corn_predict.py
 # Predict disease for CORN
 
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array, load_img
 import numpy as np
+from src.common.models.registry import get_model
+from src.common.paths import resolve_model_path
+from src.common.preprocessing.image_utils import preprocess_image_batch, preprocess_single_image
 
-MODEL_PATH = "corn/corn_model.h5"
+MODEL_PATH = resolve_model_path("corn")
 IMG_SIZE = (224, 224)
 
-# Load trained Corn model
-model = load_model(MODEL_PATH)
+# Model is loaded on first use through the shared registry
 
 def predict_corn(image_path, class_indices=None):
     """
     Predict disease for a single corn image.
+    image_path may also be an ImageContext decoded once for the whole pipeline.
     """
-    img = load_img(image_path, target_size=IMG_SIZE)
-    img_array = img_to_array(img) / 255.0  # normalize
-    img_array = np.expand_dims(img_array, axis=0)
+    img_array = preprocess_single_image(image_path)
 
+    model = get_model("corn")
     preds = model.predict(img_array)
     predicted_class = np.argmax(preds, axis=1)[0]
 
@@ -29,3 +29,13 @@ def predict_corn(image_path, class_indices=None):
         return inv_map[predicted_class]
 
     return predicted_class
+
+
+def predict_corn_batch(images):
+    """
+    Predict disease for many corn images (paths or RGB arrays) in one forward pass.
+    Returns: list of (class index, confidence) in input order
+    """
+    model = get_model("corn")
+    preds = model.predict(preprocess_image_batch(images), verbose=0)
+    return [(int(i), float(c)) for i, c in zip(np.argmax(preds, axis=1), np.max(preds, axis=1))]
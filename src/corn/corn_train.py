@@ -1,6 +1,7 @@
 # src/corn/corn_train.py
 from .corn_preprocessing import get_corn_generators
 from src.common.models.model_base import build_model
+from src.common.training.loop import train_model
 
 BASE_DIR = "dataset/image data"  # same as Apple
 
@@ -12,12 +13,5 @@ print("Class indices:", train_gen.class_indices)
 
 model = build_model(num_classes=num_classes)
 
-history = model.fit(
-    train_gen,
-    validation_data=val_gen,
-    epochs=40,
-    verbose=1
-)
-
-model.save("corn/corn_model.h5")
+summary = train_model("corn", model, train_gen, val_gen)
 print("Corn model trained and saved!")
@@ -1,8 +1,9 @@
-import cv2
-from .corn_segmentation_utils import read_and_gray, threshold_mask, overlay_mask
+from src.common.segmentation.engine import SegmentationConfig, segment_image
+
+CONFIG = SegmentationConfig(threshold=128, color_space="gray", alpha=0.3, leaf_chroma=20)
 
 def segment_corn_leaf(image_path):
-    img, gray = read_and_gray(image_path)
-    mask = threshold_mask(gray)
-    overlay = overlay_mask(img, mask)
-    return mask, overlay
+    """
+    Returns a mask highlighting diseased regions on corn leaf, and its overlay.
+    """
+    return segment_image(image_path, CONFIG)
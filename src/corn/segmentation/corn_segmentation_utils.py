@@ -1,14 +1,5 @@
-import cv2
+# Single-image segmentation helpers, shared with every crop
 
-def read_and_gray(image_path):
-    img = cv2.imread(image_path)
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    return img, gray
+from src.common.segmentation.engine import overlay_mask, read_and_gray, threshold_mask
 
-def threshold_mask(gray_img, thresh_val=128):
-    _, mask = cv2.threshold(gray_img, thresh_val, 255, cv2.THRESH_BINARY_INV)
-    return mask
-
-def overlay_mask(img, mask, alpha=0.3):
-    overlay = cv2.addWeighted(img, 1 - alpha, cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR), alpha, 0)
-    return overlay
+__all__ = ["read_and_gray", "threshold_mask", "overlay_mask"]
@@ -1,5 +1,7 @@
 # src/crop_identifier/crop_classes.py
 
+CONFIDENCE_THRESHOLD = 0.8  # 80% threshold
+
 CLASSES = [
     'apple',
     'cassava',
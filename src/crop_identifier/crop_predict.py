@@ -1,26 +1,27 @@
 # src/crop_identifier/crop_predict.py
 
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array, load_img
 import numpy as np
-from src.crop_identifier.crop_classes import CLASSES
+from src.common.crops import get_class_names
+from src.common.models.registry import get_model
+from src.common.paths import resolve_model_path
+from src.common.preprocessing.image_utils import preprocess_image_batch, preprocess_single_image
+from src.crop_identifier.crop_classes import CONFIDENCE_THRESHOLD
 
-MODEL_PATH = "src/crop_identifier/crop_model.h5"
+MODEL_PATH = resolve_model_path("crop")
 IMG_SIZE = (224, 224)
-CONFIDENCE_THRESHOLD = 0.8  # 80% threshold
 
-model = load_model(MODEL_PATH)
+# Model is loaded on first use through the shared registry
 
 def predict_crop(image_path):
     """
     Predicts crop type from leaf image with confidence.
+    image_path may also be an ImageContext decoded once for the whole pipeline.
     Returns:
         (label, confidence) -> (str, float)
     """
-    img = load_img(image_path, target_size=IMG_SIZE)
-    img_array = img_to_array(img) / 255.0
-    img_array = np.expand_dims(img_array, axis=0)
+    img_array = preprocess_single_image(image_path)
 
+    model = get_model("crop")
     preds = model.predict(img_array)[0]
     max_confidence = np.max(preds)
     crop_index = np.argmax(preds)
@@ -28,4 +29,23 @@ def predict_crop(image_path):
     if max_confidence < CONFIDENCE_THRESHOLD:
         return "unknown", max_confidence
     else:
-        return CLASSES[crop_index], max_confidence
+        return get_class_names("crop")[crop_index], max_confidence
+
+
+def predict_crop_batch(images):
+    """
+    Predicts crop type for many images (paths or RGB arrays) in one forward pass.
+    Returns:
+        list of (label, confidence) in input order
+    """
+    model = get_model("crop")
+    preds = model.predict(preprocess_image_batch(images), verbose=0)
+    classes = get_class_names("crop")
+
+    results = []
+    for max_confidence, crop_index in zip(np.max(preds, axis=1), np.argmax(preds, axis=1)):
+        if max_confidence < CONFIDENCE_THRESHOLD:
+            results.append(("unknown", float(max_confidence)))
+        else:
+            results.append((classes[crop_index], float(max_confidence)))
+    return results
@@ -2,7 +2,9 @@
 
 import os
 from tensorflow.keras.preprocessing.image import ImageDataGenerator
-from src.common.preprocessing.image_utils import create_data_generator
+from src.common.preprocessing.augmentation import get_policy
+from src.common.preprocessing.dataset_index import list_subdirs
+from src.common.preprocessing.image_utils import DATA_LOADER, create_data_generator, flow_from_index
 from .crop_classes import FOLDER_TO_CLASS
 
 IMG_SIZE = (224, 224)
@@ -11,7 +13,7 @@ BATCH_SIZE = 32
 # Only use the folders listed in FOLDER_TO_CLASS
 ALLOWED_FOLDERS = list(FOLDER_TO_CLASS.keys())
 
-def get_crop_generators(base_dir, img_size=IMG_SIZE, batch_size=BATCH_SIZE):
+def get_crop_generators(base_dir, img_size=IMG_SIZE, batch_size=BATCH_SIZE, loader=DATA_LOADER):
     """
     Returns training, validation, and test generators for crop classification.
     Only uses the 6 crops defined in FOLDER_TO_CLASS.
@@ -20,13 +22,23 @@ def get_crop_generators(base_dir, img_size=IMG_SIZE, batch_size=BATCH_SIZE):
     val_dir   = os.path.join(base_dir, "validation")
     test_dir  = os.path.join(base_dir, "test")
 
-    # Filter to include only allowed folders
+    # Filter to include only allowed folders (listed from the dataset index when built)
     def filter_dirs(parent_dir):
-        return [d for d in os.listdir(parent_dir) if d in ALLOWED_FOLDERS]
+        return [d for d in list_subdirs(parent_dir) if d in ALLOWED_FOLDERS]
+
+    if loader == "tfdata":
+        from src.common.preprocessing.tf_data import get_split_datasets
+        classes = {"train": filter_dirs(train_dir), "validation": filter_dirs(val_dir), "test": filter_dirs(test_dir)}
+        return get_split_datasets(train_dir, val_dir, test_dir, img_size, batch_size, get_policy("crop"), classes)
+    if loader == "compiled":
+        # Labelled in CLASSES order through FOLDER_TO_CLASS
+        from src.common.preprocessing.compiled_dataset import get_compiled_datasets
+        return get_compiled_datasets(None, img_size, batch_size, get_policy("crop"))
 
     # Training generator
-    train_datagen = create_data_generator(augment=True)
-    train_gen = train_datagen.flow_from_directory(
+    train_datagen = create_data_generator(augment=get_policy("crop"))
+    train_gen = flow_from_index(
+        train_datagen,
         train_dir,
         target_size=img_size,
         batch_size=batch_size,
@@ -36,7 +48,8 @@ def get_crop_generators(base_dir, img_size=IMG_SIZE, batch_size=BATCH_SIZE):
 
     # Validation generator
     val_datagen = create_data_generator(augment=False)
-    val_gen = val_datagen.flow_from_directory(
+    val_gen = flow_from_index(
+        val_datagen,
         val_dir,
         target_size=img_size,
         batch_size=batch_size,
@@ -46,7 +59,8 @@ def get_crop_generators(base_dir, img_size=IMG_SIZE, batch_size=BATCH_SIZE):
 
     # Test generator
     test_datagen = create_data_generator(augment=False)
-    test_gen = test_datagen.flow_from_directory(
+    test_gen = flow_from_index(
+        test_datagen,
         test_dir,
         target_size=img_size,
         batch_size=batch_size,
@@ -2,6 +2,7 @@
 
 from src.crop_identifier.crop_preprocessing import get_crop_generators
 from src.common.models.model_base import build_model
+from src.common.training.loop import train_model
 
 BASE_DIR = "dataset/image data"
 
@@ -12,12 +13,5 @@ print("Class indices:", train_gen.class_indices)
 
 model = build_model(num_classes=num_classes)
 
-history = model.fit(
-    train_gen,
-    validation_data=val_gen,
-    epochs=20,
-    verbose=1
-)
-
-model.save("src/crop_identifier/crop_model.h5")
+summary = train_model("crop", model, train_gen, val_gen)
 print("Crop classifier trained and saved!")
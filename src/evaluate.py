@@ -0,0 +1,52 @@
+# src/evaluate.py
+# Evaluate any or all models: accuracy, throughput and latency in one report
+#
+# Run from the project root:
+#   python -m src.evaluate [crop apple ...] [--backends keras tflite-int8] [--batch-sizes 1 32]
+#                          [--json report.json] [--min-accuracy 0.9] [--min-images-per-sec 50]
+#
+# The test split is decoded once for all models (or read from the compiled
+# dataset). With --min-accuracy / --min-images-per-sec the command exits
+# non-zero when any run misses the bar, so it can gate model promotion.
+
+import argparse
+import json
+import sys
+
+from src.common.evaluation.harness import BACKENDS, BATCH_SIZES, evaluate
+from src.common.paths import MODEL_PATHS, parse_model_names
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate models on the test split")
+    parser.add_argument("models", nargs="*", metavar="model",
+                        help=f"Any of {', '.join(MODEL_PATHS)} (default: all)")
+    parser.add_argument("--backends", nargs="+", default=BACKENDS,
+                        help="keras and/or tflite-{dynamic,float16,int8}")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=BATCH_SIZES)
+    parser.add_argument("--limit", type=int, help="Evaluate at most this many images per model")
+    parser.add_argument("--json", help="Write the report as JSON to this path")
+    parser.add_argument("--min-accuracy", type=float, help="Fail if any run is less accurate")
+    parser.add_argument("--min-images-per-sec", type=float, help="Fail if any run is slower")
+    args = parser.parse_args()
+    args.models = parse_model_names(parser, args.models)
+
+    report = evaluate(args.models, args.backends, args.batch_sizes, args.limit)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failures = []
+    for name, result in report["models"].items():
+        for run in result["runs"]:
+            label = f"{name} {run['backend']} batch {run['batch_size']}"
+            if args.min_accuracy is not None and run["accuracy"] < args.min_accuracy:
+                failures.append(f"{label}: accuracy {run['accuracy']:.4f} < {args.min_accuracy}")
+            if args.min_images_per_sec is not None and run["images_per_sec"] < args.min_images_per_sec:
+                failures.append(f"{label}: {run['images_per_sec']:.1f} images/sec < {args.min_images_per_sec}")
+    if failures:
+        print("\nPromotion gate failed:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
@@ -0,0 +1,209 @@
+# src/export_tflite.py
+# Export the crop identifier and disease models to TFLite
+#
+# Run from the project root:
+#   python -m src.export_tflite [--models crop apple ...] [--quantizations dynamic float16 int8]
+#
+# Each model is written next to its .h5 file (e.g. apple/apple_model.int8.tflite)
+# and its test-split accuracy is compared with the Keras model. The parts used by
+# the shared-backbone engine are written alongside: every model's head
+# (apple/apple_model.head.int8.tflite) and the crop identifier's backbone. Select
+# the backend at inference time with AGROVISION_BACKEND=tflite-int8 (or -dynamic / -float16).
+
+import argparse
+import itertools
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+from src.common.crops import CROP_FOLDERS
+from src.common.models.backbone import same_weights, split_model
+from src.common.models.tflite_backend import QUANTIZATIONS, TFLiteModel, tflite_path
+from src.common.paths import DATASET_DIR, MODEL_PATHS, resolve_model_path
+from src.common.preprocessing.image_utils import get_data_generator_for_crop
+
+CALIBRATION_SAMPLES = 200
+
+
+def representative_dataset(name, num_samples=CALIBRATION_SAMPLES):
+    """
+    Yields single validation images for int8 calibration. The crop identifier
+    draws from every crop's validation folder in turn.
+    """
+    crops = list(CROP_FOLDERS) if name == "crop" else [name]
+    generators = []
+    for crop_name in crops:
+        _, val_gen, _ = get_data_generator_for_crop(CROP_FOLDERS[crop_name], base_path=DATASET_DIR)
+        generators.append(val_gen)
+
+    def _samples():
+        count = 0
+        for val_gen in itertools.cycle(generators):
+            images, _ = next(val_gen)
+            for img in images:
+                yield [img[np.newaxis].astype(np.float32)]
+                count += 1
+                if count >= num_samples:
+                    return
+
+    return _samples
+
+
+def representative_features(name, backbone, num_samples=CALIBRATION_SAMPLES):
+    """
+    Yields backbone features of the calibration images, for int8 heads.
+    """
+    images = representative_dataset(name, num_samples)
+
+    def _samples():
+        for (img,) in images():
+            yield [backbone.predict(img, verbose=0).astype(np.float32)]
+
+    return _samples
+
+
+def convert(model, name, quantization, representative=None):
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if quantization == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == "int8":
+        converter.representative_dataset = representative or representative_dataset(name)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+
+    return converter.convert()
+
+
+def test_generator(name):
+    if name == "crop":
+        from src.crop_identifier.crop_preprocessing import get_crop_generators
+        _, _, test_gen = get_crop_generators(DATASET_DIR)
+    else:
+        _, _, test_gen = get_data_generator_for_crop(CROP_FOLDERS[name], base_path=DATASET_DIR)
+    return test_gen
+
+
+def accuracy(model, test_gen, max_batches=None):
+    num_batches = len(test_gen) if max_batches is None else min(max_batches, len(test_gen))
+    correct = total = 0
+    for i in range(num_batches):
+        images, labels = test_gen[i]
+        preds = model.predict(images, verbose=0)
+        correct += int(np.sum(np.argmax(preds, axis=1) == np.argmax(labels, axis=1)))
+        total += len(images)
+    return correct / total if total else 0.0
+
+
+@lru_cache(maxsize=1)
+def crop_backbone():
+    backbone, _ = split_model(load_model(resolve_model_path("crop")))
+    return backbone
+
+
+class PartsModel:
+    """
+    Exported backbone then head, as SharedBackboneEngine runs them.
+    """
+
+    def __init__(self, backbone, head):
+        self.backbone = backbone
+        self.head = head
+
+    def predict(self, x, verbose=0, **kwargs):
+        return self.head.predict(self.backbone.predict(x))
+
+
+def export_parts(name, model, quantization, test_gen, max_test_batches=None):
+    """
+    Exports the head of one model (and for the crop identifier, the shared
+    backbone) for the shared-backbone engine. A disease model whose backbone
+    differs from the crop identifier's is refused, as the engine refuses it.
+
+    Returns: dict with the part paths, total size and the accuracy of backbone + head
+    """
+    backbone, head = split_model(model)
+    crop_path = resolve_model_path("crop")
+    if name != "crop":
+        if not same_weights(crop_backbone(), backbone):
+            raise ValueError(f"The {name} model was trained with a fine-tuned backbone; "
+                             "its head cannot run on the shared backbone.")
+
+    parts = {"head": tflite_path(resolve_model_path(name), quantization, "head")}
+    with open(parts["head"], "wb") as f:
+        representative = representative_features(name, backbone) if quantization == "int8" else None
+        f.write(convert(head, name, quantization, representative))
+    backbone_path = tflite_path(crop_path, quantization, "backbone")
+    if name == "crop":
+        parts["backbone"] = backbone_path
+        with open(backbone_path, "wb") as f:
+            f.write(convert(backbone, name, quantization))
+
+    report = {"paths": parts, "size_mb": sum(os.path.getsize(p) for p in parts.values()) / (1024 * 1024)}
+    # Disease heads are scored on the crop identifier's exported backbone, when there is one
+    if os.path.exists(backbone_path):
+        report["accuracy"] = accuracy(PartsModel(TFLiteModel(backbone_path), TFLiteModel(parts["head"])),
+                                      test_gen, max_test_batches)
+    return report
+
+
+def export_model(name, quantizations, max_test_batches=None):
+    """
+    Exports one model with every requested quantization.
+    Returns: dict with Keras accuracy and per-quantization accuracy, delta and size
+    """
+    model_path = resolve_model_path(name)
+    model = load_model(model_path)
+    test_gen = test_generator(name)
+
+    keras_accuracy = accuracy(model, test_gen, max_test_batches)
+    report = {"keras_accuracy": keras_accuracy, "exports": {}}
+    print(f"{name}: keras accuracy {keras_accuracy:.4f}")
+
+    for quantization in quantizations:
+        out_path = tflite_path(model_path, quantization)
+        with open(out_path, "wb") as f:
+            f.write(convert(model, name, quantization))
+
+        tflite_accuracy = accuracy(TFLiteModel(out_path), test_gen, max_test_batches)
+        try:
+            parts = export_parts(name, model, quantization, test_gen, max_test_batches)
+        except ValueError as e:
+            parts = {"error": str(e)}
+        report["exports"][quantization] = {
+            "path": out_path,
+            "accuracy": tflite_accuracy,
+            "accuracy_delta": tflite_accuracy - keras_accuracy,
+            "size_mb": os.path.getsize(out_path) / (1024 * 1024),
+            "parts": parts,
+        }
+        print(f"  {quantization:<8} accuracy {tflite_accuracy:.4f} "
+              f"(delta {tflite_accuracy - keras_accuracy:+.4f}) -> {out_path}")
+        if "error" in parts:
+            print(f"  {'':<8} no backbone/head parts: {parts['error']}")
+        elif "accuracy" in parts:
+            print(f"  {'':<8} backbone + head accuracy {parts['accuracy']:.4f} -> {parts['paths']['head']}")
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export models to TFLite and compare accuracy")
+    parser.add_argument("--models", nargs="+", default=list(MODEL_PATHS), choices=list(MODEL_PATHS))
+    parser.add_argument("--quantizations", nargs="+", default=QUANTIZATIONS, choices=QUANTIZATIONS)
+    parser.add_argument("--max-test-batches", type=int, help="Evaluate on a subset of the test split")
+    parser.add_argument("--report", help="Write the accuracy report as JSON to this path")
+    args = parser.parse_args()
+
+    reports = {name: export_model(name, args.quantizations, args.max_test_batches) for name in args.models}
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(reports, f, indent=2)
+        print(f"Report written to {args.report}")
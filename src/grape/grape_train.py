@@ -1,6 +1,7 @@
 # Train grape model here
 from .grape_preprocessing import get_grape_generators
 from src.common.models.model_base import build_model
+from src.common.training.loop import train_model
 
 BASE_DIR = "dataset/image data"
 
@@ -10,12 +11,5 @@ print("Class indices:", train_gen.class_indices)
 
 model = build_model(num_classes=num_classes)
 
-history = model.fit(
-    train_gen,
-    validation_data=val_gen,
-    epochs=40,  # you can adjust epochs
-    verbose=1
-)
-
-model.save("grape/grape_model.h5")
+summary = train_model("grape", model, train_gen, val_gen)
 print("Grape model trained and saved!")
@@ -1,18 +1,16 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from PIL import Image, ImageTk, ImageDraw, ImageFont
-import cv2
-import numpy as np
 import threading
 import time
 import webbrowser
 
 # -------------------------------
 # Import your existing pipeline functions
+# (TensorFlow, OpenCV and the models are imported by load_pipeline() on a
+# background thread once the window is up, so the UI appears immediately)
 # -------------------------------
-from src.common.crop_identifier import identify_crop
-from src.common.analysis.severity import calculate_severity, infection_severity
-from src.common.visualization.visualize import show_overlay_with_severity
+from src.common.crops import get_disease_classes, get_severity
 
 # -------------------------------
 # GUI App - Premium Version
@@ -30,6 +28,7 @@ class AgroVisionPremiumApp:
             pass
             
         self.image_path = None
+        self.image = None  # decoded once, shared by every analysis stage
         self.current_image = None
         self.processing = False
         self.crop_colors = {
@@ -59,6 +58,37 @@ class AgroVisionPremiumApp:
         self.setup_styles()
         self.build_ui()
         
+        # Load the pipeline in the background while the user picks an image
+        self.pipeline_ready = threading.Event()
+        self.pipeline_error = None
+        self.root.after(0, self.start_pipeline_loading)
+        
+    def start_pipeline_loading(self):
+        """Start importing TensorFlow and loading models on a background thread"""
+        self.status_indicator.config(text="● Loading models...", fg=self.colors["warning"])
+        thread = threading.Thread(target=self.load_pipeline)
+        thread.daemon = True
+        thread.start()
+    
+    def load_pipeline(self):
+        """Import the heavy pipeline modules and build the shared model engine"""
+        try:
+            from src.common.models.backbone import get_engine
+            from src.common.analysis.severity import infection_severity
+            get_engine()
+        except Exception as e:
+            self.pipeline_error = str(e)
+        finally:
+            self.pipeline_ready.set()
+            self.root.after(0, self.pipeline_loaded)
+    
+    def pipeline_loaded(self):
+        """Update the status indicator once background loading has finished"""
+        if self.pipeline_error:
+            self.status_indicator.config(text="● Models unavailable", fg=self.colors["danger"])
+        elif self.image is None and not self.processing:
+            self.status_indicator.config(text="● Ready", fg=self.colors["success"])
+        
     def setup_styles(self):
         """Create custom ttk styles for modern widgets"""
         style = ttk.Style()
@@ -396,8 +426,15 @@ class AgroVisionPremiumApp:
         # Update status
         self.status_indicator.config(text="● Image Loaded", fg=self.colors["primary"])
         
-        # Load and display image
-        img = Image.open(self.image_path)
+        # Decode once and display image
+        from src.common.preprocessing.image_context import ImageContext
+        try:
+            self.image = ImageContext.from_path(self.image_path)
+        except ValueError as e:
+            messagebox.showerror("Invalid Image", str(e))
+            self.image_path = None
+            return
+        img = Image.fromarray(self.image.rgb)
         self.current_image = img
         
         # Resize maintaining aspect ratio
@@ -438,14 +475,20 @@ class AgroVisionPremiumApp:
     def run_analysis_pipeline(self):
         """Run the complete analysis pipeline"""
         try:
-            # Step 0: Initializing
+            # Step 0: Initializing (waits for background model loading if still running)
             self.update_progress("🔍 Initializing analysis system...")
-            time.sleep(0.5)
+            self.pipeline_ready.wait()
+            if self.pipeline_error:
+                self.root.after(0, self.analysis_failed, f"Models could not be loaded: {self.pipeline_error}")
+                return
+            from src.common.models.backbone import get_engine
+            from src.common.analysis.severity import infection_severity
             
             # Step 1: Crop Identification
             self.update_progress("🌱 Identifying crop type...")
             time.sleep(0.3)
-            crop_name, confidence = identify_crop(self.image_path)
+            # Backbone runs once; the disease head reuses its features in Step 2
+            crop_name, confidence, disease_index = get_engine().analyze(self.image.batch())
             
             if crop_name == "unknown":
                 self.root.after(0, self.analysis_failed, "Crop could not be identified.")
@@ -464,8 +507,7 @@ class AgroVisionPremiumApp:
             self.update_progress("🦠 Detecting diseases...")
             time.sleep(0.3)
             
-            # Import appropriate module based on crop
-            disease_name = self.predict_disease(crop_name)
+            disease_name = self.predict_disease(crop_name, disease_index)
             if not disease_name:
                 self.root.after(0, self.analysis_failed, "Disease prediction failed.")
                 return
@@ -478,8 +520,8 @@ class AgroVisionPremiumApp:
             self.update_progress("📐 Analyzing leaf segmentation...")
             time.sleep(0.3)
             
-            mask, overlay = self.perform_segmentation(crop_name)
-            if mask is None:
+            severity = self.perform_segmentation(crop_name)
+            if severity is None:
                 self.root.after(0, self.analysis_failed, "Segmentation failed.")
                 return
             
@@ -487,7 +529,7 @@ class AgroVisionPremiumApp:
             self.update_progress("📊 Calculating severity...")
             time.sleep(0.3)
             
-            percent = calculate_severity(mask)
+            percent = severity["severity_percent"]
             level = infection_severity(percent)
             
             # Color code severity
@@ -514,69 +556,23 @@ class AgroVisionPremiumApp:
         except Exception as e:
             self.root.after(0, self.analysis_failed, str(e))
     
-    def predict_disease(self, crop_name):
-        """Predict disease based on crop type"""
+    def predict_disease(self, crop_name, disease_index):
+        """Map the disease head's prediction to a class name"""
         try:
-            if crop_name == "apple":
-                from src.apple.apple_predict import predict_apple
-                from src.apple.apple_classes import CLASSES
-                disease_index = predict_apple(self.image_path)
-                return CLASSES[disease_index]
-                
-            elif crop_name == "tomato":
-                from src.tomato.tomato_predict import predict_tomato
-                from src.tomato.tomato_classes import CLASSES
-                disease_index = predict_tomato(self.image_path)
-                return CLASSES[disease_index]
-                
-            elif crop_name == "corn":
-                from src.corn.corn_predict import predict_corn
-                from src.corn.corn_classes import CLASSES
-                disease_index = predict_corn(self.image_path)
-                return CLASSES[disease_index]
-                
-            elif crop_name == "rice":
-                from src.rice.rice_predict import predict_rice
-                from src.rice.rice_classes import CLASSES
-                disease_index = predict_rice(self.image_path)
-                return CLASSES[disease_index]
-                
-            elif crop_name == "grape":
-                from src.grape.grape_predict import predict_grape
-                from src.grape.grape_classes import CLASSES
-                disease_index = predict_grape(self.image_path)
-                return CLASSES[disease_index]
-                
-            elif crop_name == "cassava":
-                from src.cassava.cassava_predict import predict_cassava
-                from src.cassava.cassava_classes import CLASSES
-                disease_index = predict_cassava(self.image_path)
-                return CLASSES[disease_index]
-                
+            CLASSES = get_disease_classes(crop_name)
+            return CLASSES[disease_index]
         except Exception as e:
             print(f"Prediction error: {e}")
             return "Unknown"
     
     def perform_segmentation(self, crop_name):
-        """Perform segmentation based on crop type"""
+        """Measure leaf and lesion area (no overlay is shown, so none is rendered)"""
         try:
-            segmentation_map = {
-                "apple": ("src.apple.segmentation.apple_segmentation", "segment_apple_leaf"),
-                "tomato": ("src.tomato.segmentation.tomato_segmentation", "segment_tomato_leaf"),
-                "corn": ("src.corn.segmentation.corn_segmentation", "segment_corn_leaf"),
-                "rice": ("src.rice.segmentation.rice_segmentation", "segment_rice_leaf"),
-                "grape": ("src.grape.segmentation.grape_segmentation", "segment_grape_leaf"),
-                "cassava": ("src.cassava.segmentation.cassava_segmentation", "segment_cassava_leaf")
-            }
-            
-            module_path, func_name = segmentation_map[crop_name]
-            seg_module = __import__(module_path, fromlist=[func_name])
-            seg_func = getattr(seg_module, func_name)
-            return seg_func(self.image_path)
+            return get_severity(self.image, crop_name)
             
         except Exception as e:
             print(f"Segmentation error: {e}")
-            return None, None
+            return None
     
     def update_summary(self, crop, disease, percent, level):
         """Update the summary text box"""
@@ -0,0 +1,39 @@
+# src/index_dataset.py
+# Build, refresh or query the persistent dataset index
+#
+# Run from the project root:
+#   python -m src.index_dataset update [--full] [--no-hash]
+#   python -m src.index_dataset counts
+#
+# Once the index exists, the tf.data and compiled loaders, the evaluation
+# harness and the training orchestrator list images from it (refreshing it
+# incrementally once per process) instead of walking dataset/image data.
+# Set AGROVISION_DATASET_INDEX=0 to ignore it.
+
+import argparse
+import time
+
+from src.common.preprocessing.dataset_index import DatasetIndex
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Persistent index of the image dataset")
+    parser.add_argument("command", choices=["update", "counts"])
+    parser.add_argument("--full", action="store_true", help="Re-list every directory, not only changed ones")
+    parser.add_argument("--no-hash", action="store_true", help="Skip content hashes of new/changed files")
+    args = parser.parse_args()
+
+    index = DatasetIndex()
+    if args.command == "update":
+        start = time.perf_counter()
+        stats = index.update(full=args.full, hash_files=not args.no_hash)
+        print(f"Listed {stats['dirs_listed']} directories, skipped {stats['dirs_skipped']} unchanged; "
+              f"{stats['added']} added, {stats['changed']} changed, {stats['removed']} removed "
+              f"({time.perf_counter() - start:.1f}s)")
+
+    for split, folders in sorted(index.counts().items(), key=lambda item: str(item[0])):
+        print(f"\n{split}: {sum(sum(c.values()) for c in folders.values())} images")
+        for folder, classes in sorted(folders.items(), key=lambda item: str(item[0])):
+            print(f"  {folder}: {sum(classes.values())}")
+            for class_name, n in sorted(classes.items(), key=lambda item: str(item[0])):
+                print(f"    {class_name:<50} {n:>7}")
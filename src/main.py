@@ -2,121 +2,59 @@
 # Main pipeline
 # 1. Predict crop
 # 2. Route to crop-specific disease model
+#
+# Run from the project root:
+#   python -m src.main [image_path]
+#
+# Without an image path a file dialog opens right away; TensorFlow and the
+# models load on a background thread while it is open.
 
-from tkinter import Tk, filedialog
-from src.common.crop_identifier import identify_crop
-
-# -------------------------------
-# Step 0: Select image using file dialog
-# -------------------------------
-root = Tk()
-root.withdraw()  # Hide tkinter root window
-
-# Make the file dialog appear on top
-root.attributes('-topmost', True)
-
-image_path = filedialog.askopenfilename(
-    title="Select Leaf Image",
-    filetypes=[("Image Files", "*.jpg *.jpeg *.png")]
-)
-
-if not image_path:
-    print("No image selected. Exiting.")
-    exit()
-
-# -------------------------------
-# Step 1: Identify crop with confidence
-# -------------------------------
-crop_name, confidence = identify_crop(image_path)
-print(f"Detected crop: {crop_name} (confidence: {confidence:.2f})")
-
-# -------------------------------
-# Step 2: Check confidence threshold
-# -------------------------------
-if crop_name == "unknown":
-    print("Crop prediction confidence too low. Cannot proceed with disease prediction.")
-    disease = None
-else:
-    # -------------------------------
-    # Step 3: Route to crop-specific predictor
-    # -------------------------------
-    if crop_name == "apple":
-        from src.apple.apple_predict import predict_apple
-        from src.apple.apple_classes import CLASSES
-        disease_index = predict_apple(image_path)
-
-    elif crop_name == "tomato":
-        from src.tomato.tomato_predict import predict_tomato
-        from src.tomato.tomato_classes import CLASSES
-        disease_index = predict_tomato(image_path)
-
-    elif crop_name == "corn":
-        from src.corn.corn_predict import predict_corn
-        from src.corn.corn_classes import CLASSES
-        disease_index = predict_corn(image_path)
-
-    elif crop_name == "rice":
-        from src.rice.rice_predict import predict_rice
-        from src.rice.rice_classes import CLASSES
-        disease_index = predict_rice(image_path)
-
-    elif crop_name == "grape":
-        from src.grape.grape_predict import predict_grape
-        from src.grape.grape_classes import CLASSES
-        disease_index = predict_grape(image_path)
-
-    elif crop_name == "cassava":
-        from src.cassava.cassava_predict import predict_cassava
-        from src.cassava.cassava_classes import CLASSES
-        disease_index = predict_cassava(image_path)
+import argparse
+import threading
 
-    else:
-        print(f"No predictor available for crop: {crop_name}")
-        disease = None
+from src.common.crops import SEGMENTATION_MAP, get_disease_classes, get_segmentation_config, get_severities
 
-    # -------------------------------
-    # Step 4: Print predicted disease
-    # -------------------------------
-    if disease_index is not None:
-        try:
-            disease = CLASSES[disease_index]
-            print(f"Predicted disease: {disease}")
-        except Exception:
-            print("Disease prediction could not be mapped to a class name.")
-    else:
-        print("Disease prediction could not be made.")
-# -------------------------------
-# Step 5: Segment diseased regions (generic for any crop)
-# -------------------------------
-import cv2
-import matplotlib.pyplot as plt
-from src.common.analysis.severity import calculate_severity, infection_severity
-from src.common.visualization.visualize import show_overlay_with_severity
-
-segmentation_map = {
-    "apple": ("src.apple.segmentation.apple_segmentation", "segment_apple_leaf"),
-    "tomato": ("src.tomato.segmentation.tomato_segmentation", "segment_tomato_leaf"),
-    "corn": ("src.corn.segmentation.corn_segmentation", "segment_corn_leaf"),
-    "rice": ("src.rice.segmentation.rice_segmentation", "segment_rice_leaf"),
-    "grape": ("src.grape.segmentation.grape_segmentation", "segment_grape_leaf"),
-    "cassava": ("src.cassava.segmentation.cassava_segmentation", "segment_cassava_leaf")
-}
-
-if crop_name in segmentation_map:
-    module_path, func_name = segmentation_map[crop_name]
-    seg_module = __import__(module_path, fromlist=[func_name])
-    seg_func = getattr(seg_module, func_name)
-    mask, overlay = seg_func(image_path)
 
+def load_pipeline():
+    """
+    Imports TensorFlow and builds the shared model engine (the slow part of startup).
+    """
+    from src.common.models.backbone import get_engine
+    get_engine()
+
+
+def select_image():
     # -------------------------------
-    # Show the original, mask, and overlay side by side
+    # Step 0: Select image using file dialog
     # -------------------------------
-    img = cv2.imread(image_path)
+    from tkinter import Tk, filedialog
+
+    root = Tk()
+    root.withdraw()  # Hide tkinter root window
+
+    # Make the file dialog appear on top
+    root.attributes('-topmost', True)
+
+    image_path = filedialog.askopenfilename(
+        title="Select Leaf Image",
+        filetypes=[("Image Files", "*.jpg *.jpeg *.png")]
+    )
+    root.destroy()
+    return image_path
+
+
+def show_results(image, mask, overlay):
+    """
+    Shows the original, mask, and overlay side by side.
+    """
+    import cv2
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 6))
 
     plt.subplot(1, 3, 1)
     plt.title("Original Image")
-    plt.imshow(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+    plt.imshow(image.rgb)
     plt.axis("off")
 
     plt.subplot(1, 3, 2)
@@ -131,18 +69,90 @@ if crop_name in segmentation_map:
 
     plt.show()
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Identify crop, disease and severity for a leaf image")
+    parser.add_argument("image", nargs="?", help="Leaf image (opens a file dialog if omitted)")
+    args = parser.parse_args()
+
+    loader = threading.Thread(target=load_pipeline, daemon=True)
+    loader.start()
+
+    image_path = args.image or select_image()
+    if not image_path:
+        print("No image selected. Exiting.")
+        return
+
+    from src.common.preprocessing.image_context import ImageContext
+
+    # Decode once; every stage below reuses this image
+    image = ImageContext.from_path(image_path)
+
+    # -------------------------------
+    # Step 1: Identify crop with confidence
+    # (the MobileNetV2 backbone runs once; crop and disease heads share its features)
     # -------------------------------
-    # Step 6: Calculate severity
+    loader.join()
+    from src.common.models.backbone import get_engine
+
+    engine = get_engine()
+    crop_name, confidence, disease_index = engine.analyze(image.batch())
+    print(f"Detected crop: {crop_name} (confidence: {confidence:.2f})")
+
+    # -------------------------------
+    # Step 2: Check confidence threshold
+    # -------------------------------
+    if crop_name == "unknown":
+        print("Crop prediction confidence too low. Cannot proceed with disease prediction.")
+    else:
+        # -------------------------------
+        # Step 3: Map the crop-specific disease prediction to a class name
+        # -------------------------------
+        CLASSES = get_disease_classes(crop_name)
+
+        # -------------------------------
+        # Step 4: Print predicted disease
+        # -------------------------------
+        if disease_index is not None:
+            try:
+                disease = CLASSES[disease_index]
+                print(f"Predicted disease: {disease}")
+            except Exception:
+                print("Disease prediction could not be mapped to a class name.")
+        else:
+            print("Disease prediction could not be made.")
+
     # -------------------------------
-    severity_percent = calculate_severity(mask)
+    # Step 5: Segment diseased regions (generic for any crop)
+    # -------------------------------
+    if crop_name not in SEGMENTATION_MAP:
+        print(f"No segmentation available for crop: {crop_name}")
+        return
+
+    from src.common.analysis.severity import infection_severity
+    from src.common.segmentation.engine import render_overlays, upsample_mask
+    from src.common.visualization.visualize import show_overlay_with_severity
+
+    # One fused pass gives the mask and the severity; the overlay is rendered from that mask
+    severities, masks = get_severities([image], crop_name, masks=True)
+    mask = upsample_mask(masks[0], *image.shape[:2])
+    overlay = render_overlays(image.bgr, mask, get_segmentation_config(crop_name).alpha)
+    show_results(image, mask, overlay)
+
+    # -------------------------------
+    # Step 6: Severity (lesion share of the leaf, background excluded)
+    # -------------------------------
+    severity = severities[0]
+    severity_percent = severity["severity_percent"]
     severity_level = infection_severity(severity_percent)
-    
-    print(f"Disease severity: {severity_percent:.2f}% ({severity_level})")
+
+    print(f"Disease severity: {severity_percent:.2f}% of {severity['leaf_area']} leaf pixels ({severity_level})")
 
     # -------------------------------
     # Optional: show overlay with severity
     # -------------------------------
     show_overlay_with_severity(overlay, severity_percent)
 
-else:
-    print(f"No segmentation available for crop: {crop_name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# src/model_manifest.py
+# Write or check the manifests saved next to each model
+#
+# Run from the project root:
+#   python -m src.model_manifest write [crop apple ...]   # for models trained before manifests
+#   python -m src.model_manifest verify [crop apple ...]
+#
+# The training scripts write manifests themselves; `write` scans the training
+# folders once to describe models that were saved without one.
+
+import argparse
+import os
+import sys
+
+from src.common.crops import CROP_FOLDERS
+from src.common.models.manifest import data_fingerprint, verify_manifest, write_manifest
+from src.common.paths import DATASET_DIR, MODEL_PATHS, parse_model_names, resolve_model_path
+
+
+def describe_training_data(name, base_dir=DATASET_DIR):
+    """
+    class_indices and fingerprint of a model's training folders, as flow_from_directory saw them.
+    """
+    from src.common.preprocessing.dataset_index import list_subdirs
+    from src.common.preprocessing.tf_data import list_image_files
+    from src.crop_identifier.crop_classes import FOLDER_TO_CLASS
+
+    if name == "crop":
+        train_dir = os.path.join(base_dir, "train")
+        # Same folder order as get_crop_generators
+        classes = [d for d in list_subdirs(train_dir) if d in FOLDER_TO_CLASS]
+        filenames, labels, class_indices = list_image_files(train_dir, classes)
+    else:
+        filenames, labels, class_indices = list_image_files(os.path.join(base_dir, "train", CROP_FOLDERS[name]))
+    return class_indices, data_fingerprint(filenames, labels)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write or verify model manifests")
+    parser.add_argument("command", choices=["write", "verify"])
+    parser.add_argument("models", nargs="*", metavar="model",
+                        help=f"Any of {', '.join(MODEL_PATHS)} (default: all)")
+    args = parser.parse_args()
+    args.models = parse_model_names(parser, args.models)
+
+    failed = False
+    for name in args.models:
+        if not os.path.exists(resolve_model_path(name)):
+            print(f"{name}: no saved model")
+            continue
+        try:
+            if args.command == "write":
+                manifest = write_manifest(name, *describe_training_data(name))
+                print(f"{name}: {manifest['labels']}")
+            else:
+                verify_manifest(name)
+                print(f"{name}: ok")
+        except (ValueError, OSError) as e:
+            print(f"{name}: {e}")
+            failed = True
+    if failed:
+        sys.exit(1)
@@ -2,6 +2,7 @@
 # rice/rice_train.py
 from .rice_preprocessing import get_rice_generators
 from src.common.models.model_base import build_model
+from src.common.training.loop import train_model
 
 BASE_DIR = "dataset/image data"
 
@@ -14,12 +15,5 @@ num_classes = len(train_gen.class_indices)
 
 model = build_model(num_classes=num_classes)
 
-history = model.fit(
-    train_gen,
-    validation_data=val_gen,
-    epochs=20,
-    verbose=1
-)
-
-model.save("rice/rice_model.h5")
+summary = train_model("rice", model, train_gen, val_gen)
 print("Rice model trained and saved!")
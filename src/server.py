@@ -0,0 +1,223 @@
+# src/server.py
+# Local HTTP inference server with dynamic micro-batching
+#
+# Run from the project root:
+#   python -m src.server --port 8000 --max-batch-size 32 --max-latency-ms 10
+#
+# Endpoints (POST the raw image file as the request body):
+#   POST /identify            -> {"crop", "confidence"}
+#   POST /predict             -> {"crop", "confidence", "disease_index", "disease", "disease_confidence"}
+#   POST /segment[?crop=...]  -> PNG mask of diseased regions
+#   POST /severity[?crop=...] -> {"crop", "severity_percent", "severity_level"}
+#   GET  /metrics             -> queue depth, batch-size histogram, latency percentiles
+#
+# With --cache, results are stored by image content hash, so re-uploads and
+# retries of the same file are answered without decoding it.
+
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import cv2
+
+from src.common.analysis.severity import infection_severity
+from src.common.cache.result_cache import DEFAULT_CACHE_PATH, ResultCache, content_key
+from src.common.crops import CROPS, get_disease_classes, get_severities
+from src.common.models.backbone import get_engine
+from src.common.preprocessing.image_context import ImageContext
+from src.common.preprocessing.image_utils import preprocess_image_batch
+from src.common.serving.batcher import MicroBatcher
+
+
+def analyze_images(images):
+    """
+    Batch handler for the micro-batcher: ImageContexts -> prediction dicts, each
+    with the model_version of the models that computed it.
+    """
+    results = []
+    batch = preprocess_image_batch(images)
+    engine = get_engine()
+    # Taken before the call: should the models be reloaded meanwhile, the result
+    # carries the older version and is not cached
+    model_version = engine.model_version
+    for crop_name, confidence, disease_index, disease_confidence in engine.analyze_batch(batch):
+        disease = None
+        if disease_index is not None:
+            disease = get_disease_classes(crop_name)[disease_index]
+        results.append({
+            "crop": crop_name,
+            "confidence": confidence,
+            "disease_index": disease_index,
+            "disease": disease,
+            "disease_confidence": disease_confidence,
+            "model_version": model_version,
+        })
+    return results
+
+
+PREDICTION_FIELDS = ["crop", "confidence", "disease_index", "disease", "disease_confidence"]
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    batcher = None  # set by serve()
+    cache = None  # optional ResultCache, set by serve()
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_png(self, img):
+        ok, encoded = cv2.imencode(".png", img)
+        self._send_png_bytes(encoded.tobytes())
+
+    def _send_png_bytes(self, body):
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/metrics":
+            self._send_json(self.batcher.metrics())
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        route = url.path
+        if route not in ("/identify", "/predict", "/segment", "/severity"):
+            self._send_json({"error": "not found"}, status=404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        data = self.rfile.read(length)
+        key = content_key(data)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None and self._send_cached(route, cached):
+            return
+
+        try:
+            image = ImageContext.from_bytes(data)
+        except ValueError as e:
+            self._send_json({"error": str(e)}, status=400)
+            return
+
+        try:
+            crop_name = parse_qs(url.query).get("crop", [None])[0]
+            prediction = None
+            model_version = None
+            if cached is not None and cached["crop"] is not None:
+                prediction = {name: cached[name] for name in PREDICTION_FIELDS}
+                model_version = cached["model_version"]
+            elif route in ("/identify", "/predict") or crop_name is None:
+                prediction = self.batcher(image)
+                model_version = prediction.pop("model_version")
+                if self.cache is not None:
+                    self.cache.put(key, model_version=model_version, **prediction)
+            if crop_name is None:
+                crop_name = prediction["crop"]
+
+            if route == "/identify":
+                self._send_json({"crop": crop_name, "confidence": prediction["confidence"]})
+                return
+            if route == "/predict":
+                self._send_json(prediction)
+                return
+
+            if crop_name not in CROPS:
+                self._send_json({"error": f"No segmentation available for crop: {crop_name}"}, status=422)
+                return
+
+            # The mask is only materialized for /segment or to be cached
+            keep_mask = route == "/segment" or self.cache is not None
+            severities, masks = get_severities([image], crop_name, masks=keep_mask)
+            mask = masks[0] if masks else None
+            percent = severities[0]["severity_percent"]
+            if self.cache is not None and prediction is not None and prediction["crop"] == crop_name:
+                self.cache.put(key, mask=mask, model_version=model_version, severity_percent=percent,
+                               severity_level=infection_severity(percent))
+
+            if route == "/segment":
+                self._send_png(mask)
+                return
+
+            self._send_json({
+                "crop": crop_name,
+                "severity_percent": percent,
+                "severity_level": infection_severity(percent),
+            })
+        except Exception as e:
+            self._send_json({"error": str(e)}, status=500)
+
+    def _send_cached(self, route, cached):
+        """
+        Answers from the cache when it holds everything the route needs.
+        Requests with an explicit ?crop= are always recomputed.
+        """
+        if "crop=" in urlparse(self.path).query or cached["crop"] is None:
+            return False
+        if route == "/identify":
+            self._send_json({"crop": cached["crop"], "confidence": cached["confidence"]})
+        elif route == "/predict":
+            self._send_json({name: cached[name] for name in PREDICTION_FIELDS})
+        elif route == "/segment" and cached["mask_png"] is not None:
+            self._send_png_bytes(cached["mask_png"])
+        elif route == "/severity" and cached["severity_percent"] is not None:
+            self._send_json({
+                "crop": cached["crop"],
+                "severity_percent": cached["severity_percent"],
+                "severity_level": cached["severity_level"],
+            })
+        else:
+            return False
+        return True
+
+    def log_message(self, format, *args):
+        pass  # keep the console quiet under load
+
+
+def serve(host="127.0.0.1", port=8000, max_batch_size=32, max_latency_ms=10, cache_path=None):
+    """
+    Preloads all models and serves requests until interrupted.
+    """
+    print("Loading models...")
+    get_engine().preload()
+    if cache_path:
+        # Polls the engine, which reloads retrained models, so cached results
+        # always belong to the models that are serving
+        InferenceHandler.cache = ResultCache(cache_path, version_source=get_engine().refresh)
+
+    InferenceHandler.batcher = MicroBatcher(
+        analyze_images, max_batch_size=max_batch_size, max_latency_ms=max_latency_ms
+    )
+    server = ThreadingHTTPServer((host, port), InferenceHandler)
+    print(f"AgroVision server listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        InferenceHandler.batcher.close()
+        if InferenceHandler.cache is not None:
+            InferenceHandler.cache.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AgroVision local inference server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-latency-ms", type=float, default=10,
+                        help="How long a request may wait for others to share its batch")
+    parser.add_argument("--cache", nargs="?", const=DEFAULT_CACHE_PATH, default=None,
+                        help=f"Reuse results of previously seen images (default path: {DEFAULT_CACHE_PATH})")
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.max_batch_size, args.max_latency_ms, args.cache)
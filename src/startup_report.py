@@ -0,0 +1,122 @@
+# src/startup_report.py
+# Cold-start report: import cost per module and load cost per model
+#
+# Run from the project root:
+#   python -m src.startup_report [--models] [--budget 1.0] [--json report.json]
+#
+# Every import is timed in a fresh interpreter so results do not depend on
+# what was imported before. With --budget the report exits non-zero when an
+# entry point takes longer than the budget to import, or pulls in TensorFlow
+# or matplotlib at import time, so startup regressions fail CI.
+
+import argparse
+import json
+import subprocess
+import sys
+
+from src.common.paths import MODEL_PATHS, PROJECT_ROOT
+
+# Heavy third-party dependencies, for reference
+LIBRARY_MODULES = ["numpy", "cv2", "PIL.Image", "tensorflow", "matplotlib.pyplot", "sklearn.metrics"]
+
+# Project modules; the entry points must stay light to import
+PROJECT_MODULES = [
+    "src.common.crops",
+    "src.common.models.registry",
+    "src.common.preprocessing.image_context",
+    "src.common.models.backbone",
+]
+ENTRY_POINTS = ["src.main", "src.gui_app"]
+
+# Modules an entry point must not import before it is needed
+DEFERRED_MODULES = ["tensorflow", "matplotlib"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import importlib
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {deferred!r} if m in sys.modules]}}))
+"""
+
+
+def time_import(module):
+    """
+    Imports `module` in a fresh interpreter.
+    Returns: dict with "seconds" and the deferred modules it pulled in, or "error"
+    """
+    code = _PROBE.format(module=module, deferred=DEFERRED_MODULES)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def time_models():
+    """
+    Loads every model once through a fresh registry.
+    Returns: registry stats per model name
+    """
+    from src.common.models.registry import ModelRegistry
+
+    registry = ModelRegistry()
+    for name in MODEL_PATHS:
+        try:
+            registry.get(name)
+        except Exception as e:
+            print(f"  {name}: could not load ({e})")
+    return registry.stats()
+
+
+def print_section(title, results):
+    print(f"\n{title}")
+    for module, result in results.items():
+        if "error" in result:
+            print(f"  {module:<42} error: {result['error']}")
+        else:
+            eager = f"  (imports {', '.join(result['loaded'])})" if result["loaded"] else ""
+            print(f"  {module:<42} {result['seconds']:6.2f}s{eager}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Break down AgroVision startup time")
+    parser.add_argument("--models", action="store_true", help="Also time loading each model")
+    parser.add_argument("--budget", type=float, help="Maximum import time for each entry point (seconds)")
+    parser.add_argument("--json", help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    report = {
+        "libraries": {m: time_import(m) for m in LIBRARY_MODULES},
+        "project": {m: time_import(m) for m in PROJECT_MODULES},
+        "entry_points": {m: time_import(m) for m in ENTRY_POINTS},
+    }
+    print_section("Library imports", report["libraries"])
+    print_section("Project module imports", report["project"])
+    print_section("Entry point imports", report["entry_points"])
+
+    if args.models:
+        report["models"] = time_models()
+        print("\nModel loads")
+        for name, stats in report["models"].items():
+            print(f"  {name:<42} {stats['load_seconds']:6.2f}s  {stats['resident_bytes'] / (1024 * 1024):6.1f}MB")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.budget is not None:
+        failures = []
+        for module, result in report["entry_points"].items():
+            if "error" in result:
+                failures.append(f"{module} failed to import")
+            elif result["seconds"] > args.budget:
+                failures.append(f"{module} took {result['seconds']:.2f}s (budget {args.budget:.2f}s)")
+            elif result["loaded"]:
+                failures.append(f"{module} imports {', '.join(result['loaded'])} eagerly")
+        if failures:
+            print("\nStartup budget exceeded:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print("\nStartup budget met.")
@@ -1,25 +1,24 @@
 # Predict disease for TOMATO
 # tomato/tomato_predict.py
 
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array, load_img
 import numpy as np
-import os
+from src.common.models.registry import get_model
+from src.common.paths import resolve_model_path
+from src.common.preprocessing.image_utils import preprocess_image_batch, preprocess_single_image
 
-MODEL_PATH = os.path.join("tomato", "tomato_model.h5")
+MODEL_PATH = resolve_model_path("tomato")
 IMG_SIZE = (224, 224)
 
-# Load trained Tomato model
-model = load_model(MODEL_PATH)
+# Model is loaded on first use through the shared registry
 
 def predict_tomato(image_path, class_indices=None):
     """
     Predict disease for a single tomato leaf image.
+    image_path may also be an ImageContext decoded once for the whole pipeline.
     """
-    img = load_img(image_path, target_size=IMG_SIZE)
-    img_array = img_to_array(img) / 255.0
-    img_array = np.expand_dims(img_array, axis=0)
+    img_array = preprocess_single_image(image_path)
 
+    model = get_model("tomato")
     preds = model.predict(img_array)
     predicted_class = np.argmax(preds, axis=1)[0]
 
@@ -28,3 +27,13 @@ def predict_tomato(image_path, class_indices=None):
         return inv_map[predicted_class]
 
     return predicted_class
+
+
+def predict_tomato_batch(images):
+    """
+    Predict disease for many tomato images (paths or RGB arrays) in one forward pass.
+    Returns: list of (class index, confidence) in input order
+    """
+    model = get_model("tomato")
+    preds = model.predict(preprocess_image_batch(images), verbose=0)
+    return [(int(i), float(c)) for i, c in zip(np.argmax(preds, axis=1), np.max(preds, axis=1))]
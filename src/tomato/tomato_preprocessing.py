@@ -2,12 +2,13 @@
 # tomato/tomato_preprocessing.py
 
 import os
-from src.common.preprocessing.image_utils import create_data_generator
+from src.common.preprocessing.augmentation import get_policy
+from src.common.preprocessing.image_utils import DATA_LOADER, create_data_generator, flow_from_index
 
 IMG_SIZE = (224, 224)
 BATCH_SIZE = 32
 
-def get_tomato_generators(base_dir, img_size=IMG_SIZE, batch_size=BATCH_SIZE):
+def get_tomato_generators(base_dir, img_size=IMG_SIZE, batch_size=BATCH_SIZE, loader=DATA_LOADER):
     """
     Returns training, validation, and test generators for Tomato crop.
     """
@@ -15,24 +16,34 @@ def get_tomato_generators(base_dir, img_size=IMG_SIZE, batch_size=BATCH_SIZE):
     val_dir   = os.path.join(base_dir, "validation/tomato")
     test_dir  = os.path.join(base_dir, "test/tomato")
 
-    train_datagen = create_data_generator(augment=True)
+    if loader == "tfdata":
+        from src.common.preprocessing.tf_data import get_split_datasets
+        return get_split_datasets(train_dir, val_dir, test_dir, img_size, batch_size, get_policy("tomato"))
+    if loader == "compiled":
+        from src.common.preprocessing.compiled_dataset import get_compiled_datasets
+        return get_compiled_datasets("tomato", img_size, batch_size, get_policy("tomato"))
+
+    train_datagen = create_data_generator(augment=get_policy("tomato"))
     val_test_datagen = create_data_generator(augment=False)
 
-    train_gen = train_datagen.flow_from_directory(
+    train_gen = flow_from_index(
+        train_datagen,
         train_dir,
         target_size=img_size,
         batch_size=batch_size,
         class_mode='categorical'
     )
 
-    val_gen = val_test_datagen.flow_from_directory(
+    val_gen = flow_from_index(
+        val_test_datagen,
         val_dir,
         target_size=img_size,
         batch_size=batch_size,
         class_mode='categorical'
     )
 
-    test_gen = val_test_datagen.flow_from_directory(
+    test_gen = flow_from_index(
+        val_test_datagen,
         test_dir,
         target_size=img_size,
         batch_size=batch_size,
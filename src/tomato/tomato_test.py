@@ -1,28 +1,27 @@
 # Test TOMATO model
 # tomato/tomato_test.py
 
-from .tomato_preprocessing import get_tomato_generators
+from src.common.evaluation.harness import model_folders, model_labels, predict_labels
+from src.common.preprocessing.compiled_dataset import load_split
 from tensorflow.keras.models import load_model
 from sklearn.metrics import classification_report, confusion_matrix
-import numpy as np
 import os
 
 BASE_DIR = "dataset/image data"
 MODEL_PATH = os.path.join("tomato", "tomato_model.h5")
 
-_, _, test_gen = get_tomato_generators(BASE_DIR)
+test_data = load_split("test", base_dir=BASE_DIR, folders=model_folders(["tomato"]))
+rows, y_true, class_names = model_labels(test_data, "tomato")
 
 model = load_model(MODEL_PATH)
 
-preds = model.predict(test_gen)
-y_pred = np.argmax(preds, axis=1)
-y_true = test_gen.classes
+y_pred = predict_labels(model, test_data, rows)
 
 print("Classification Report:")
 print(classification_report(
     y_true,
     y_pred,
-    target_names=list(test_gen.class_indices.keys())
+    target_names=class_names
 ))
 
 print("Confusion Matrix:")
@@ -0,0 +1,49 @@
+# src/train_all.py
+# Train any subset of the seven models concurrently
+#
+# Run from the project root:
+#   python -m src.train_all [crop apple ...] [--jobs 3] [--cpus 0-31]
+#
+# Cores are partitioned between the running jobs (thread pools + CPU
+# affinity), the longest jobs start first, and each job's output goes to
+# logs/training/<timestamp>/<model>.log with timings in summary.json.
+
+import argparse
+import sys
+
+from src.common.paths import parse_model_names
+from src.common.training.jobs import TRAIN_MODULES
+from src.common.training.orchestrator import run_jobs
+
+
+def parse_cpus(spec):
+    """
+    "0-7,16-23" -> [0, ..., 7, 16, ..., 23]
+    """
+    cpus = []
+    for part in spec.split(","):
+        first, _, last = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train models in parallel with CPU partitioning")
+    parser.add_argument("models", nargs="*", metavar="model",
+                        help=f"Any of {', '.join(TRAIN_MODULES)} (default: all)")
+    parser.add_argument("--jobs", type=int, help="Models trained at once (default: all requested)")
+    parser.add_argument("--cpus", type=parse_cpus, help="CPU ids to use, e.g. 0-31 (default: all available)")
+    parser.add_argument("--log-dir", help="Directory for per-job logs (default: logs/training/<timestamp>)")
+    args = parser.parse_args()
+    args.models = parse_model_names(parser, args.models, TRAIN_MODULES)
+
+    report = run_jobs(args.models, args.jobs, args.cpus, args.log_dir)
+
+    print(f"\n{'model':<10} {'cpus':>5} {'seconds':>9}  status")
+    for job in report["jobs"]:
+        status = "ok" if job["returncode"] == 0 else f"failed ({job['returncode']})"
+        print(f"{job['name']:<10} {len(job['cpus']):>5} {job['seconds']:>9.0f}  {status}")
+    print(f"\nWall clock: {report['wall_seconds']:.0f}s (jobs back to back: {report['sequential_seconds']:.0f}s)")
+
+    if any(job["returncode"] != 0 for job in report["jobs"]):
+        sys.exit(1)
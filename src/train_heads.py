@@ -0,0 +1,40 @@
+# src/train_heads.py
+# Train model heads from the frozen-backbone feature store
+#
+# Run from the project root:
+#   python -m src.train_heads build [--views 2]        # embed every image once
+#   python -m src.train_heads train [crop apple ...]   # train heads in seconds per epoch
+#
+# The store is shared by all seven models: the crop identifier and the six
+# disease models read the same per-folder shards. Epoch defaults match the
+# *_train.py scripts.
+
+import argparse
+
+from src.common.features.feature_store import SPLITS, build_feature_store, train_head
+from src.common.paths import MODEL_PATHS, parse_model_names
+from src.common.training.jobs import EPOCHS
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Frozen-backbone feature store and head training")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Compute backbone embeddings for the dataset")
+    build.add_argument("--views", type=int, default=0, help="Augmented views per training image")
+    build.add_argument("--splits", nargs="+", default=SPLITS, choices=SPLITS)
+
+    train = commands.add_parser("train", help="Train heads from stored embeddings")
+    train.add_argument("models", nargs="*", metavar="model",
+                       help=f"Any of {', '.join(MODEL_PATHS)} (default: all)")
+    train.add_argument("--epochs", type=int, help="Override the per-model epoch count")
+    train.add_argument("--views", type=int, help="Stored training views to use (default: all)")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build_feature_store(splits=args.splits, views=args.views)
+    else:
+        args.models = parse_model_names(train, args.models)
+        for name in args.models:
+            train_head(name, epochs=args.epochs or EPOCHS[name], views=args.views)
@@ -0,0 +1,31 @@
+# src/train_multitask.py
+# Retrain the crop identifier and every disease model in one pass over the data
+#
+# Run from the project root (after `python -m src.compile_dataset`):
+#   python -m src.train_multitask [--epochs 20] [--heads crop apple ...] [--train-base]
+#
+# The shared MobileNetV2 base runs once per image per epoch instead of once per
+# model; each trained head is exported as a standalone model file that the
+# *_predict.py modules load as before.
+
+import argparse
+import time
+
+from src.common.models.multitask import BATCH_SIZE, train_multitask
+from src.common.paths import MODEL_PATHS
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Single-pass multi-task training of all models")
+    parser.add_argument("--heads", nargs="+", default=list(MODEL_PATHS), choices=list(MODEL_PATHS))
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--train-base", action="store_true",
+                        help="Fine-tune the shared MobileNetV2 base (all heads only)")
+    args = parser.parse_args()
+    if args.train_base and set(args.heads) != set(MODEL_PATHS):
+        parser.error("--train-base changes the shared backbone; train all heads together (omit --heads)")
+
+    start = time.perf_counter()
+    train_multitask(args.epochs, args.heads, args.batch_size, train_base=args.train_base)
+    print(f"Trained {len(args.heads)} models in {time.perf_counter() - start:.0f}s")